@@ -29,26 +29,26 @@ export async function GET(request, { params }) {
     // Get latest OSPF data
     const ospfResult = await query(`
       SELECT 
-        pr.reading_data,
-        pr.reading_time
-      FROM parameter_readings pr
-      JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
-      WHERE pr.router_id = $1 
+        lr.reading_data,
+        lr.reading_time
+      FROM latest_parameter_readings lr
+      JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+      WHERE lr.router_id = $1 
         AND mp.parameter_name = 'TEJAS_OSPF_NEIGHBORS'
-      ORDER BY pr.reading_time DESC
+      ORDER BY lr.reading_time DESC
       LIMIT 1
     `, [routerId]);
 
     // Get latest BGP data
     const bgpResult = await query(`
       SELECT 
-        pr.reading_data,
-        pr.reading_time
-      FROM parameter_readings pr
-      JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
-      WHERE pr.router_id = $1 
+        lr.reading_data,
+        lr.reading_time
+      FROM latest_parameter_readings lr
+      JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+      WHERE lr.router_id = $1 
         AND mp.parameter_name = 'TEJAS_BGP_SUMMARY'
-      ORDER BY pr.reading_time DESC
+      ORDER BY lr.reading_time DESC
       LIMIT 1
     `, [routerId]);
 
@@ -60,29 +60,23 @@ export async function GET(request, { params }) {
         ri.interface_label,
         ri.interface_type,
         (
-          SELECT pr.reading_data
-          FROM parameter_readings pr
-          JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
-          WHERE pr.interface_id = ri.id 
+          SELECT lr.reading_data
+          FROM latest_parameter_readings lr
+          JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+          WHERE lr.interface_id = ri.id 
             AND mp.parameter_name = 'TEJAS_SFP_100G_INFO'
-          ORDER BY pr.reading_time DESC
-          LIMIT 1
         ) as sfp_info,
         (
-          SELECT pr.reading_data
-          FROM parameter_readings pr
-          JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
-          WHERE pr.interface_id = ri.id 
+          SELECT lr.reading_data
+          FROM latest_parameter_readings lr
+          JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+          WHERE lr.interface_id = ri.id 
             AND mp.parameter_name = 'TEJAS_SFP_100G_STATS'
-          ORDER BY pr.reading_time DESC
-          LIMIT 1
         ) as sfp_stats,
         (
-          SELECT pr.reading_time
-          FROM parameter_readings pr
-          WHERE pr.interface_id = ri.id
-          ORDER BY pr.reading_time DESC
-          LIMIT 1
+          SELECT MAX(lr.reading_time)
+          FROM latest_parameter_readings lr
+          WHERE lr.interface_id = ri.id
         ) as last_reading_time
       FROM router_interfaces ri
       WHERE ri.router_id = $1 AND ri.is_monitored = true
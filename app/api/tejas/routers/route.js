@@ -19,10 +19,10 @@ export async function GET(request) {
         r.location,
         r.device_type,
         COUNT(DISTINCT ri.id) as interface_count,
-        MAX(pr.reading_time) as last_reading_time
+        MAX(lr.reading_time) as last_reading_time
       FROM routers r
       LEFT JOIN router_interfaces ri ON r.id = ri.router_id
-      LEFT JOIN parameter_readings pr ON r.id = pr.router_id
+      LEFT JOIN latest_parameter_readings lr ON r.id = lr.router_id
       WHERE r.is_active = true AND r.device_type = 'tejas'
       GROUP BY r.id, r.hostname, r.ip_address, r.location, r.device_type
       ORDER BY r.hostname
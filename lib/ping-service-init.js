@@ -41,6 +41,12 @@ async function initializePingService() {
     return { success: true, message: 'Already running' };
   }
   
+  // Fleet sweeps done by python-backend/reachability_prober.py (TCP, whole fleet at once)
+  if (process.env.PING_MONITOR_BACKEND === 'python') {
+    console.log('[PING-INIT] Ping loop disabled, router_ping_status is updated by reachability_prober.py');
+    return { success: true, message: 'Handled by python reachability prober' };
+  }
+  
   try {
     console.log('[PING-INIT] 🚀 Starting ping monitoring service...');
     
@@ -36,6 +36,12 @@ function startPingService() {
     return;
   }
   
+  // Fleet sweeps done by python-backend/reachability_prober.py (TCP, whole fleet at once)
+  if (process.env.PING_MONITOR_BACKEND === 'python') {
+    console.log('[PING SERVICE] Ping loop disabled, router_ping_status is updated by reachability_prober.py');
+    return;
+  }
+  
   console.log('[PING SERVICE] Starting background ping monitoring...');
   
   // Start monitoring with 5 minute interval
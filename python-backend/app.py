@@ -8,14 +8,20 @@ Interfaces fetched dynamically from database
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import psycopg2
 from psycopg2.extras import RealDictCursor
-import paramiko
 import time
 import re
 import os
+import json
+import math
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+import ssh_session_pool
+import db_pool
+import router_circuit_breaker
+import sfp_rollup_job
+
 # Load environment variables
 load_dotenv()
 
@@ -31,15 +37,15 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'python##1313')
 }
 
+# Written by collection_daemon.py
+COLLECTOR_STATUS_FILE = os.getenv('COLLECTOR_STATUS_FILE', 'logs/collector_status.json')
+
 def get_db_connection():
-    """Get database connection"""
-    return psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
+    """Check out a pooled database connection (use as `with get_db_connection() as conn:`)"""
+    return db_pool.get_db_pool(DB_CONFIG, cursor_factory=RealDictCursor).connection()
 
 def get_router_details(router_id):
     """Fetch router details from database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     query = """
         SELECT 
             r.id, r.hostname, r.ip_address, r.ssh_port, r.device_type,
@@ -49,19 +55,16 @@ def get_router_details(router_id):
         WHERE r.id = %s
     """
     
-    cursor.execute(query, (router_id,))
-    router = cursor.fetchone()
-    
-    cursor.close()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (router_id,))
+        router = cursor.fetchone()
+        cursor.close()
     
     return router
 
 def get_router_interfaces(router_id):
     """Fetch active interfaces for a router from database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     query = """
         SELECT 
             id, interface_name, interface_type, description
@@ -70,11 +73,11 @@ def get_router_interfaces(router_id):
         ORDER BY interface_name
     """
     
-    cursor.execute(query, (router_id,))
-    interfaces = cursor.fetchall()
-    
-    cursor.close()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (router_id,))
+        interfaces = cursor.fetchall()
+        cursor.close()
     
     print(f"[DB] Found {len(interfaces)} active interfaces for router {router_id}")
     for iface in interfaces:
@@ -82,75 +85,75 @@ def get_router_interfaces(router_id):
     
     return interfaces
 
-def execute_ssh_commands(router, commands):
+def sync_circuit_breakers():
+    """Share breaker state with the collectors, at most every CIRCUIT_BREAKER_SYNC_INTERVAL"""
+    breakers = router_circuit_breaker.get_breakers()
+    if breakers.sync_due():
+        try:
+            with get_db_connection() as conn:
+                breakers.sync(conn)
+        except Exception as e:
+            print(f"[BREAKER] Sync skipped: {e}")
+    return breakers
+
+def circuit_open_response(error):
+    """503 for a router whose circuit breaker is open, with when to try again"""
+    retry_in = max(0, (error.retry_at - datetime.now()).total_seconds())
+    response = jsonify({
+        'success': False,
+        'error': str(error),
+        'circuit_open': True,
+        'retry_at': error.retry_at.isoformat()
+    })
+    response.headers['Retry-After'] = str(math.ceil(retry_in))
+    return response, 503
+
+def execute_ssh_commands(router, commands, timings=None, session_info=None):
     """
-    Execute multiple SSH commands in single session
+    Execute multiple SSH commands on the router's pooled session
     Returns dict with command outputs
+    Each command returns as soon as the router prompt reappears
+    Raises CircuitOpenError at once for routers that keep failing to connect
     """
-    try:
-        print(f"\n{'='*60}")
-        print(f"[SSH] Connecting to {router['hostname']} ({router['ip_address']})")
-        print(f"{'='*60}")
-        
-        # Create SSH client
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        
-        # Connect
-        ssh.connect(
-            hostname=router['ip_address'],
-            port=router['ssh_port'] or 22,
-            username=router['username'],
-            password=router['password'],
-            timeout=30,
-            look_for_keys=False,
-            allow_agent=False
-        )
-        
-        print(f"[SSH] ✅ Connected successfully!")
-        
-        # Get shell
-        shell = ssh.invoke_shell()
-        time.sleep(1)
-        
-        # Clear initial output
-        initial_output = shell.recv(65535).decode('utf-8', errors='ignore')
-        print(f"[SSH] Initial prompt: {initial_output[:100]}...")
-        
-        # Configure terminal
-        print(f"[SSH] Configuring terminal...")
-        shell.send('conf t\n')
-        time.sleep(0.5)
-        shell.send('set cli pagination off\n')
-        time.sleep(0.5)
-        shell.send('end\n')
-        time.sleep(0.5)
-        shell.recv(65535)  # Clear output
-        
-        # Execute commands
-        outputs = {}
-        
-        for cmd_name, cmd in commands.items():
-            print(f"\n[SSH] Executing: {cmd}")
-            shell.send(f'{cmd}\n')
-            time.sleep(2)  # Wait for command to complete
+    pool = ssh_session_pool.get_session_pool()
+    sync_circuit_breakers()
+    
+    # A reused session can die between requests; retry once on a fresh one
+    for attempt in range(2):
+        reused = False
+        try:
+            print(f"\n{'='*60}")
+            print(f"[SSH] Session for {router['hostname']} ({router['ip_address']})")
+            print(f"{'='*60}")
             
-            output = shell.recv(65535).decode('utf-8', errors='ignore')
-            outputs[cmd_name] = output
+            with pool.session(router) as (session, reused):
+                print(f"[SSH] ✅ {'Reusing pooled session' if reused else 'Connected (new session)'}")
+                
+                if session_info is not None:
+                    session_info['session_reused'] = reused
+                
+                # Execute commands
+                outputs = {}
+                
+                for cmd_name, cmd in commands.items():
+                    print(f"\n[SSH] Executing: {cmd}")
+                    result = session.execute(cmd)
+                    
+                    outputs[cmd_name] = result.output
+                    if timings is not None:
+                        timings[cmd_name] = round(result.elapsed * 1000, 2)
+                    
+                    print(f"[SSH] ✅ Command completed: {cmd_name} in {result.elapsed * 1000:.0f} ms")
+                    print(f"[SSH] Output length: {len(result.output)} characters")
             
-            print(f"[SSH] ✅ Command completed: {cmd_name}")
-            print(f"[SSH] Output length: {len(output)} characters")
-        
-        # Close connection
-        shell.close()
-        ssh.close()
-        print(f"\n[SSH] Connection closed")
-        
-        return outputs
-        
-    except Exception as e:
-        print(f"[SSH ERROR] {str(e)}")
-        raise
+            return outputs
+            
+        except Exception as e:
+            print(f"[SSH ERROR] {str(e)}")
+            if attempt == 0 and reused:
+                print(f"[SSH] Retrying with a fresh session...")
+                continue
+            raise
 
 def parse_ospf_output(output):
     """Parse OSPF neighbor output"""
@@ -263,11 +266,17 @@ def parse_sfp_output(outputs):
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    # Liveness only: stats of the DB pool if a request already created it, never a new connection
+    pool = db_pool.peek_pool()
     return jsonify({
         'status': 'ok',
         'service': 'tejas-monitoring-backend',
         'version': '2.0.0',
-        'features': ['dynamic_interfaces', 'db_credentials']
+        'features': ['dynamic_interfaces', 'db_credentials', 'ssh_session_pool', 'db_pool', 'circuit_breaker'],
+        'ssh_pool': ssh_session_pool.get_session_pool().stats(),
+        'circuit_breakers': {key: value for key, value in router_circuit_breaker.get_breakers().summary().items()
+                             if key != 'routers'},
+        'db_pool': pool.stats() if pool is not None else None
     })
 
 # Unified endpoint - Single SSH session for all data
@@ -324,7 +333,9 @@ def get_all_monitoring_data():
         print(f"[INFO] SFP interfaces: {len(sfp_interface_map)}")
         
         # Execute all commands in single SSH session
-        outputs = execute_ssh_commands(router, commands)
+        command_timings = {}
+        session_info = {}
+        outputs = execute_ssh_commands(router, commands, command_timings, session_info)
         
         # Parse outputs
         ospf_data = parse_ospf_output(outputs['ospf'])
@@ -355,12 +366,16 @@ def get_all_monitoring_data():
             'performance': {
                 'execution_time_ms': round(execution_time, 2),
                 'ssh_sessions': 1,
+                'session_reused': session_info.get('session_reused', False),
                 'commands_executed': len(commands),
-                'interfaces_monitored': len(sfp_interface_map)
+                'interfaces_monitored': len(sfp_interface_map),
+                'command_times_ms': command_timings
             },
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         })
         
+    except router_circuit_breaker.CircuitOpenError as e:
+        return circuit_open_response(e)
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         return jsonify({
@@ -393,6 +408,8 @@ def get_ospf_data():
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         })
         
+    except router_circuit_breaker.CircuitOpenError as e:
+        return circuit_open_response(e)
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -421,6 +438,8 @@ def get_bgp_data():
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         })
         
+    except router_circuit_breaker.CircuitOpenError as e:
+        return circuit_open_response(e)
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -473,6 +492,83 @@ def get_sfp_data():
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         })
         
+    except router_circuit_breaker.CircuitOpenError as e:
+        return circuit_open_response(e)
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def parse_local_time(value):
+    """ISO timestamp as naive local time, like the TIMESTAMP columns (offsets such as Z are converted)"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+@app.route('/api/tejas/history/sfp', methods=['GET'])
+def get_sfp_history():
+    """
+    RX/TX power history of one interface from the SFP rollups
+    Query params: interfaceId, start/end (ISO, default last 24h), points, lane (-1 = module)
+    """
+    try:
+        interface_id = request.args.get('interfaceId', type=int)
+        if not interface_id:
+            return jsonify({'success': False, 'error': 'Interface ID required'}), 400
+        
+        end = request.args.get('end')
+        end = parse_local_time(end) if end else datetime.now()
+        start = request.args.get('start')
+        start = parse_local_time(start) if start else end - timedelta(days=1)
+        if start >= end:
+            return jsonify({'success': False, 'error': 'start must be before end'}), 400
+        
+        max_points = request.args.get('points', sfp_rollup_job.SFP_ROLLUP_MAX_POINTS, type=int)
+        lane = request.args.get('lane', sfp_rollup_job.MODULE_LANE, type=int)
+        
+        with get_db_connection() as conn:
+            history = sfp_rollup_job.get_sfp_power_history(conn, interface_id, start, end, max_points, lane)
+        
+        for point in history['points']:
+            point['bucket_start'] = point['bucket_start'].isoformat()
+        
+        return jsonify({
+            'success': True,
+            'interface_id': interface_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            **history
+        })
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/collector/status', methods=['GET'])
+def get_collector_status():
+    """Collection daemon schedule with per-job lag (from its status file)"""
+    try:
+        with open(COLLECTOR_STATUS_FILE) as f:
+            status = json.load(f)
+        
+        status['age_seconds'] = round(time.time() - os.path.getmtime(COLLECTOR_STATUS_FILE), 1)
+        return jsonify({'success': True, **status})
+        
+    except FileNotFoundError:
+        return jsonify({'success': False, 'error': 'Collection daemon status not found (is it running?)'}), 404
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/routers/circuit-breakers', methods=['GET'])
+def get_circuit_breakers():
+    """Routers currently skipped as unreachable, with when they are retried"""
+    try:
+        breakers = sync_circuit_breakers()
+        return jsonify({'success': True, **breakers.summary()})
+        
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -484,6 +580,9 @@ if __name__ == '__main__':
     print("✅ Dynamic interface loading from database")
     print("✅ Credentials from database")
     print("✅ Single SSH session for all commands")
+    print("✅ Pooled SSH sessions reused across requests")
+    print("✅ Pooled database connections")
+    print("✅ Unreachable routers skipped by circuit breaker")
     print("="*60 + "\n")
     
     app.run(
@@ -0,0 +1,160 @@
+"""
+Benchmark: Collection cycle time vs fleet size
+Compares the old ThreadPoolExecutor(max_workers=5) fan-out with CollectionEngine
+against the Tejas CLI simulator: both run the real
+TejasRouterMonitor.monitor_router (connect, auth, shell, OSPF, BGP, SFP
+info/stats per interface, parsing) over SSH; readings are counted, not stored
+(no routers or database needed)
+
+--sleep swaps monitor_router for a time.sleep stand-in with the same number of
+commands. That is a scheduler-overhead microbenchmark only: no SSH, no
+parsing, so it shows what the fan-out itself costs, not collection speed.
+
+Usage:
+    python benchmarks/bench_collection_engine.py
+    python benchmarks/bench_collection_engine.py --fleet-sizes 20,50,100 --latency 0.02
+    python benchmarks/bench_collection_engine.py --sleep --fleet-sizes 100,500,1000
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The monitor refuses to import without a DB password; this benchmark never connects
+os.environ.setdefault('DB_PASSWORD', 'benchmark')
+
+from bench_ssh_end_to_end import CountingDatabaseManager
+from tejas_simulator import SimulatorConfig, TejasSimulatorFleet
+from collection_engine import CollectionEngine, CollectionJob
+from tejas_router_monitor_v2_fixed import TejasRouterMonitor
+
+
+def sleep_monitor_router(router, interfaces, latency, jitter):
+    """Stand-in for monitor_router: blocks like SSH reads do, returns the same result shape"""
+    rng = random.Random(router['id'])
+    commands = 2 + 2 * len(interfaces)
+
+    for _ in range(commands):
+        time.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+
+    return {
+        'router': router['hostname'],
+        'ospf': {'neighbor_count': 2, 'neighbors': []},
+        'bgp': {'bgp_neighbor_count': 2},
+        'interfaces': {iface['interface_name']: {} for iface in interfaces}
+    }
+
+
+def sleep_fleet(size, interfaces_per_router):
+    fleet = []
+    for router_id in range(1, size + 1):
+        router = {'id': router_id, 'hostname': f"SIM-RTR-{router_id:04d}"}
+        interfaces = [
+            {'interface_name': f"1/1/{i}", 'interface_label': f"LINK-{i}"}
+            for i in range(1, interfaces_per_router + 1)
+        ]
+        fleet.append((router, interfaces))
+    return fleet
+
+
+def summary(result):
+    """What a cycle collected from one router (SFP readings vary per call, so counts only)"""
+    return (
+        result['ospf'].get('neighbor_count'),
+        result['bgp'].get('bgp_neighbor_count'),
+        tuple(sorted(result['interfaces']))
+    )
+
+
+def run_threadpool(fleet, monitor, workers, *args):
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(monitor, router, interfaces, *args) for router, interfaces in fleet]
+        for future in futures:
+            try:
+                result = future.result()
+            except Exception:
+                continue
+            if not result.get('error'):
+                results[result['router']] = summary(result)
+    return results
+
+
+def run_engine(fleet, monitor, global_concurrency, *args):
+    jobs = [CollectionJob(router['id'], monitor, router, interfaces, *args) for router, interfaces in fleet]
+    engine = CollectionEngine(global_concurrency=global_concurrency, per_router_concurrency=1)
+    return {
+        job.result['router']: summary(job.result)
+        for job in engine.run(jobs) if job.ok and not job.result.get('error')
+    }
+
+
+def timed(func, *args):
+    start = time.monotonic()
+    result = func(*args)
+    return result, time.monotonic() - start
+
+
+def compare(size, fleet, monitor, budgets, *args):
+    """One ThreadPoolExecutor(5) cycle, then one engine cycle per budget"""
+    baseline, elapsed = timed(run_threadpool, fleet, monitor, 5, *args)
+    print(f"{size:>8} {'ThreadPoolExecutor(5)':<24} {elapsed:>10.2f} {size/elapsed:>10.1f} {len(baseline):>9}")
+
+    for budget in budgets:
+        results, elapsed = timed(run_engine, fleet, monitor, budget, *args)
+        same = "✅" if results == baseline else "❌ results differ"
+        print(f"{size:>8} {f'engine(global={budget})':<24} {elapsed:>10.2f} {size/elapsed:>10.1f} "
+              f"{len(results):>9}  {same}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fleet-sizes', default=None, help='default 20,50 (--sleep: 50,200,500)')
+    parser.add_argument('--base-port', type=int, default=23200)
+    parser.add_argument('--interfaces', type=int, default=4, help='monitored interfaces per router')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per command')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--budgets', default='5,25,50', help='engine global concurrency values')
+    parser.add_argument('--sleep', action='store_true',
+                        help='time.sleep stand-in instead of SSH (scheduler overhead only)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    fleet_sizes = [int(x) for x in (args.fleet_sizes or ('50,200,500' if args.sleep else '20,50')).split(',')]
+    budgets = [int(x) for x in args.budgets.split(',')]
+
+    print("\n" + "="*80)
+    if args.sleep:
+        print("📊 COLLECTION ENGINE BENCHMARK (time.sleep stand-in: scheduler overhead only, no SSH)")
+    else:
+        print("📊 COLLECTION ENGINE BENCHMARK (Tejas CLI simulator, real monitor_router over SSH)")
+    print(f"   {args.interfaces} interfaces/router, {args.latency*1000:.0f}±{args.jitter*1000:.0f} ms/command")
+    print("="*80)
+    print(f"{'routers':>8} {'mode':<24} {'cycle (s)':>10} {'routers/s':>10} {'complete':>9}")
+    print("-"*80)
+
+    base_port = args.base_port
+    for size in fleet_sizes:
+        if args.sleep:
+            compare(size, sleep_fleet(size, args.interfaces), sleep_monitor_router, budgets,
+                    args.latency, args.jitter)
+        else:
+            config = SimulatorConfig(latency=args.latency, jitter=args.jitter, interfaces=args.interfaces)
+            # Fresh ports per fleet, so a stopped fleet's sockets can't collide with the next
+            with TejasSimulatorFleet(size, base_port, config) as fleet:
+                compare(size, fleet.inventory(), TejasRouterMonitor.monitor_router, budgets,
+                        CountingDatabaseManager())
+            base_port += size
+
+        print("-"*80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+Benchmark: Collection queue sweep time vs number of worker processes
+Starts 1, 2, 4... QueueWorker processes against one collection queue and
+the Tejas CLI simulator, makes every job due at once and times how long
+the workers take to poll the whole fleet; readings are counted, not stored
+
+By default the queue is the Postgres one (DB_* settings from .env): its
+tables are created in a scratch schema (bench_collection_queue) that is
+dropped at the end. With --memory-queue no database is needed: the queue
+lives in a multiprocessing manager process and the workers claim,
+renew and complete through it, with the same lease and due-time rules as
+database/collection_queue.sql. That measures the worker side (claiming,
+polling over SSH, completing) without Postgres.
+
+Usage:
+    python benchmarks/bench_collection_queue.py
+    python benchmarks/bench_collection_queue.py --memory-queue
+    python benchmarks/bench_collection_queue.py --routers 200 --workers 1,2,4,8 --concurrency 5
+"""
+
+import os
+import sys
+import math
+import time
+import logging
+import argparse
+import threading
+import multiprocessing
+from multiprocessing.managers import BaseManager
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tejas_simulator import SimulatorConfig, TejasSimulatorFleet
+from fleet_inventory import FleetInventory
+from collection_queue import QueueWorker
+from router_circuit_breaker import get_breakers
+from tejas_router_monitor_v2_fixed import DB_CONFIG, TejasRouterMonitor
+
+SCHEMA = 'bench_collection_queue'
+QUEUE_SQL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'database', 'collection_queue.sql')
+
+
+class CountingDatabaseManager:
+    """Stands in for DatabaseManager in a worker process, keeps only counts"""
+
+    class _Writer:
+        def flush(self):
+            pass
+
+        def log_stats(self):
+            pass
+
+    conn = None     # no database: breaker sync is skipped
+
+    def __init__(self):
+        self.readings = 0
+        self.writer = self._Writer()
+
+    def connect(self):
+        pass
+
+    def close(self):
+        pass
+
+    def save_reading(self, router_id, interface_id, parameter_name, reading_data, raw_output):
+        self.readings += 1
+        return True
+
+    def save_sfp_metrics(self, router_id, interface_id, sfp_stats_data):
+        pass
+
+
+def fleet_inventory(inventory):
+    # Every parameter once an hour: each job is due exactly once per sweep
+    parameters = [
+        {'parameter_name': name, 'poll_interval_seconds': 3600,
+         'applies_to': 'INTERFACE' if name in TejasRouterMonitor.INTERFACE_COMMANDS else 'ROUTER'}
+        for name in TejasRouterMonitor.PARAMETERS
+    ]
+    return FleetInventory([router for router, _ in inventory],
+                          {router['id']: interfaces for router, interfaces in inventory}, parameters)
+
+
+class PostgresQueue:
+    """The real queue, in a scratch schema"""
+
+    def __init__(self, config, inventory, intervals, interface_ids):
+        self.config = config
+        self.conn = psycopg2.connect(**config)
+        cursor = self.conn.cursor()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+        cursor.execute(f"SET search_path TO {SCHEMA}, public")
+        cursor.execute("CREATE TABLE routers (id INTEGER PRIMARY KEY, hostname VARCHAR(100))")
+        execute_values(cursor, "INSERT INTO routers (id, hostname) VALUES %s",
+                       [(router['id'], router['hostname']) for router, _ in inventory])
+        with open(QUEUE_SQL) as f:
+            cursor.execute(f.read())
+        self.conn.commit()
+        cursor.close()
+
+        # One sync up front so every run starts from the same jobs
+        seeder = QueueWorker(config, command_budget=0)
+        seeder.queue_conn = self.conn
+        seeder.sync_queue(fleet_inventory(inventory), intervals, interface_ids)
+
+    def reset(self):
+        """Everything due now, counters cleared"""
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE collection_jobs SET due_at = LOCALTIMESTAMP, runs = 0, failures = 0, skipped = 0")
+        cursor.execute("UPDATE collection_routers SET due_at = LOCALTIMESTAMP, lease_owner = NULL, "
+                       "lease_expires_at = NULL, claims = 0")
+        cursor.execute("DELETE FROM collection_workers")
+        self.conn.commit()
+        cursor.close()
+
+    def counts(self):
+        """(jobs not run yet, runs, failed runs, router claims)"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FILTER (WHERE runs = 0), SUM(runs), SUM(failures) FROM collection_jobs")
+        pending, runs, failures = cursor.fetchone()
+        cursor.execute("SELECT SUM(claims) FROM collection_routers")
+        claims = cursor.fetchone()[0]
+        self.conn.commit()
+        cursor.close()
+        return pending, runs, failures, claims
+
+    def worker(self, **kwargs):
+        return QueueWorker(self.config, **kwargs)
+
+    def close(self):
+        self.conn.rollback()
+        cursor = self.conn.cursor()
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        self.conn.commit()
+        self.conn.close()
+
+
+class MemoryQueue:
+    """
+    collection_routers / collection_jobs in memory, served to the worker
+    processes by a manager process; one lock stands in for the row locks
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routers = {}   # router_id -> {'due_at', 'lease_owner', 'lease_expires_at', 'claims'}
+        self.jobs = {}      # (router_id, parameter, tier) -> {'interval', 'interface_ids', 'due_at', 'runs', 'failures'}
+
+    def load(self, jobs):
+        """jobs: [(router_id, parameter, tier, interval, interface ids)], all due now"""
+        with self._lock:
+            for router_id, parameter, tier, interval, interface_ids in jobs:
+                self.routers.setdefault(router_id, {'due_at': 0, 'lease_owner': None,
+                                                    'lease_expires_at': None, 'claims': 0})
+                self.jobs[(router_id, parameter, tier)] = {'interval': interval, 'interface_ids': interface_ids,
+                                                           'due_at': 0, 'runs': 0, 'failures': 0}
+
+    def reset(self):
+        now = time.monotonic()
+        with self._lock:
+            for job in self.jobs.values():
+                job.update(due_at=now, runs=0, failures=0)
+            for router in self.routers.values():
+                router.update(due_at=now, lease_owner=None, lease_expires_at=None, claims=0)
+
+    def claim(self, worker_id, limit, lease):
+        """claim_collection_routers: {router_id: [(parameter, tier, interface ids)]}"""
+        now = time.monotonic()
+        with self._lock:
+            due = sorted(
+                (router['due_at'], router_id) for router_id, router in self.routers.items()
+                if router['due_at'] <= now and (router['lease_expires_at'] is None or router['lease_expires_at'] < now)
+            )[:limit]
+            claimed = {}
+            for _, router_id in due:
+                self.routers[router_id].update(lease_owner=worker_id, lease_expires_at=now + lease)
+                self.routers[router_id]['claims'] += 1
+                claimed[router_id] = [(parameter, tier, job['interface_ids'])
+                                      for (job_router, parameter, tier), job in self.jobs.items()
+                                      if job_router == router_id and job['due_at'] <= now]
+            return claimed
+
+    def complete(self, worker_id, router_id, keys, error=None):
+        """complete_collection_router: False, changing nothing, if worker_id lost the lease"""
+        now = time.monotonic()
+        with self._lock:
+            router = self.routers[router_id]
+            if router['lease_owner'] != worker_id:
+                return False
+            for parameter, tier in keys:
+                job = self.jobs[(router_id, parameter, tier)]
+                job['runs'] += 1
+                job['failures'] += error is not None
+                job['due_at'] += max(1, math.ceil((now - job['due_at']) / job['interval'])) * job['interval']
+            router.update(lease_owner=None, lease_expires_at=None,
+                          due_at=min((job['due_at'] for (job_router, *_), job in self.jobs.items()
+                                      if job_router == router_id), default=now + 60))
+            return True
+
+    def renew(self, worker_id, router_ids, lease):
+        now = time.monotonic()
+        with self._lock:
+            for router_id in router_ids:
+                if self.routers[router_id]['lease_owner'] == worker_id:
+                    self.routers[router_id]['lease_expires_at'] = now + lease
+
+    def release(self, worker_id):
+        with self._lock:
+            for router in self.routers.values():
+                if router['lease_owner'] == worker_id:
+                    router.update(lease_owner=None, lease_expires_at=None)
+
+    def counts(self):
+        with self._lock:
+            return (sum(1 for job in self.jobs.values() if not job['runs']),
+                    sum(job['runs'] for job in self.jobs.values()),
+                    sum(job['failures'] for job in self.jobs.values()),
+                    sum(router['claims'] for router in self.routers.values()))
+
+
+class QueueManager(BaseManager):
+    pass
+
+
+QueueManager.register('MemoryQueue', MemoryQueue)
+
+
+class MemoryQueueWorker(QueueWorker):
+    """QueueWorker whose queue statements go to a MemoryQueue instead of Postgres"""
+
+    class _Connection:
+        closed = False
+
+        def close(self):
+            pass
+
+    def __init__(self, queue, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue = queue
+
+    def connect_queue(self):
+        self.queue_conn = self._Connection()
+
+    def sync_queue(self, inventory, intervals, interface_ids):
+        return False    # loaded once by the benchmark
+
+    def claim(self, limit):
+        return self.queue.claim(self.worker_id, limit, self.lease)
+
+    def complete(self, router_id, jobs, error=None):
+        return self.queue.complete(self.worker_id, router_id, [job[:2] for job in jobs], error)
+
+    def renew(self):
+        self.queue.renew(self.worker_id, [router_id for router_id, _ in self.futures.values()], self.lease)
+
+    def leave(self):
+        self.queue.release(self.worker_id)
+
+
+class MemoryQueueBackend:
+    def __init__(self, config, intervals, interface_ids):
+        self.config = config
+        self.manager = QueueManager()
+        self.manager.start()
+        self.queue = self.manager.MemoryQueue()
+        self.queue.load([key + (interval, interface_ids.get(key)) for key, interval in intervals.items()])
+
+    def reset(self):
+        self.queue.reset()
+
+    def counts(self):
+        return self.queue.counts()
+
+    def worker(self, **kwargs):
+        return MemoryQueueWorker(self.queue, self.config, **kwargs)
+
+    def close(self):
+        self.manager.shutdown()
+
+
+def worker_process(backend, inventory, concurrency, stop):
+    logging.getLogger().setLevel(logging.WARNING)
+    worker = backend.worker(concurrency=concurrency, idle=0.05, reload_interval=3600, command_budget=0)
+    worker.db_manager = CountingDatabaseManager()
+    worker.load_inventory = lambda: fleet_inventory(inventory)
+    get_breakers().enabled = False    # every simulated router is up; no breaker table in the scratch schema
+
+    threading.Thread(target=lambda: (stop.wait(), worker.stop_event.set()), daemon=True).start()
+    worker.run()
+
+
+def run_sweep(backend, inventory, workers, concurrency):
+    backend.reset()
+    stop = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(target=worker_process, args=(backend, inventory, concurrency, stop))
+        for _ in range(workers)
+    ]
+
+    start = time.monotonic()
+    for process in processes:
+        process.start()
+    while True:
+        pending, runs, failures, claims = backend.counts()
+        if not pending:
+            break
+        time.sleep(0.05)
+    elapsed = time.monotonic() - start
+
+    stop.set()
+    for process in processes:
+        process.join()
+    return elapsed, runs, failures, claims
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--routers', type=int, default=100)
+    parser.add_argument('--base-port', type=int, default=22400)
+    parser.add_argument('--interfaces', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds per command')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--workers', default='1,2,4', help='worker process counts')
+    parser.add_argument('--concurrency', type=int, default=5, help='routers polled at once per worker')
+    parser.add_argument('--memory-queue', action='store_true', help='in-memory queue, no database needed')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    config = dict(DB_CONFIG, options=f'-c search_path={SCHEMA},public')
+    sim_config = SimulatorConfig(latency=args.latency, jitter=args.jitter, interfaces=args.interfaces)
+    counts = [int(x) for x in args.workers.split(',')]
+
+    with TejasSimulatorFleet(args.routers, args.base_port, sim_config) as fleet:
+        inventory = fleet.inventory()
+        intervals, interface_ids = QueueWorker(config, command_budget=0).plan(fleet_inventory(inventory))
+        if args.memory_queue:
+            backend = MemoryQueueBackend(config, intervals, interface_ids)
+        else:
+            backend = PostgresQueue(config, inventory, intervals, interface_ids)
+
+        try:
+            print("\n" + "="*80)
+            print(f"📊 COLLECTION QUEUE BENCHMARK "
+                  f"({'in-memory queue' if args.memory_queue else 'Postgres SKIP LOCKED'} + Tejas CLI simulator)")
+            print(f"   {args.routers} routers, {args.interfaces} interfaces/router, "
+                  f"{args.latency*1000:.0f}±{args.jitter*1000:.0f} ms/command, "
+                  f"{args.concurrency} routers at once per worker, {len(intervals)} jobs")
+            print("="*80)
+            print(f"{'workers':>8} {'sweep (s)':>10} {'routers/s':>10} {'speedup':>8} "
+                  f"{'jobs run':>9} {'failed':>7} {'claims':>7}")
+            print("-"*80)
+
+            baseline = None
+            for workers in counts:
+                elapsed, runs, failures, claims = run_sweep(backend, inventory, workers, args.concurrency)
+                baseline = baseline or elapsed
+                print(f"{workers:>8} {elapsed:>10.2f} {args.routers/elapsed:>10.1f} {baseline/elapsed:>7.1f}x "
+                      f"{runs:>9} {failures:>7} {claims:>7}")
+
+            print("-"*80)
+            print("claims > routers means a lease was re-claimed; jobs run > jobs means a job ran twice")
+        finally:
+            backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Benchmark: Parse throughput per output
+Compares the per-call re.search(pattern_string) parsing the monitors used to
+do with the precompiled parser registry, and the per-field SFP regex parsers
+with the single-pass sfp_output_extractor, and the per-line prefix scans of
+the OSPF/BGP neighbor tables with cli_table_parser
+
+The ParameterParser row only saves re's own pattern-cache lookup per field,
+so expect it near 1x: the regex search itself dominates. The registry is
+there so invalid patterns are rejected once at load, not for speed.
+
+Outputs come from the Tejas CLI simulator (optionally padded with extra
+Key : Value lines to mimic large captures) or from captured raw_output files;
+parsers are the TEJAS_* rows from database/tejas_commands_schema.sql
+(no routers or database needed).
+
+Usage:
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --iterations 20000 --padding-lines 200
+    python benchmarks/bench_parsers.py --table-rows 2000    # neighbor table size
+    python benchmarks/bench_parsers.py --raw-dir captures/   # one raw_output per file
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The monitor refuses to import without a DB password; this benchmark never connects
+os.environ.setdefault('DB_PASSWORD', 'benchmark')
+
+from tejas_simulator import TejasOutputs
+from router_multi_parameter_monitor import ParameterParser
+from tejas_router_monitor_v2_fixed import TejasCommandParser
+from tejas_router_monitor import TejasCommandParser as TableParser
+import parser_registry
+import sfp_output_extractor
+
+SFP_INFO_PARSERS = [
+    ('parent_interface', r'Parent\s*:\s*(.+)', 'string'),
+    ('laser_status', r'MSA Laser Status\s*:\s*(\w+)', 'string'),
+    ('present_status', r'Present Status\s*:\s*(\w+)', 'string'),
+    ('operational_status', r'Operational Status\s*:\s*(\w+)', 'string'),
+    ('laser_type', r'Laser Type\s*:\s*(.+)', 'string'),
+    ('als_mode', r'ALS Mode\s*:\s*(\w+)', 'string'),
+    ('distance_range', r'Distance Range\s*:\s*(\d+)', 'number'),
+    ('nominal_bit_rate', r'Nominal Bit Rate.*?:\s*([\d.]+)', 'number'),
+    ('rx_power', r'RxPower\s*:\s*([-\d.]+)', 'number'),
+    ('tx_power', r'TxPower\s*:\s*([-\d.]+)', 'number'),
+    ('laser_coherent', r'Laser Coherent\s*:\s*(\w+)', 'string'),
+    ('module_temperature', r'Module Temperature.*?:\s*([-\d.]+)', 'number'),
+    ('module_voltage', r'Module Voltage.*?:\s*([-\d.]+)', 'number'),
+    ('product_code', r'Product Code\s*:\s*(.+)', 'string'),
+    ('serial_number', r'Serial Number\s*:\s*(.+)', 'string'),
+    ('vendor_name', r'Vendor Name\s*:\s*(.+)', 'string'),
+]
+
+
+def legacy_parse_output(output, parsers):
+    """ParameterParser.parse_output before the registry (pattern strings, flags per call)"""
+    result = {}
+    for parser in parsers:
+        match = re.search(parser['regex_pattern'], output, re.IGNORECASE)
+        if match:
+            value = match.group(1).strip()
+            if parser['data_type'] == 'number':
+                try:
+                    value = float(value.replace(',', ''))
+                except ValueError:
+                    pass
+            result[parser['field_name']] = value
+        else:
+            result[parser['field_name']] = "N/A"
+    return result
+
+
+def legacy_parse_sfp_100g_info(output):
+    """TejasCommandParser.parse_sfp_100g_info before (pattern dict rebuilt per call)"""
+    result = {}
+    fields = {
+        'laser_status': r'MSA Laser Status\s*:\s*(\w+)',
+        'operational_status': r'Operational Status\s*:\s*(\w+)',
+        'laser_type': r'Laser Type\s*:\s*(.+)',
+        'rx_power': r'RxPower\s*:\s*([-\d.]+)',
+        'tx_power': r'TxPower\s*:\s*([-\d.]+)',
+        'module_temperature': r'Module Temperature.*?:\s*([-\d.]+)',
+        'module_voltage': r'Module Voltage.*?:\s*([-\d.]+)',
+        'serial_number': r'Serial Number\s*:\s*(.+)',
+        'vendor_name': r'Vendor Name\s*:\s*(.+)'
+    }
+    for field, pattern in fields.items():
+        match = re.search(pattern, output)
+        result[field] = match.group(1).strip() if match else 'N/A'
+    return result
+
+
+def legacy_parse_sfp_100g_info_full(output):
+    """All 16 SFP info fields, one whole-output regex search each"""
+    result = {}
+    for name, pattern, _ in SFP_INFO_PARSERS:
+        match = re.search(pattern, output)
+        result[name] = match.group(1).strip() if match else 'N/A'
+    return result
+
+
+def legacy_parse_sfp_100g_stats(output):
+    """tejas_router_monitor parse_sfp_100g_stats before (one search per group)"""
+    result = {}
+    match = re.search(r'CURRENT COUNTERS \((\d+)\)secs', output)
+    if match:
+        result['interval_seconds'] = match.group(1)
+    for prefix, label, average in (('rx_power', 'Received Power', True), ('tx_power', 'Transmit Power', True),
+                                   ('bias_current', 'Tx Laser Bias Current', False)):
+        match = re.search(label + r'.*?0=([-\d.]+);1=([-\d.]+);2=([-\d.]+);3=([-\d.]+)', output)
+        if match:
+            for lane in range(4):
+                result[f'{prefix}_lane{lane}'] = match.group(lane + 1)
+            if average:
+                values = [float(match.group(i)) for i in range(1, 5)]
+                result[f'{prefix}_avg'] = str(round(sum(values) / len(values), 4))
+    for name, pattern in (('module_voltage', r'Module Voltage.*?:\s*([-\d.]+)'),
+                          ('module_temperature', r'Module Temperature.*?:\s*([-\d.]+)'),
+                          ('interval_valid', r'Interval Valid\s*:\s*(\d+)')):
+        match = re.search(pattern, output)
+        if match:
+            result[name] = match.group(1)
+    return result
+
+
+def legacy_parse_ospf_neighbors(output):
+    """tejas_router_monitor_v2_fixed parse_ospf_neighbors before (searches the output per line)"""
+    neighbors = []
+    in_table = False
+    for line in output.split('\n'):
+        if '---' in line and 'Neighbor-ID' in output[:output.index(line)] if line in output else False:
+            in_table = True
+            continue
+        if in_table and line.strip():
+            parts = line.split()
+            if len(parts) >= 11 and re.match(r'^\d+\.\d+\.\d+\.\d+$', parts[0]):
+                neighbors.append(dict(zip(TableParser.OSPF_NEIGHBOR_FIELDS, parts)))
+    return {'neighbor_count': len(neighbors), 'neighbors': neighbors}
+
+
+def legacy_bgp_neighbors(output):
+    """BGP neighbor table part of parse_bgp_summary before (prefix rescan per '---' line)"""
+    neighbors = []
+    in_table = False
+    for line in output.split('\n'):
+        if '---' in line and 'Neighbor' in output[:output.index(line)]:
+            in_table = True
+            continue
+        if in_table and line.strip():
+            parts = line.split()
+            if len(parts) >= 8 and re.match(r'^\d+\.\d+\.\d+\.\d+$', parts[1]):
+                neighbor = dict(zip(TableParser.BGP_NEIGHBOR_FIELDS, parts[:8]))
+                neighbor['updown_count'] = parts[8] if len(parts) > 8 else 'N/A'
+                neighbors.append(neighbor)
+    return neighbors
+
+
+def bgp_neighbors(output):
+    return TableParser.parse_bgp_summary(output)['bgp_neighbors']
+
+
+def pad(output, lines, rng):
+    """Insert threshold/alarm style Key : Value lines, as seen on real captures"""
+    if not lines:
+        return output
+    rows = output.split("\r\n")
+    for i in range(lines):
+        rows.insert(rng.randrange(1, len(rows)),
+                    f"Threshold {i:<4} Warning Level          : {rng.uniform(-30, 80):.4f}")
+    return "\r\n".join(rows)
+
+
+def load_captures(raw_dir):
+    """Captured raw_output files; stats captures are the ones with CURRENT COUNTERS"""
+    info, stats = [], []
+    for name in sorted(os.listdir(raw_dir)):
+        with open(os.path.join(raw_dir, name), errors='replace') as f:
+            text = f.read()
+        (stats if 'CURRENT COUNTERS' in text else info).append(text)
+    return info, stats
+
+
+def _run(func, outputs, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(outputs[i % len(outputs)])
+    return time.perf_counter() - start
+
+
+def measure(before, after, outputs, iterations, repeat=5):
+    """
+    (outputs/s, µs/output) for before and after: best of `repeat` runs each,
+    interleaved so both see the same machine load
+    """
+    best = [None, None]
+    for _ in range(repeat):
+        for side, func in enumerate((before, after)):
+            elapsed = _run(func, outputs, iterations)
+            best[side] = elapsed if best[side] is None else min(best[side], elapsed)
+    return [(iterations / elapsed, elapsed / iterations * 1e6) for elapsed in best]
+
+
+def report(name, before, after, same):
+    (before_rate, before_us), (after_rate, after_us) = before, after
+    if not same:
+        check = "❌ results differ"
+    elif after_rate < before_rate * 0.95:
+        check = "⚠️  slower"
+    elif after_rate < before_rate * 1.05:
+        check = "≈ no faster"
+    else:
+        check = "✅"
+    print(f"{name:<34} {before_rate:>12,.0f} {after_rate:>12,.0f} {before_us:>9.1f} {after_us:>9.1f} "
+          f"{before_rate and after_rate / before_rate:>7.2f}x  {check}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--samples', type=int, default=64, help='distinct outputs to cycle through')
+    parser.add_argument('--padding-lines', type=int, default=0, help='extra Key : Value lines per output')
+    parser.add_argument('--table-rows', type=int, default=500, help='neighbors per OSPF/BGP table')
+    parser.add_argument('--raw-dir', help='directory of captured raw_output files instead of simulated ones')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    if args.raw_dir:
+        sfp_outputs, stats_outputs = load_captures(args.raw_dir)
+    else:
+        sfp_outputs = [
+            pad(TejasOutputs.sfp_100g_info(i, f"1/1/{i % 8 + 1}", rng), args.padding_lines, rng)
+            for i in range(args.samples)
+        ]
+        stats_outputs = [
+            pad(TejasOutputs.sfp_100g_stats(i, f"1/1/{i % 8 + 1}", rng), args.padding_lines, rng)
+            for i in range(args.samples)
+        ]
+
+    rows = [
+        {'id': i, 'field_name': name, 'regex_pattern': pattern, 'data_type': data_type, 'unit': ''}
+        for i, (name, pattern, data_type) in enumerate(SFP_INFO_PARSERS, 1)
+    ]
+    compiled = parser_registry.parameter_parsers.load(rows)
+
+    print("\n" + "="*100)
+    print("📊 PARSER BENCHMARK (outputs/s and µs/output)")
+    print(f"   {len(sfp_outputs)} info / {len(stats_outputs)} stats outputs, "
+          f"avg {sum(map(len, sfp_outputs + stats_outputs)) // max(len(sfp_outputs + stats_outputs), 1)} bytes")
+    print("="*100)
+    print(f"{'parser':<34} {'before/s':>12} {'after/s':>12} {'before µs':>9} {'after µs':>9} {'speedup':>8}")
+    print("-"*100)
+
+    if not sfp_outputs:
+        sfp_outputs = [TejasOutputs.sfp_100g_info(1, "1/1/1", rng)]
+
+    same = all(legacy_parse_output(o, rows) == ParameterParser.parse_output(o, compiled) for o in sfp_outputs)
+    report(
+        "ParameterParser (SFP info, 16)",
+        *measure(
+            lambda o: legacy_parse_output(o, rows),
+            lambda o: ParameterParser.parse_output(o, compiled),
+            sfp_outputs, args.iterations
+        ),
+        same
+    )
+
+    same = all(legacy_parse_sfp_100g_info(o) == TejasCommandParser.parse_sfp_100g_info(o) for o in sfp_outputs)
+    report(
+        "TejasCommandParser.sfp_100g_info",
+        *measure(
+            legacy_parse_sfp_100g_info,
+            TejasCommandParser.parse_sfp_100g_info,
+            sfp_outputs, args.iterations
+        ),
+        same
+    )
+
+    if sfp_outputs:
+        same = all(legacy_parse_sfp_100g_info_full(o) == sfp_output_extractor.extract_sfp_100g_info(o)
+                   for o in sfp_outputs)
+        report(
+            "SFP info, 16 fields (single pass)",
+            *measure(
+                legacy_parse_sfp_100g_info_full,
+                sfp_output_extractor.extract_sfp_100g_info,
+                sfp_outputs, args.iterations
+            ),
+            same
+        )
+
+    if stats_outputs:
+        same = all(legacy_parse_sfp_100g_stats(o) == sfp_output_extractor.extract_sfp_100g_stats(o)
+                   for o in stats_outputs)
+        report(
+            "SFP stats, all lanes (single pass)",
+            *measure(
+                legacy_parse_sfp_100g_stats,
+                sfp_output_extractor.extract_sfp_100g_stats,
+                stats_outputs, args.iterations
+            ),
+            same
+        )
+
+    table_samples = max(args.samples // 8, 1)
+    table_iterations = max(args.iterations // 100, 10)
+    ospf_outputs = [TejasOutputs.ospf_neighbors(i, args.table_rows) for i in range(table_samples)]
+    bgp_outputs = [TejasOutputs.bgp_summary(i, args.table_rows) for i in range(table_samples)]
+
+    same = all(legacy_parse_ospf_neighbors(o) == TableParser.parse_ospf_neighbors(o) for o in ospf_outputs)
+    report(
+        f"OSPF neighbors ({args.table_rows} rows)",
+        *measure(
+            legacy_parse_ospf_neighbors,
+            TableParser.parse_ospf_neighbors,
+            ospf_outputs, table_iterations
+        ),
+        same
+    )
+
+    same = all(legacy_bgp_neighbors(o) == bgp_neighbors(o) for o in bgp_outputs)
+    report(
+        f"BGP neighbors ({args.table_rows} rows)",
+        *measure(
+            legacy_bgp_neighbors,
+            bgp_neighbors,
+            bgp_outputs, table_iterations
+        ),
+        same
+    )
+
+    print("-"*100)
+
+
+if __name__ == "__main__":
+    main()
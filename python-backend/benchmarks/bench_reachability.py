@@ -0,0 +1,145 @@
+"""
+Benchmark: TCP reachability sweep vs fleet size
+Sweeps a simulated fleet where most routers accept on their SSH port,
+some refuse and some never answer (full listen backlog), and reports the
+sweep time and how many down routers it found; compares with one `ping`
+subprocess per router (lib/ping-monitor.js) when ping is installed
+
+Usage:
+    python benchmarks/bench_reachability.py
+    python benchmarks/bench_reachability.py --fleet-sizes 1000,5000,10000 --down 0.05 --timeout 0.5
+"""
+
+import os
+import sys
+import time
+import shutil
+import socket
+import asyncio
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import reachability_prober
+
+
+def listener(backlog=4096):
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(backlog)
+    return sock
+
+
+def accept_forever(sock):
+    while True:
+        try:
+            conn, _ = sock.accept()
+        except OSError:
+            return
+        conn.close()
+
+
+def simulated_ports():
+    """(up port, refused port, hung port) on 127.0.0.1"""
+    up = listener()
+    threading.Thread(target=accept_forever, args=(up,), daemon=True).start()
+
+    refused = listener()
+    refused_port = refused.getsockname()[1]
+    refused.close()
+
+    # Never accepted and already full: further SYNs are dropped, like a dead host
+    hung = listener(backlog=0)
+    fillers = []
+    while True:
+        try:
+            fillers.append(socket.create_connection(hung.getsockname(), timeout=0.2))
+        except OSError:
+            break
+
+    return up.getsockname()[1], refused_port, hung.getsockname()[1], (up, hung, fillers)
+
+
+def build_targets(size, down, up_port, refused_port, hung_port):
+    targets = []
+    down_count = int(size * down)
+    for router_id in range(1, size + 1):
+        if router_id <= down_count // 2:
+            port = refused_port
+        elif router_id <= down_count:
+            port = hung_port
+        else:
+            port = up_port
+        targets.append((router_id, '127.0.0.1', port))
+    return targets, down_count
+
+
+async def ping_each(hosts, concurrency):
+    """One `ping -c 1` subprocess per host, the way lib/ping-monitor.js does it"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def ping(host):
+        async with semaphore:
+            process = await asyncio.create_subprocess_exec(
+                'ping', '-c', '1', '-W', '1', host,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+            )
+            return await process.wait() == 0
+
+    return await asyncio.gather(*(ping(host) for host in hosts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fleet-sizes', default='100,1000,5000')
+    parser.add_argument('--down', type=float, default=0.05, help='fraction of routers down')
+    parser.add_argument('--timeout', type=float, default=reachability_prober.REACHABILITY_TIMEOUT)
+    parser.add_argument('--attempts', type=int, default=reachability_prober.REACHABILITY_ATTEMPTS)
+    parser.add_argument('--concurrency', type=int, default=reachability_prober.REACHABILITY_CONCURRENCY)
+    parser.add_argument('--ssh-timeout', type=float, default=10, help='paramiko connect timeout, for comparison')
+    args = parser.parse_args()
+
+    up_port, refused_port, hung_port, keep = simulated_ports()
+    sizes = [int(x) for x in args.fleet_sizes.split(',')]
+
+    print("\n" + "="*80)
+    print("📊 TCP REACHABILITY SWEEP BENCHMARK")
+    print(f"   {args.down:.0%} down (half refused, half silent), timeout {args.timeout * 1000:.0f} ms "
+          f"x {args.attempts} attempts, {args.concurrency} connects in flight")
+    print("="*80)
+    print(f"{'routers':>8} {'sweep (s)':>10} {'routers/s':>10} {'down found':>11} {'p50 rtt ms':>11} "
+          f"{'SSH-timeout cost (s)':>21}")
+    print("-"*80)
+
+    for size in sizes:
+        targets, down_count = build_targets(size, args.down, up_port, refused_port, hung_port)
+        start = time.monotonic()
+        results = asyncio.run(reachability_prober.sweep(
+            targets, timeout=args.timeout, attempts=args.attempts, concurrency=args.concurrency
+        ))
+        elapsed = time.monotonic() - start
+
+        found = sum(1 for result in results if not result.reachable)
+        rtts = sorted(result.rtt for result in results if result.rtt is not None)
+        p50 = rtts[len(rtts) // 2] if rtts else 0.0
+        # What the silent routers cost a 200-thread collector that only learns from paramiko
+        ssh_cost = (down_count - down_count // 2) * args.ssh_timeout / 200
+        print(f"{size:>8} {elapsed:>10.2f} {size / elapsed:>10.0f} {f'{found}/{down_count}':>11} "
+              f"{p50:>11.2f} {ssh_cost:>21.1f}")
+
+    print("-"*80)
+    if shutil.which('ping'):
+        hosts = ['127.0.0.1'] * min(sizes[0], 200)
+        start = time.monotonic()
+        asyncio.run(ping_each(hosts, args.concurrency))
+        elapsed = time.monotonic() - start
+        print(f"ping subprocess per router: {len(hosts)} routers in {elapsed:.2f}s "
+              f"({len(hosts) / elapsed:.0f} routers/s, all up)")
+    else:
+        print("ping not installed: per-router subprocess comparison skipped")
+
+
+if __name__ == "__main__":
+    main()
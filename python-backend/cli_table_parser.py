@@ -0,0 +1,111 @@
+"""
+Fixed-Width CLI Table Parser
+Streams the rows of a Tejas `show` table (header line, dashed separator,
+rows) in one pass over the output: the header and separator are found once,
+after that every line is a row
+
+Columns come from the header line: names are separated by two or more
+spaces, and each column spans from its name to the start of the next one.
+Headers printed with single spaces between names ('Neighbor-ID Pri State')
+are split on every space instead, when the first row has more tokens than
+the two-space split found columns.
+A row with one token per column maps positionally (same as splitting on
+whitespace); otherwise each token goes to the column its start falls in,
+so empty cells come back as '' instead of shifting the rest of the row.
+"""
+
+import re
+from bisect import bisect_right
+
+HEADER_COLUMN_RE = re.compile(r'\S+(?: \S+)*')
+SEPARATOR_RE = re.compile(r'[ \t]*-{3,}[-+ \t]*\r?$')
+TOKEN_RE = re.compile(r'\S+')
+
+
+def header_columns(header, first_row=None):
+    """
+    [(name, start)] for a header line
+
+    With first_row given, a header whose two-space split has fewer columns
+    than the row has tokens is split on single whitespace instead (if that
+    doesn't give more columns than the row has tokens)
+    """
+    header = header.expandtabs()
+    columns = [(m.group(), m.start()) for m in HEADER_COLUMN_RE.finditer(header)]
+    if first_row is not None:
+        tokens = len(first_row.split())
+        if len(columns) < tokens:
+            words = [(m.group(), m.start()) for m in TOKEN_RE.finditer(header)]
+            if len(columns) < len(words) <= tokens:
+                return words
+    return columns
+
+
+def split_row(line, starts):
+    """Cells of one row, one per column start ('' for empty cells)"""
+    tokens = line.split()
+    if len(tokens) == len(starts):
+        return tokens
+
+    if '\t' in line:
+        line = line.expandtabs()
+    cells = [[] for _ in starts]
+    for match in TOKEN_RE.finditer(line):
+        column = max(bisect_right(starts, match.start()) - 1, 0)
+        cells[column].append(match.group())
+    return [' '.join(cell) for cell in cells]
+
+
+def is_separator(line):
+    """A dashed rule line ('-----', '---- ----', '--+--')"""
+    return SEPARATOR_RE.match(line) is not None
+
+
+def _find_header(lines, header_keyword):
+    """Consume lines up to the separator; the header line, or None"""
+    header = None
+    for line in lines:
+        line = line.rstrip('\r')
+        if header_keyword in line:
+            header = line
+        elif header is not None and is_separator(line):
+            return header
+    return None
+
+
+def iter_table(lines, header_keyword):
+    """
+    Yield (columns, cells) for every row of the table whose header contains
+    header_keyword
+
+    Args:
+        lines: any iterable of lines (trailing \\r is ignored)
+        header_keyword: text that identifies the header line, e.g. 'Neighbor-ID'
+    """
+    lines = iter(lines)
+    header = _find_header(lines, header_keyword)
+    if header is None:
+        return
+
+    columns = starts = None
+    for line in lines:
+        if line and not line.isspace():
+            if columns is None:
+                columns = header_columns(header, line)
+                starts = [start for _, start in columns]
+            yield columns, split_row(line, starts)
+
+
+def parse_table(output, header_keyword):
+    """All rows of the table as cell lists (see iter_table)"""
+    lines = iter(output.split('\n'))
+    header = _find_header(lines, header_keyword)
+    if header is None:
+        return []
+
+    rows = [line for line in lines if line and not line.isspace()]
+    if not rows:
+        return []
+
+    starts = [start for _, start in header_columns(header, rows[0])]
+    return [split_row(line, starts) for line in rows]
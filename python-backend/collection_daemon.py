@@ -0,0 +1,714 @@
+"""
+Collection Daemon
+Resident Tejas collector: polls every router/parameter pair on its own
+interval (monitoring_parameters.poll_interval_seconds) instead of one pass
+per process start
+
+Due polls come off a min-heap; the ones due together for a router share
+one SSH session. Each router polls at a fixed, hash-derived offset into
+its interval (evenly spaced within its site, routers.location) plus a
+little jitter, so load stays flat instead of bursting at the top of the
+minute, and at most COLLECTOR_PER_SITE_CONCURRENCY routers of one site
+are polled at once.
+
+Interfaces and parameters carry a priority tier (critical/high/normal/low)
+that scales the parameter's interval, and each router's schedule is kept
+under COLLECTOR_ROUTER_COMMAND_BUDGET SSH commands per minute by slowing
+the least urgent tiers first. The fleet inventory is reloaded every
+COLLECTOR_RELOAD_INTERVAL seconds (or on SIGHUP), so added, removed and
+re-credentialed routers and interfaces are picked up without a restart.
+Every COLLECTOR_REACHABILITY_INTERVAL seconds a background TCP sweep of
+the whole fleet (reachability_prober.py) updates router_ping_status, and
+routers it found down are not SSH'd until a sweep finds them up again.
+SIGTERM/SIGINT stop new polls, wait for the running ones and flush the
+writers. Per-job lag is written to COLLECTOR_STATUS_FILE (served by app.py
+at /api/collector/status).
+
+Usage:
+    python collection_daemon.py
+"""
+
+import os
+import json
+import math
+import time
+import zlib
+import heapq
+import signal
+import logging
+import itertools
+import threading
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import psycopg2
+from dotenv import load_dotenv
+
+import reachability_prober
+from collection_engine import COLLECTOR_GLOBAL_CONCURRENCY, COLLECTOR_SKIP_UNREACHABLE
+from fleet_inventory import load_fleet_inventory
+from router_circuit_breaker import get_breakers
+from tejas_router_monitor_v2_fixed import DB_CONFIG, DatabaseManager, TejasRouterMonitor
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Daemon configuration (override from .env)
+COLLECTOR_DEFAULT_INTERVAL = float(os.getenv('COLLECTOR_DEFAULT_INTERVAL', '300'))
+COLLECTOR_RELOAD_INTERVAL = float(os.getenv('COLLECTOR_RELOAD_INTERVAL', '60'))
+COLLECTOR_STATUS_FILE = os.getenv('COLLECTOR_STATUS_FILE', 'logs/collector_status.json')
+COLLECTOR_STATUS_INTERVAL = float(os.getenv('COLLECTOR_STATUS_INTERVAL', '10'))
+COLLECTOR_SHUTDOWN_TIMEOUT = float(os.getenv('COLLECTOR_SHUTDOWN_TIMEOUT', '60'))
+COLLECTOR_JITTER = float(os.getenv('COLLECTOR_JITTER', '0.05'))   # fraction of a router's shortest interval
+COLLECTOR_PER_SITE_CONCURRENCY = int(os.getenv('COLLECTOR_PER_SITE_CONCURRENCY', '0'))  # 0 = no limit
+COLLECTOR_REACHABILITY_INTERVAL = float(os.getenv('COLLECTOR_REACHABILITY_INTERVAL', '60'))  # 0 = no sweeps
+
+# Priority tiers, most urgent first, and the factor each applies to a parameter's interval
+PRIORITY_TIERS = ('critical', 'high', 'normal', 'low')
+COLLECTOR_TIER_FACTORS = {
+    tier.strip(): float(factor)
+    for tier, factor in (item.split(':') for item in
+                         os.getenv('COLLECTOR_TIER_FACTORS', 'critical:0.25,high:0.5,normal:1,low:4').split(','))
+}
+COLLECTOR_MIN_INTERVAL = float(os.getenv('COLLECTOR_MIN_INTERVAL', '15'))
+COLLECTOR_ROUTER_COMMAND_BUDGET = float(os.getenv('COLLECTOR_ROUTER_COMMAND_BUDGET', '60'))  # per minute, 0 = none
+COLLECTOR_MAX_STRETCH = float(os.getenv('COLLECTOR_MAX_STRETCH', '8'))
+
+DISPATCH_TICK = 1.0  # longest sleep between scheduler checks (seconds)
+
+
+def stable_fraction(*parts):
+    """Deterministic number in [0, 1) for the parts (same across restarts and hosts)"""
+    return zlib.crc32(':'.join(str(part) for part in parts).encode()) / 2 ** 32
+
+
+def site_of(router):
+    """Site key for spreading and per-site limits (routers.location, '' if unset)"""
+    return (router.get('location') or '').strip().lower()
+
+
+def router_phases(routers):
+    """
+    router_id -> (phase, cycle), both in [0, 1)
+
+    phase places a router within its shortest interval: routers of one site
+    are spaced evenly (ordered by a hash of their id) from a hashed site
+    start, so routers behind the same uplink are never polled together.
+    cycle picks which of the shorter slots a longer interval uses.
+    """
+    sites = {}
+    for router in routers:
+        sites.setdefault(site_of(router), []).append(router['id'])
+
+    phases = {}
+    for site, router_ids in sites.items():
+        router_ids.sort(key=lambda router_id: (stable_fraction('router', router_id), router_id))
+        start = stable_fraction('site', site)
+        for rank, router_id in enumerate(router_ids):
+            phases[router_id] = ((start + rank / len(router_ids)) % 1.0, stable_fraction('cycle', router_id))
+    return phases
+
+
+def slot_offset(phase, cycle, interval, base):
+    """
+    Seconds into each interval at which a router is polled
+
+    base is the router's shortest interval: the offset is phase * base plus
+    a whole number of bases, so when intervals are multiples of each other
+    a router's parameters fall on the same slots (one SSH session), while
+    cycle spreads the longer intervals' slots evenly across the interval.
+    """
+    if not 0 < base <= interval:
+        base = interval
+    return (math.floor(cycle * interval / base) * base + phase * base) % interval
+
+
+def tier_of(priority):
+    """Priority tier for a router_interfaces / monitoring_parameters priority value ('normal' if unset)"""
+    priority = (priority or '').strip().lower()
+    return priority if priority in PRIORITY_TIERS else 'normal'
+
+
+def fit_command_budget(polls, budget, max_stretch=COLLECTOR_MAX_STRETCH):
+    """
+    Stretch one router's intervals until its SSH commands per minute fit the budget
+
+    Tiers are slowed least urgent first: each by just enough to fit, or by
+    max_stretch (and then the next tier up) if that isn't enough.
+
+    Args:
+        polls: {key: (tier, interval, commands per poll)}
+        budget: commands per minute; 0 for no budget
+
+    Returns:
+        ({key: interval}, commands per minute)
+    """
+    intervals = {key: interval for key, (_, interval, _) in polls.items()}
+
+    def rate(keys):
+        return sum(polls[key][2] * 60 / intervals[key] for key in keys)
+
+    if budget:
+        for tier in reversed(PRIORITY_TIERS):
+            total = rate(polls)
+            if total <= budget:
+                break
+            keys = [key for key, (poll_tier, _, _) in polls.items() if poll_tier == tier]
+            if not keys:
+                continue
+            tier_rate = rate(keys)
+            others = total - tier_rate
+            stretch = max_stretch if others >= budget else min(max_stretch, tier_rate / (budget - others))
+            for key in keys:
+                intervals[key] = math.ceil(intervals[key] * stretch)
+
+    return intervals, rate(polls)
+
+
+def poll_parameters(polls):
+    """monitor_router parameters for (parameter, interface ids or None) pairs due together"""
+    parameters = {}
+    for parameter, interface_ids in polls:
+        if interface_ids is None:
+            parameters[parameter] = None
+        else:
+            parameters.setdefault(parameter, set()).update(interface_ids)
+    return parameters
+
+
+class ScheduledPoll:
+    """One router/parameter/tier on the schedule (interface parameters: the interfaces in that tier)"""
+
+    __slots__ = ('router_id', 'parameter', 'tier', 'interval', 'interface_ids', 'offset', 'slot', 'due',
+                 'token', 'running', 'runs', 'failures', 'skipped', 'last_start', 'last_lag', 'last_elapsed',
+                 'last_error')
+
+    def __init__(self, router_id, parameter, tier, interval):
+        self.router_id = router_id
+        self.parameter = parameter
+        self.tier = tier
+        self.interval = interval
+        self.interface_ids = None  # None for router parameters
+        self.offset = None        # seconds into the interval (wall clock)
+        self.slot = None          # wall-clock time of the current slot
+        self.due = None           # slot plus jitter, monotonic
+        self.token = None         # heap entry that is current for this poll
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0          # due times dropped because the poll fell behind
+        self.last_start = None
+        self.last_lag = None      # seconds the last run started after its due time
+        self.last_elapsed = None
+        self.last_error = None
+
+    @property
+    def key(self):
+        return (self.router_id, self.parameter, self.tier)
+
+
+class PollScheduler:
+    """
+    Min-heap of (due time, token) over the scheduled polls
+
+    Slots are laid out on the wall clock (offset + k * interval), so a
+    router keeps its place in the interval across restarts; due times are
+    time.monotonic() seconds. Rescheduling pushes a new heap entry; entries
+    whose token is no longer the poll's current one (removed, rescheduled or
+    deferred) are skipped when popped.
+    """
+
+    def __init__(self, jitter=COLLECTOR_JITTER):
+        self.jitter = jitter
+        self.polls = {}       # (router_id, parameter, tier) -> ScheduledPoll
+        self.bases = {}       # router_id -> shortest interval
+        self._heap = []
+        self._tokens = itertools.count()
+        self._wall_offset = time.time() - time.monotonic()
+
+    def _push(self, poll, at):
+        poll.token = next(self._tokens)
+        heapq.heappush(self._heap, (at, poll.token, poll.key))
+
+    def _place(self, poll, after):
+        """Move poll to its first slot strictly after the wall-clock time after"""
+        slots = math.floor((after - poll.offset) / poll.interval) + 1
+        poll.slot = poll.offset + slots * poll.interval
+
+        # Same jitter for every poll of a router in one slot, so they still share a session
+        base = self.bases.get(poll.router_id, poll.interval)
+        delay = stable_fraction('jitter', poll.router_id, round(poll.slot)) * self.jitter * base
+        poll.due = poll.slot + delay - self._wall_offset
+        self._push(poll, poll.due)
+
+    def sync(self, intervals, now, phases=None, interface_ids=None):
+        """
+        Make the schedule match {(router_id, parameter, tier): interval}
+
+        New pairs start at their next slot, removed ones are dropped (a
+        running poll finishes but isn't rescheduled), and a changed interval
+        or phase moves a poll to its new next slot.
+
+        Args:
+            phases: router_id -> (phase, cycle) from router_phases (hashed if missing)
+            interface_ids: key -> interface ids polled by that entry (interface parameters)
+
+        Returns:
+            (added, removed)
+        """
+        phases = phases or {}
+        interface_ids = interface_ids or {}
+        removed = self.polls.keys() - intervals.keys()
+        for key in removed:
+            del self.polls[key]
+
+        self.bases = {}
+        for (router_id, *_), interval in intervals.items():
+            self.bases[router_id] = min(interval, self.bases.get(router_id, interval))
+
+        wall_now = now + self._wall_offset
+        added = 0
+        for key, interval in intervals.items():
+            router_id = key[0]
+            phase, cycle = phases.get(router_id) or (stable_fraction('router', router_id),
+                                                     stable_fraction('cycle', router_id))
+            offset = slot_offset(phase, cycle, interval, self.bases[router_id])
+
+            poll = self.polls.get(key)
+            if poll is None:
+                poll = self.polls[key] = ScheduledPoll(*key, interval)
+                added += 1
+            poll.interface_ids = interface_ids.get(key)
+            if (poll.interval, poll.offset) == (interval, offset):
+                continue
+
+            poll.interval, poll.offset = interval, offset
+            if not poll.running:
+                self._place(poll, wall_now)
+
+        return added, len(removed)
+
+    def pop_due(self, now):
+        """Polls due at or before now, removed from the heap"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, token, key = heapq.heappop(self._heap)
+            poll = self.polls.get(key)
+            if poll is not None and poll.token == token and not poll.running:
+                poll.token = None
+                due.append(poll)
+        return due
+
+    def next_wakeup(self):
+        return self._heap[0][0] if self._heap else None
+
+    def defer(self, poll, until):
+        """Retry a due poll at until, keeping its due time (lag keeps counting)"""
+        self._push(poll, until)
+
+    @staticmethod
+    def start(poll, now):
+        poll.running = True
+        poll.last_start = now
+        poll.last_lag = max(0.0, now - poll.due)
+
+    def finish(self, poll, now, error=None):
+        """Record a run and schedule the next one on the poll's slots"""
+        poll.running = False
+        poll.runs += 1
+        poll.last_elapsed = now - poll.last_start
+        poll.last_error = error
+        if error:
+            poll.failures += 1
+
+        if self.polls.get(poll.key) is not poll:
+            return
+
+        # Next slot; if that has already passed, skip the missed slots rather
+        # than running back-to-back to catch up
+        previous = poll.slot
+        self._place(poll, max(previous + poll.interval / 2, now + self._wall_offset))
+        poll.skipped += max(0, round((poll.slot - previous) / poll.interval) - 1)
+
+    def overdue(self, now):
+        return [poll for poll in self.polls.values() if not poll.running and poll.due < now]
+
+
+class CollectionDaemon:
+    """Schedules Tejas router polls until stopped"""
+
+    def __init__(self, config=DB_CONFIG, concurrency=COLLECTOR_GLOBAL_CONCURRENCY,
+                 default_interval=COLLECTOR_DEFAULT_INTERVAL, reload_interval=COLLECTOR_RELOAD_INTERVAL,
+                 status_file=COLLECTOR_STATUS_FILE, status_interval=COLLECTOR_STATUS_INTERVAL,
+                 per_site_concurrency=COLLECTOR_PER_SITE_CONCURRENCY, jitter=COLLECTOR_JITTER,
+                 command_budget=COLLECTOR_ROUTER_COMMAND_BUDGET, tier_factors=COLLECTOR_TIER_FACTORS,
+                 min_interval=COLLECTOR_MIN_INTERVAL, reachability_interval=COLLECTOR_REACHABILITY_INTERVAL,
+                 skip_unreachable=COLLECTOR_SKIP_UNREACHABLE):
+        self.config = config
+        self.concurrency = concurrency
+        self.per_site_concurrency = per_site_concurrency
+        self.command_budget = command_budget
+        self.tier_factors = tier_factors
+        self.min_interval = min_interval
+        self.default_interval = default_interval
+        self.reload_interval = reload_interval
+        self.status_file = status_file
+        self.status_interval = status_interval
+        self.reachability_interval = reachability_interval
+        self.skip_unreachable = skip_unreachable
+
+        self.db_manager = DatabaseManager(config)
+        self.scheduler = PollScheduler(jitter)
+        self.routers = {}          # router_id -> (router, interfaces), from the last reload
+        self.busy = set()          # router ids with a poll in flight
+        self.site_running = Counter()  # site -> routers of that site being polled
+        self.futures = {}          # future -> (router_id, site, polls)
+        self.command_rates = {}    # router_id -> scheduled SSH commands per minute
+        self.unreachable = {}      # router_id -> error, routers the last sweep found down
+        self.sweep_thread = None
+
+        self.stop_event = threading.Event()
+        self.reload_requested = threading.Event()
+        self.started_at = datetime.now()
+        self.loaded_at = None
+        self.stats = {'polls': 0, 'failed': 0, 'reloads': 0, 'reload_errors': 0,
+                      'sweeps': 0, 'sweep_errors': 0, 'skipped_unreachable': 0}
+
+    def _interval(self, parameter, tier):
+        """Parameter interval scaled by tier (not below min_interval, unless configured shorter)"""
+        interval = float(parameter.get('poll_interval_seconds') or self.default_interval)
+        return max(interval * self.tier_factors.get(tier, 1.0), min(interval, self.min_interval))
+
+    def router_schedule(self, router, interfaces, parameters):
+        """
+        One router's polls: router parameters at their own tier, interface
+        parameters split by interface tier (the parameter's where an
+        interface has none)
+
+        Returns:
+            ({key: (tier, interval, commands per poll)}, {key: interface ids})
+        """
+        polls, interface_ids = {}, {}
+        for name, parameter in parameters.items():
+            parameter_tier = tier_of(parameter.get('priority'))
+
+            if name not in TejasRouterMonitor.INTERFACE_COMMANDS:
+                key = (router['id'], name, parameter_tier)
+                polls[key] = (parameter_tier, self._interval(parameter, parameter_tier), 1)
+                continue
+
+            by_tier = {}
+            for interface in interfaces:
+                tier = tier_of(interface.get('priority')) if interface.get('priority') else parameter_tier
+                by_tier.setdefault(tier, []).append(interface['id'])
+            for tier, ids in by_tier.items():
+                key = (router['id'], name, tier)
+                polls[key] = (tier, self._interval(parameter, tier), len(ids))
+                interface_ids[key] = tuple(ids)
+
+        return polls, interface_ids
+
+    def load_inventory(self):
+        """
+        Tejas routers, interfaces and parameters (reconnecting if the
+        connection dropped); circuit breaker state is synced on the way
+        """
+        if self.db_manager.conn.closed:
+            self.db_manager.conn = psycopg2.connect(**self.config)
+        inventory = load_fleet_inventory(self.db_manager.conn, 'tejas')
+        self.db_manager.metadata.refresh()
+        get_breakers().sync(self.db_manager.conn)
+        return inventory
+
+    def plan(self, inventory):
+        """
+        Polls for the whole fleet, with tiers and the command budget applied
+
+        Returns:
+            ({(router_id, parameter, tier): interval}, {key: interface ids})
+        """
+        # Parameters this monitor collects; all of them at the default
+        # interval on schemas without monitoring_parameters rows for them
+        parameters = {p['parameter_name']: p for p in inventory.parameters()
+                      if p['parameter_name'] in TejasRouterMonitor.PARAMETERS}
+        if not inventory.all_parameters:
+            parameters = {name: {'parameter_name': name} for name in TejasRouterMonitor.PARAMETERS}
+
+        intervals, interface_ids, command_rates = {}, {}, {}
+        stretched = over_budget = 0
+        for router, interfaces in inventory.items():
+            polls, router_interface_ids = self.router_schedule(router, interfaces, parameters)
+            fitted, rate = fit_command_budget(polls, self.command_budget)
+
+            stretched += any(fitted[key] != poll[1] for key, poll in polls.items())
+            over_budget += bool(self.command_budget) and rate > self.command_budget
+            intervals.update(fitted)
+            interface_ids.update(router_interface_ids)
+            command_rates[router['id']] = rate
+
+        self.command_rates = command_rates
+        if stretched:
+            logger.info(f"🐢 {stretched} routers over {self.command_budget:.0f} commands/min: "
+                        f"lower-priority polls slowed down")
+        if over_budget:
+            logger.warning(f"⚠️  {over_budget} routers still over the command budget "
+                           f"(critical/high polls alone exceed it)")
+        return intervals, interface_ids
+
+    def reload(self, now):
+        """Reload routers, interfaces and intervals; keeps the old schedule on failure"""
+        try:
+            inventory = self.load_inventory()
+        except Exception as e:
+            self.stats['reload_errors'] += 1
+            logger.error(f"❌ Inventory reload failed, keeping the current schedule: {e}")
+            try:
+                self.db_manager.conn.rollback()
+            except Exception:
+                pass
+            return False
+
+        intervals, interface_ids = self.plan(inventory)
+        self.routers = {router['id']: (router, interfaces) for router, interfaces in inventory.items()}
+        added, removed = self.scheduler.sync(intervals, now, router_phases(inventory.routers), interface_ids)
+        self.loaded_at = datetime.now()
+        self.stats['reloads'] += 1
+
+        if added or removed:
+            logger.info(f"🗓️  Schedule: {len(intervals)} polls on {len(self.routers)} routers "
+                        f"(+{added} / -{removed})")
+        return True
+
+    def _sweep_loop(self):
+        """
+        Sweep thread: TCP-probe every router each reachability_interval and
+        record the results (router_ping_status) on its own connection
+        """
+        conn = None
+        while not self.stop_event.is_set():
+            start = time.monotonic()
+            routers = [router for router, _ in self.routers.values()]
+            if routers:
+                results = reachability_prober.sweep_routers(routers)
+                self.unreachable = {result.router_id: result.error for result in results if not result.reachable}
+                self.stats['sweeps'] += 1
+                try:
+                    if conn is None or conn.closed:
+                        conn = psycopg2.connect(**self.config)
+                    reachability_prober.save_results(conn, results)
+                except Exception as e:
+                    self.stats['sweep_errors'] += 1
+                    logger.error(f"❌ Could not save reachability sweep: {e}")
+                    if conn is not None:
+                        conn.close()
+            self.stop_event.wait(max(0.0, self.reachability_interval - (time.monotonic() - start)))
+
+        if conn is not None:
+            conn.close()
+
+    def start_sweeps(self):
+        if self.reachability_interval > 0:
+            self.sweep_thread = threading.Thread(target=self._sweep_loop, name='reachability', daemon=True)
+            self.sweep_thread.start()
+            logger.info(f"📡 Reachability sweep every {self.reachability_interval:.0f}s")
+
+    def _collect(self, router, interfaces, polls):
+        """Worker thread: one SSH session for every poll due on this router"""
+        start = time.monotonic()
+        for poll in polls:
+            PollScheduler.start(poll, start)
+
+        # Down at the last sweep: don't wait out an SSH connect timeout
+        error = self.unreachable.get(router['id'])
+        if error is not None and self.skip_unreachable:
+            self.stats['skipped_unreachable'] += 1
+            return f"Host unreachable at last sweep: {error}"
+
+        parameters = poll_parameters((poll.parameter, poll.interface_ids) for poll in polls)
+        result = TejasRouterMonitor.monitor_router(router, interfaces, self.db_manager, parameters)
+        return result.get('error')
+
+    def dispatch(self, executor, now):
+        """
+        Submit due polls, grouped by router; polls for a busy router, or a
+        site at its concurrency limit, wait and are retried
+        """
+        by_router = {}
+        for poll in self.scheduler.pop_due(now):
+            by_router.setdefault(poll.router_id, []).append(poll)
+
+        for router_id, polls in by_router.items():
+            router, interfaces = self.routers.get(router_id, (None, None))
+            site = site_of(router) if router else None
+            if (router is None or router_id in self.busy or
+                    (self.per_site_concurrency and self.site_running[site] >= self.per_site_concurrency)):
+                for poll in polls:
+                    self.scheduler.defer(poll, now + DISPATCH_TICK)
+                continue
+
+            for poll in polls:
+                poll.running = True
+            self.busy.add(router_id)
+            self.site_running[site] += 1
+            self.futures[executor.submit(self._collect, router, interfaces, polls)] = (router_id, site, polls)
+
+    def reap(self, futures):
+        """Record finished polls and schedule their next runs"""
+        now = time.monotonic()
+        for future in futures:
+            router_id, site, polls = self.futures.pop(future)
+            self.busy.discard(router_id)
+            self.site_running[site] -= 1
+            try:
+                error = future.result()
+            except Exception as e:
+                error = str(e)
+                logger.error(f"❌ Poll of router {router_id} failed: {e}")
+
+            self.stats['polls'] += 1
+            if error:
+                self.stats['failed'] += 1
+            for poll in polls:
+                self.scheduler.finish(poll, now, error)
+
+    def status(self, now=None):
+        """Schedule state with per-job lag (seconds; 'overdue' counts for polls not yet started)"""
+        now = time.monotonic() if now is None else now
+        wall = time.time()
+        polls = sorted(self.scheduler.polls.values(), key=lambda p: p.key)
+        overdue = self.scheduler.overdue(now)
+
+        def when(t):
+            return datetime.fromtimestamp(wall - (now - t)).isoformat() if t is not None else None
+
+        jobs = []
+        for poll in polls:
+            router = self.routers.get(poll.router_id, ({},))[0]
+            jobs.append({
+                'router_id': poll.router_id,
+                'hostname': router.get('hostname'),
+                'site': router.get('location'),
+                'parameter': poll.parameter,
+                'tier': poll.tier,
+                'interfaces': len(poll.interface_ids) if poll.interface_ids is not None else None,
+                'interval': poll.interval,
+                'offset': round(poll.offset, 3),
+                'running': poll.running,
+                'next_due': when(poll.due),
+                'overdue': round(max(0.0, now - poll.due), 3) if not poll.running else 0.0,
+                'last_run': when(poll.last_start),
+                'last_lag': round(poll.last_lag, 3) if poll.last_lag is not None else None,
+                'last_elapsed': round(poll.last_elapsed, 3) if poll.last_elapsed is not None else None,
+                'runs': poll.runs,
+                'failures': poll.failures,
+                'skipped': poll.skipped,
+                'last_error': poll.last_error
+            })
+
+        lags = [job['last_lag'] for job in jobs if job['last_lag'] is not None]
+        return {
+            'updated_at': datetime.now().isoformat(),
+            'started_at': self.started_at.isoformat(),
+            'inventory_loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'routers': len(self.routers),
+            'scheduled': len(jobs),
+            'running': sum(1 for poll in polls if poll.running),
+            'overdue': len(overdue),
+            'max_overdue': round(max((now - poll.due for poll in overdue), default=0.0), 3),
+            'max_lag': max(lags, default=None),
+            'command_budget': self.command_budget,
+            'max_commands_per_minute': round(max(self.command_rates.values(), default=0.0), 1),
+            'circuit_breakers': get_breakers().summary(),
+            'unreachable': len(self.unreachable),
+            **self.stats,
+            'jobs': jobs
+        }
+
+    def write_status(self):
+        """Replace the status file atomically"""
+        try:
+            directory = os.path.dirname(self.status_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.status_file}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(self.status(), f, indent=2)
+            os.replace(tmp, self.status_file)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not write collector status: {e}")
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, lambda *_: self.stop_event.set())
+        signal.signal(signal.SIGINT, lambda *_: self.stop_event.set())
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda *_: self.reload_requested.set())
+
+    def run(self):
+        """Poll until SIGTERM/SIGINT (or stop_event), then drain and flush"""
+        self.db_manager.connect()
+        executor = ThreadPoolExecutor(max_workers=max(1, self.concurrency), thread_name_prefix='collector')
+
+        now = time.monotonic()
+        self.reload(now)
+        self.start_sweeps()
+        next_reload = now + self.reload_interval
+        next_status = now
+
+        logger.info(f"🚀 Collection daemon started: {len(self.scheduler.polls)} polls, "
+                    f"concurrency {self.concurrency}")
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                if now >= next_reload or self.reload_requested.is_set():
+                    self.reload_requested.clear()
+                    self.reload(now)
+                    self.db_manager.writer.log_stats()
+                    next_reload = now + self.reload_interval
+
+                self.dispatch(executor, now)
+
+                if now >= next_status:
+                    self.write_status()
+                    next_status = now + self.status_interval
+
+                wakeup = self.scheduler.next_wakeup()
+                timeout = min(DISPATCH_TICK, max(0.0, wakeup - now)) if wakeup is not None else DISPATCH_TICK
+                if self.futures:
+                    done, _ = wait(list(self.futures), timeout=timeout, return_when=FIRST_COMPLETED)
+                    self.reap(done)
+                else:
+                    self.stop_event.wait(timeout)
+        finally:
+            self.shutdown(executor)
+
+    def shutdown(self, executor):
+        logger.info(f"⏹️  Stopping: waiting up to {COLLECTOR_SHUTDOWN_TIMEOUT:.0f}s "
+                    f"for {len(self.futures)} running polls")
+        done, pending = wait(list(self.futures), timeout=COLLECTOR_SHUTDOWN_TIMEOUT)
+        self.reap(done)
+        if pending:
+            logger.warning(f"⚠️  {len(pending)} polls still running at shutdown, not waiting for them; "
+                           f"readings they return from now on are dropped")
+        executor.shutdown(wait=False, cancel_futures=True)
+        if self.sweep_thread is not None:
+            self.sweep_thread.join(timeout=5)
+
+        self.write_status()
+        get_breakers().sync(self.db_manager.conn)
+        self.db_manager.writer.flush()
+        self.db_manager.writer.log_stats()
+        self.db_manager.close()
+        logger.info("✅ Collection daemon stopped")
+
+
+def main():
+    daemon = CollectionDaemon()
+    daemon.install_signal_handlers()
+    daemon.run()
+
+
+if __name__ == '__main__':
+    main()
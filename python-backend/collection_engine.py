@@ -0,0 +1,166 @@
+"""
+Asyncio Collection Engine
+Keeps hundreds of router polls in flight from one process
+
+Paramiko is blocking, so the event loop does the scheduling (global and
+per-router concurrency budgets, timeouts, result collection) and each
+admitted poll runs on a worker thread sized to the global budget.
+
+Jobs that carry a router address are TCP-probed all at once first, so
+routers that are down cost one sub-second connect instead of an SSH
+timeout each.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+import reachability_prober
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Concurrency budgets (override from .env)
+COLLECTOR_GLOBAL_CONCURRENCY = int(os.getenv('COLLECTOR_GLOBAL_CONCURRENCY', '200'))
+COLLECTOR_PER_ROUTER_CONCURRENCY = int(os.getenv('COLLECTOR_PER_ROUTER_CONCURRENCY', '1'))
+COLLECTOR_JOB_TIMEOUT = float(os.getenv('COLLECTOR_JOB_TIMEOUT', '0')) or None
+
+# TCP reachability sweep of the cycle's routers before any SSH (reachability_prober.py)
+COLLECTOR_PRESWEEP = os.getenv('COLLECTOR_PRESWEEP', 'true').lower() == 'true'
+COLLECTOR_SKIP_UNREACHABLE = os.getenv('COLLECTOR_SKIP_UNREACHABLE', 'true').lower() == 'true'
+
+
+class CollectionJob:
+    """One unit of work against one router"""
+
+    __slots__ = ('router_id', 'func', 'args', 'address', 'reachability', 'result', 'error', 'elapsed')
+
+    def __init__(self, router_id, func, *args, address=None):
+        self.router_id = router_id
+        self.func = func
+        self.args = args
+        self.address = address          # (host, port) to sweep before the cycle, if any
+        self.reachability = None        # ProbeResult from that sweep
+        self.result = None
+        self.error = None
+        self.elapsed = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class CollectionEngine:
+    """Run collection jobs under a global and a per-router concurrency budget"""
+
+    def __init__(self, global_concurrency=COLLECTOR_GLOBAL_CONCURRENCY,
+                 per_router_concurrency=COLLECTOR_PER_ROUTER_CONCURRENCY,
+                 job_timeout=COLLECTOR_JOB_TIMEOUT, presweep=COLLECTOR_PRESWEEP,
+                 skip_unreachable=COLLECTOR_SKIP_UNREACHABLE):
+        self.global_concurrency = global_concurrency
+        self.per_router_concurrency = per_router_concurrency
+        self.job_timeout = job_timeout
+        self.presweep = presweep
+        self.skip_unreachable = skip_unreachable
+        self.reachability = []          # ProbeResults of the last cycle's sweep
+        self.stats = {}
+
+    async def _sweep(self, jobs):
+        """
+        TCP-probe the routers of jobs with an address; down routers are
+        skipped (or run last), returns the jobs to run in admission order
+        """
+        targets = {}
+        for job in jobs:
+            if job.address:
+                targets.setdefault((job.router_id,) + tuple(job.address), []).append(job)
+        if not targets:
+            return jobs
+
+        start = time.monotonic()
+        self.reachability = await reachability_prober.sweep(list(targets))
+        self.stats['sweep_time'] = time.monotonic() - start
+
+        for result in self.reachability:
+            for job in targets[(result.router_id, result.host, result.port)]:
+                job.reachability = result
+
+        down = [job for job in jobs if job.reachability and not job.reachability.reachable]
+        self.stats['unreachable'] = len(down)
+        if self.skip_unreachable:
+            for job in down:
+                job.error = reachability_prober.HostUnreachableError(job.reachability.error)
+            return [job for job in jobs if job.error is None]
+
+        # Reachable first, so down routers only take what is left of the budget
+        return [job for job in jobs if not job.reachability or job.reachability.reachable] + down
+
+    async def _run_job(self, job, executor, global_sem, router_sems):
+        loop = asyncio.get_running_loop()
+
+        async with global_sem:
+            async with router_sems[job.router_id]:
+                self._in_flight += 1
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+                start = time.monotonic()
+
+                try:
+                    future = loop.run_in_executor(executor, job.func, *job.args)
+                    job.result = await asyncio.wait_for(future, self.job_timeout)
+                except asyncio.TimeoutError:
+                    # The worker thread can't be interrupted, but the cycle stops waiting for it
+                    job.error = TimeoutError(f"Job exceeded {self.job_timeout}s")
+                    logger.error(f"❌ Router {job.router_id}: {job.error}")
+                except Exception as e:
+                    job.error = e
+                    logger.error(f"❌ Error in collection job for router {job.router_id}: {e}")
+                finally:
+                    job.elapsed = time.monotonic() - start
+                    self._in_flight -= 1
+
+        return job
+
+    async def run_async(self, jobs):
+        """Run all jobs; returns them in submission order with result/error filled in"""
+        global_sem = asyncio.Semaphore(self.global_concurrency)
+        router_sems = defaultdict(lambda: asyncio.Semaphore(self.per_router_concurrency))
+
+        self._in_flight = 0
+        self.stats = {'jobs': len(jobs), 'failed': 0, 'max_in_flight': 0, 'cycle_time': 0.0,
+                      'unreachable': 0, 'sweep_time': 0.0}
+        start = time.monotonic()
+
+        self.reachability = []
+        admitted = await self._sweep(jobs) if self.presweep else jobs
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.global_concurrency, len(admitted))),
+            thread_name_prefix='collector'
+        )
+        try:
+            await asyncio.gather(*(
+                self._run_job(job, executor, global_sem, router_sems) for job in admitted
+            ))
+        finally:
+            # Don't block on threads still stuck past their job timeout
+            executor.shutdown(wait=self.job_timeout is None, cancel_futures=True)
+
+        self.stats['cycle_time'] = time.monotonic() - start
+        self.stats['failed'] = sum(1 for job in jobs if not job.ok)
+
+        logger.info(
+            f"📊 Collection cycle: {len(jobs)} jobs in {self.stats['cycle_time']:.2f}s "
+            f"(max in flight {self.stats['max_in_flight']}, failed {self.stats['failed']}, "
+            f"{self.stats['unreachable']} routers down)"
+        )
+        return jobs
+
+    def run(self, jobs):
+        """Blocking entry point for the synchronous monitor scripts"""
+        return asyncio.run(self.run_async(jobs))
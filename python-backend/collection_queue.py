@@ -0,0 +1,357 @@
+"""
+Distributed Collection Queue
+Collector workers on any number of hosts share one poll schedule in
+Postgres (database/collection_queue.sql) instead of one process polling
+the whole fleet
+
+Each worker claims due routers with FOR UPDATE SKIP LOCKED under a lease
+(renewed while its polls run), polls them with the Tejas monitor and
+writes back the next due times. A crashed worker's leases expire and its
+routers are claimed by the others; workers join and leave without any
+configuration. One worker at a time (advisory lock) refreshes the jobs
+from the fleet inventory, with the daemon's priority tiers and command
+budget.
+
+Usage:
+    python collection_queue.py                  # one worker
+    python collection_queue.py --workers 4      # four worker processes on this host
+"""
+
+import os
+import time
+import socket
+import logging
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import psycopg2
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+from collection_daemon import (
+    COLLECTOR_SHUTDOWN_TIMEOUT, CollectionDaemon, poll_parameters, router_phases, slot_offset
+)
+from router_circuit_breaker import get_breakers
+from tejas_router_monitor_v2_fixed import DB_CONFIG, TejasRouterMonitor
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Queue configuration (override from .env)
+COLLECTOR_QUEUE_LEASE = float(os.getenv('COLLECTOR_QUEUE_LEASE', '120'))
+COLLECTOR_QUEUE_CONCURRENCY = int(os.getenv('COLLECTOR_QUEUE_CONCURRENCY', '50'))
+COLLECTOR_QUEUE_IDLE = float(os.getenv('COLLECTOR_QUEUE_IDLE', '1'))
+
+SYNC_LOCK_KEY = 'collection_queue_sync'
+
+
+class QueueWorker(CollectionDaemon):
+    """
+    One collector process working off the shared queue
+
+    Reuses the daemon's inventory loading, tier planning and monitor
+    wiring; scheduling state lives in the database instead of a local heap.
+    """
+
+    def __init__(self, config=DB_CONFIG, worker_id=None, lease=COLLECTOR_QUEUE_LEASE,
+                 concurrency=COLLECTOR_QUEUE_CONCURRENCY, idle=COLLECTOR_QUEUE_IDLE, **kwargs):
+        super().__init__(config, concurrency=concurrency, **kwargs)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = lease
+        self.idle = idle
+        self.queue_conn = None
+        self.futures = {}          # future -> (router_id, jobs)
+
+    def _execute(self, query, args=None, fetch=False):
+        """Run one statement on the queue connection in its own transaction"""
+        cursor = self.queue_conn.cursor()
+        try:
+            cursor.execute(query, args)
+            rows = cursor.fetchall() if fetch else None
+            self.queue_conn.commit()
+            return rows
+        except Exception:
+            self.queue_conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def connect_queue(self):
+        self.queue_conn = psycopg2.connect(**self.config)
+        self._execute(
+            "INSERT INTO collection_workers (worker_id, hostname, pid) VALUES (%s, %s, %s) "
+            "ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = CURRENT_TIMESTAMP",
+            (self.worker_id, socket.gethostname(), os.getpid())
+        )
+        logger.info(f"🔗 Worker {self.worker_id} joined the collection queue")
+
+    def sync_queue(self, inventory, intervals, interface_ids):
+        """
+        Make the queue match the planned polls, if no other worker is doing it
+
+        New jobs start spread over their interval; existing ones keep their
+        due time (pulled in if their interval got shorter).
+
+        Returns:
+            True if this worker held the sync lock
+        """
+        phases = router_phases(inventory.routers)
+        bases = {}
+        for (router_id, *_), interval in intervals.items():
+            bases[router_id] = min(interval, bases.get(router_id, interval))
+
+        jobs = []
+        for (router_id, parameter, tier), interval in intervals.items():
+            phase, cycle = phases[router_id]
+            ids = interface_ids.get((router_id, parameter, tier))
+            jobs.append((router_id, parameter, tier, interval, list(ids) if ids is not None else None,
+                         slot_offset(phase, cycle, interval, bases[router_id])))
+        router_ids = [router['id'] for router in inventory.routers]
+
+        cursor = self.queue_conn.cursor()
+        try:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", (SYNC_LOCK_KEY,))
+            if not cursor.fetchone()[0]:
+                self.queue_conn.rollback()
+                return False
+
+            cursor.execute("DELETE FROM collection_routers WHERE router_id <> ALL(%s)", (router_ids,))
+            execute_values(
+                cursor,
+                "INSERT INTO collection_routers (router_id, due_at) VALUES %s ON CONFLICT (router_id) DO NOTHING",
+                [(router_id,) for router_id in router_ids],
+                template="(%s, LOCALTIMESTAMP)"
+            )
+
+            cursor.execute(
+                "DELETE FROM collection_jobs WHERE (router_id, parameter_name, tier) NOT IN "
+                "(SELECT * FROM unnest(%s::integer[], %s::text[], %s::text[]))",
+                ([job[0] for job in jobs], [job[1] for job in jobs], [job[2] for job in jobs])
+            )
+            execute_values(
+                cursor,
+                """
+                INSERT INTO collection_jobs (router_id, parameter_name, tier, interval_seconds, interface_ids, due_at)
+                VALUES %s
+                ON CONFLICT (router_id, parameter_name, tier) DO UPDATE SET
+                    interval_seconds = EXCLUDED.interval_seconds,
+                    interface_ids = EXCLUDED.interface_ids,
+                    due_at = LEAST(collection_jobs.due_at,
+                                   LOCALTIMESTAMP + EXCLUDED.interval_seconds * INTERVAL '1 second')
+                """,
+                jobs,
+                template="(%s, %s, %s, %s, %s::integer[], LOCALTIMESTAMP + %s * INTERVAL '1 second')"
+            )
+
+            # Unclaimed routers become due with their earliest job
+            cursor.execute("""
+                UPDATE collection_routers r SET due_at = j.due_at
+                FROM (SELECT router_id, MIN(due_at) AS due_at FROM collection_jobs GROUP BY router_id) j
+                WHERE r.router_id = j.router_id AND r.lease_owner IS NULL
+            """)
+            self.queue_conn.commit()
+        except Exception:
+            self.queue_conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        logger.info(f"🗓️  Queue synced: {len(jobs)} jobs on {len(router_ids)} routers")
+        return True
+
+    def refresh(self):
+        """Reload the inventory (credentials, interfaces) and sync the queue if it's our turn"""
+        try:
+            inventory = self.load_inventory()
+        except Exception as e:
+            self.stats['reload_errors'] += 1
+            logger.error(f"❌ Inventory reload failed, keeping the current one: {e}")
+            try:
+                self.db_manager.conn.rollback()
+            except Exception:
+                pass
+            return
+
+        self.routers = {router['id']: (router, interfaces) for router, interfaces in inventory.items()}
+        self.loaded_at = datetime.now()
+        self.stats['reloads'] += 1
+        self.sync_queue(inventory, *self.plan(inventory))
+
+    def claim(self, limit):
+        """Lease up to limit due routers; returns {router_id: [(parameter, tier, interface ids)]}"""
+        rows = self._execute(
+            "SELECT * FROM claim_collection_routers(%s, %s, %s * INTERVAL '1 second')",
+            (self.worker_id, limit, self.lease), fetch=True
+        )
+        claimed = {}
+        for router_id, parameter, tier, interface_ids in rows:
+            jobs = claimed.setdefault(router_id, [])
+            if parameter is not None:
+                jobs.append((parameter, tier, interface_ids))
+        return claimed
+
+    def complete(self, router_id, jobs, error=None):
+        """Record a poll and release the router; False if the lease had been lost"""
+        completed = self._execute(
+            "SELECT complete_collection_router(%s, %s, %s::text[], %s::text[], %s)",
+            (self.worker_id, router_id, [job[0] for job in jobs], [job[1] for job in jobs], error),
+            fetch=True
+        )[0][0]
+        if not completed:
+            logger.warning(f"⚠️  Lease on router {router_id} expired before its poll finished "
+                           f"(another worker may have polled it too)")
+        return completed
+
+    def renew(self):
+        """Extend the leases of routers being polled and mark this worker alive"""
+        running = [router_id for router_id, _ in self.futures.values()]
+        if running:
+            self._execute(
+                "UPDATE collection_routers SET lease_expires_at = LOCALTIMESTAMP + %s * INTERVAL '1 second' "
+                "WHERE lease_owner = %s AND router_id = ANY(%s)",
+                (self.lease, self.worker_id, running)
+            )
+        self._execute("UPDATE collection_workers SET heartbeat_at = CURRENT_TIMESTAMP WHERE worker_id = %s",
+                      (self.worker_id,))
+
+    def leave(self):
+        """Hand unfinished routers straight back instead of waiting for their leases, and deregister"""
+        self._execute("UPDATE collection_routers SET lease_owner = NULL, lease_expires_at = NULL "
+                      "WHERE lease_owner = %s", (self.worker_id,))
+        self._execute("DELETE FROM collection_workers WHERE worker_id = %s", (self.worker_id,))
+
+    def _poll(self, router, interfaces, jobs):
+        """Worker thread: poll one claimed router, returns an error message or None"""
+        parameters = poll_parameters((parameter, interface_ids) for parameter, _, interface_ids in jobs)
+        result = TejasRouterMonitor.monitor_router(router, interfaces, self.db_manager, parameters)
+        return result.get('error')
+
+    def dispatch(self, executor, limit):
+        """Claim and start up to limit routers; returns how many were claimed"""
+        claimed = self.claim(limit)
+        for router_id, jobs in claimed.items():
+            if router_id not in self.routers:
+                # Added since our last inventory load: hand it back and catch up
+                self.complete(router_id, [])
+                self.reload_requested.set()
+                continue
+            if not jobs:
+                self.complete(router_id, [])
+                continue
+
+            router, interfaces = self.routers[router_id]
+            self.futures[executor.submit(self._poll, router, interfaces, jobs)] = (router_id, jobs)
+        return len(claimed)
+
+    def reap(self, futures):
+        for future in futures:
+            router_id, jobs = self.futures.pop(future)
+            try:
+                error = future.result()
+            except Exception as e:
+                error = str(e)
+                logger.error(f"❌ Poll of router {router_id} failed: {e}")
+
+            self.stats['polls'] += 1
+            if error:
+                self.stats['failed'] += 1
+            try:
+                self.complete(router_id, jobs, error)
+            except psycopg2.Error as e:
+                # The lease runs out and the router is polled again
+                logger.error(f"❌ Could not record poll of router {router_id}: {e}")
+
+    def run(self):
+        """Work off the queue until SIGTERM/SIGINT (or stop_event), then hand back unfinished routers"""
+        self.db_manager.connect()
+        self.connect_queue()
+        executor = ThreadPoolExecutor(max_workers=max(1, self.concurrency), thread_name_prefix='collector')
+
+        next_reload = next_renew = 0.0
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                free = claimed = 0
+                try:
+                    if self.queue_conn.closed:
+                        self.connect_queue()
+                    if now >= next_reload or self.reload_requested.is_set():
+                        self.reload_requested.clear()
+                        self.refresh()
+                        next_reload = now + self.reload_interval
+                    if now >= next_renew:
+                        self.renew()
+                        next_renew = now + self.lease / 3
+
+                    free = self.concurrency - len(self.futures)
+                    claimed = self.dispatch(executor, free) if free > 0 else 0
+                except psycopg2.Error as e:
+                    logger.error(f"❌ Collection queue error: {e}")
+                    free = claimed = 0
+
+                # A full batch means more may be due: claim again right away
+                timeout = 0 if free > 0 and claimed == free else self.idle
+                if self.futures:
+                    done, _ = wait(list(self.futures), timeout=timeout, return_when=FIRST_COMPLETED)
+                    self.reap(done)
+                else:
+                    self.stop_event.wait(timeout)
+        finally:
+            self.shutdown(executor)
+
+    def shutdown(self, executor):
+        logger.info(f"⏹️  Worker {self.worker_id} stopping: waiting up to {COLLECTOR_SHUTDOWN_TIMEOUT:.0f}s "
+                    f"for {len(self.futures)} running polls")
+        done, pending = wait(list(self.futures), timeout=COLLECTOR_SHUTDOWN_TIMEOUT)
+        if pending:
+            logger.warning(f"⚠️  {len(pending)} polls still running at shutdown, not waiting for them; "
+                           f"readings they return from now on are dropped")
+        try:
+            self.reap(done)
+            self.leave()
+        except psycopg2.Error as e:
+            logger.error(f"❌ Could not release leases (they expire in {self.lease:.0f}s): {e}")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        get_breakers().sync(self.db_manager.conn)
+        self.db_manager.writer.flush()
+        self.db_manager.writer.log_stats()
+        self.db_manager.close()
+        self.queue_conn.close()
+        logger.info(f"✅ Worker {self.worker_id} left the collection queue "
+                    f"({self.stats['polls']} polls, {self.stats['failed']} failed)")
+
+
+def run_worker():
+    worker = QueueWorker()
+    worker.install_signal_handlers()
+    worker.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=1, help='worker processes to run on this host')
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        run_worker()
+        return
+
+    processes = [multiprocessing.Process(target=run_worker, name=f'collector-{i}') for i in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Each worker got the SIGINT too and is draining; wait for them
+        for process in processes:
+            process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+-- ============================================
+-- Router Circuit Breakers
+-- Skip routers that keep failing to connect instead of waiting out the SSH
+-- timeout on every poll
+-- ============================================
+
+-- router_circuit_breaker.py opens a router's breaker after
+-- CIRCUIT_BREAKER_FAILURES consecutive failed connects. While open, the
+-- monitors, the collection daemon/workers and the API refuse to connect
+-- until retry_at; then one trial poll is let through (half_open). Success
+-- closes the breaker, failure opens it again with twice the backoff
+-- (CIRCUIT_BREAKER_BACKOFF doubling up to CIRCUIT_BREAKER_MAX_BACKOFF).
+--
+-- Each process keeps its breakers in memory and syncs them with this table
+-- (every inventory reload / CIRCUIT_BREAKER_SYNC_INTERVAL), so state
+-- survives between monitor runs and is shared across processes. Without
+-- the table breakers still work, per process.
+--
+-- Run once on existing databases.
+
+CREATE TABLE IF NOT EXISTS router_circuit_breakers (
+    router_id INTEGER PRIMARY KEY REFERENCES routers(id) ON DELETE CASCADE,
+    state VARCHAR(10) NOT NULL DEFAULT 'closed'
+        CHECK (state IN ('closed', 'open', 'half_open')),
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    trips INTEGER NOT NULL DEFAULT 0,       -- openings since the last success; sets the backoff
+    retry_at TIMESTAMP,                     -- no connects before this while open
+    last_error TEXT,
+    last_failure_at TIMESTAMP,
+    last_success_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_router_circuit_breakers_state
+    ON router_circuit_breakers(state) WHERE state <> 'closed';
+
+-- ============================================
+-- View: Routers currently skipped
+-- ============================================
+CREATE OR REPLACE VIEW v_router_circuit_breakers AS
+SELECT
+    r.hostname,
+    r.ip_address,
+    b.state,
+    b.consecutive_failures,
+    b.trips,
+    b.retry_at,
+    GREATEST(0, EXTRACT(EPOCH FROM (b.retry_at - LOCALTIMESTAMP))) AS retry_in_seconds,
+    b.last_error,
+    b.last_failure_at,
+    b.last_success_at
+FROM router_circuit_breakers b
+JOIN routers r ON r.id = b.router_id
+WHERE b.state <> 'closed'
+ORDER BY b.retry_at;
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Routers skipped right now:
+-- SELECT hostname, state, retry_in_seconds, last_error FROM v_router_circuit_breakers;
+--
+-- Retry a router on its next poll (e.g. after fixing it):
+-- UPDATE router_circuit_breakers SET retry_at = LOCALTIMESTAMP
+-- WHERE router_id = (SELECT id FROM routers WHERE hostname = 'xxx-xxx-B41-GU-7004');
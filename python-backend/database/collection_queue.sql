@@ -0,0 +1,183 @@
+-- ============================================
+-- Collection Queue
+-- Shared poll schedule for collector workers on any number of hosts
+-- ============================================
+
+-- collection_queue.py workers claim due routers with FOR UPDATE SKIP
+-- LOCKED under a lease, poll them and write back the next due times. A
+-- worker that dies stops renewing its leases; once they expire the routers
+-- are claimed by someone else. Workers register themselves in
+-- collection_workers, so they can join and leave without configuration.
+--
+-- The jobs (one per router, parameter and priority tier, as in
+-- collection_daemon.py) are refreshed from the fleet inventory by one
+-- worker at a time. Run once after tejas_commands_schema.sql.
+
+-- One row per router: the claim and lease unit, so a router is only ever
+-- polled by one worker at a time
+CREATE TABLE IF NOT EXISTS collection_routers (
+    router_id INTEGER PRIMARY KEY REFERENCES routers(id) ON DELETE CASCADE,
+    due_at TIMESTAMP NOT NULL,              -- earliest due_at of its jobs
+    lease_owner VARCHAR(200),               -- worker id while claimed
+    lease_expires_at TIMESTAMP,
+    claimed_at TIMESTAMP,
+    claims INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_collection_routers_due ON collection_routers(due_at);
+
+CREATE TABLE IF NOT EXISTS collection_jobs (
+    router_id INTEGER NOT NULL REFERENCES collection_routers(router_id) ON DELETE CASCADE,
+    parameter_name VARCHAR(100) NOT NULL,
+    tier VARCHAR(20) NOT NULL,
+    interval_seconds REAL NOT NULL,
+    interface_ids INTEGER[],                -- NULL for router parameters
+    due_at TIMESTAMP NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,     -- due times dropped because the job fell behind
+    last_lag REAL,                          -- seconds between due and claim
+    last_finished_at TIMESTAMP,
+    last_worker VARCHAR(200),
+    last_error TEXT,
+    PRIMARY KEY (router_id, parameter_name, tier)
+);
+
+CREATE TABLE IF NOT EXISTS collection_workers (
+    worker_id VARCHAR(200) PRIMARY KEY,     -- hostname:pid
+    hostname VARCHAR(100),
+    pid INTEGER,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    polls INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+
+-- ============================================
+-- Function: claim_collection_routers
+-- Leases up to p_limit due, unleased (or lease-expired) routers to
+-- p_worker and returns their due jobs (one row with NULL job columns for a
+-- router with none due). Rows locked by another claim are skipped, so
+-- concurrent workers never wait on each other.
+-- ============================================
+CREATE OR REPLACE FUNCTION claim_collection_routers(p_worker TEXT, p_limit INTEGER, p_lease INTERVAL)
+RETURNS TABLE (router_id INTEGER, parameter_name VARCHAR, tier VARCHAR, interface_ids INTEGER[]) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT r.router_id
+        FROM collection_routers r
+        WHERE r.due_at <= LOCALTIMESTAMP
+          AND (r.lease_expires_at IS NULL OR r.lease_expires_at < LOCALTIMESTAMP)
+        ORDER BY r.due_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    ), claimed AS (
+        UPDATE collection_routers r
+        SET lease_owner = p_worker,
+            lease_expires_at = LOCALTIMESTAMP + p_lease,
+            claimed_at = LOCALTIMESTAMP,
+            claims = r.claims + 1
+        FROM due
+        WHERE r.router_id = due.router_id
+        RETURNING r.router_id
+    )
+    SELECT c.router_id, j.parameter_name, j.tier, j.interface_ids
+    FROM claimed c
+    LEFT JOIN collection_jobs j ON j.router_id = c.router_id AND j.due_at <= LOCALTIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- Function: complete_collection_router
+-- Records a finished poll of the given jobs, moves them to their next due
+-- time (skipping slots that already passed) and releases the lease.
+-- Returns false, changing nothing, if p_worker no longer holds the lease.
+-- ============================================
+CREATE OR REPLACE FUNCTION complete_collection_router(
+    p_worker TEXT, p_router_id INTEGER, p_parameters TEXT[], p_tiers TEXT[], p_error TEXT DEFAULT NULL
+) RETURNS BOOLEAN AS $$
+#variable_conflict use_column
+DECLARE
+    v_claimed_at TIMESTAMP;
+BEGIN
+    SELECT r.claimed_at INTO v_claimed_at
+    FROM collection_routers r
+    WHERE r.router_id = p_router_id AND r.lease_owner = p_worker
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN false;
+    END IF;
+
+    UPDATE collection_jobs j
+    SET runs = j.runs + 1,
+        failures = j.failures + (p_error IS NOT NULL)::INTEGER,
+        last_lag = GREATEST(0, EXTRACT(EPOCH FROM (v_claimed_at - j.due_at))),
+        last_finished_at = LOCALTIMESTAMP,
+        last_worker = p_worker,
+        last_error = p_error,
+        -- next slot after now: one interval on, or more if the job fell behind
+        skipped = j.skipped + GREATEST(1, CEIL(EXTRACT(EPOCH FROM (LOCALTIMESTAMP - j.due_at)) / j.interval_seconds))::INTEGER - 1,
+        due_at = j.due_at + GREATEST(1, CEIL(EXTRACT(EPOCH FROM (LOCALTIMESTAMP - j.due_at)) / j.interval_seconds))::INTEGER
+                            * j.interval_seconds * INTERVAL '1 second'
+    FROM unnest(p_parameters, p_tiers) AS done(parameter_name, tier)
+    WHERE j.router_id = p_router_id
+      AND j.parameter_name = done.parameter_name
+      AND j.tier = done.tier;
+
+    UPDATE collection_routers r
+    SET lease_owner = NULL,
+        lease_expires_at = NULL,
+        due_at = COALESCE((SELECT MIN(j.due_at) FROM collection_jobs j WHERE j.router_id = r.router_id),
+                          LOCALTIMESTAMP + INTERVAL '1 minute')
+    WHERE r.router_id = p_router_id;
+
+    UPDATE collection_workers w
+    SET polls = w.polls + 1,
+        failures = w.failures + (p_error IS NOT NULL)::INTEGER,
+        heartbeat_at = LOCALTIMESTAMP
+    WHERE w.worker_id = p_worker;
+
+    RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- View: Queue state with per-job lag
+-- ============================================
+CREATE OR REPLACE VIEW v_collection_queue AS
+SELECT
+    r.hostname,
+    j.parameter_name,
+    j.tier,
+    j.interval_seconds,
+    cardinality(j.interface_ids) AS interfaces,
+    j.due_at,
+    GREATEST(0, EXTRACT(EPOCH FROM (LOCALTIMESTAMP - j.due_at))) AS overdue_seconds,
+    j.last_lag,
+    j.runs,
+    j.failures,
+    j.skipped,
+    j.last_worker,
+    j.last_error,
+    cr.lease_owner,
+    cr.lease_expires_at
+FROM collection_jobs j
+JOIN collection_routers cr ON cr.router_id = j.router_id
+JOIN routers r ON r.id = j.router_id
+ORDER BY j.due_at;
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Workers and their throughput:
+-- SELECT worker_id, heartbeat_at, polls, failures FROM collection_workers ORDER BY worker_id;
+--
+-- Jobs more than one interval behind:
+-- SELECT * FROM v_collection_queue WHERE overdue_seconds > interval_seconds;
+--
+-- Routers claimed by a worker that stopped renewing:
+-- SELECT router_id, lease_owner, lease_expires_at FROM collection_routers
+-- WHERE lease_expires_at < LOCALTIMESTAMP;
@@ -0,0 +1,34 @@
+-- ============================================
+-- Collection Schedule
+-- Per-parameter poll intervals for the resident collector
+-- ============================================
+
+-- collection_daemon.py polls every router/parameter pair every
+-- poll_interval_seconds (NULL = COLLECTOR_DEFAULT_INTERVAL). Changes are
+-- picked up on the daemon's next inventory reload, no restart needed.
+--
+-- Run once on existing databases (after tejas_commands_schema.sql); new
+-- installs get this from schema_multi_parameter.sql / tejas_commands_schema.sql.
+
+ALTER TABLE monitoring_parameters ADD COLUMN IF NOT EXISTS poll_interval_seconds INTEGER;
+
+-- Routing state changes matter within a minute; optics drift slowly
+UPDATE monitoring_parameters SET poll_interval_seconds = 60
+WHERE parameter_name IN ('TEJAS_OSPF_NEIGHBORS', 'TEJAS_BGP_SUMMARY');
+
+UPDATE monitoring_parameters SET poll_interval_seconds = 300
+WHERE parameter_name = 'TEJAS_SFP_100G_STATS';
+
+UPDATE monitoring_parameters SET poll_interval_seconds = 900
+WHERE parameter_name = 'TEJAS_SFP_100G_INFO';
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Current schedule:
+-- SELECT parameter_name, applies_to, poll_interval_seconds
+-- FROM monitoring_parameters WHERE is_active = true ORDER BY parameter_name;
+--
+-- Poll BGP every 30 seconds (applied on the daemon's next reload):
+-- UPDATE monitoring_parameters SET poll_interval_seconds = 30
+-- WHERE parameter_name = 'TEJAS_BGP_SUMMARY';
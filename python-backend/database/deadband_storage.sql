@@ -0,0 +1,50 @@
+-- ============================================
+-- Deadband Change-Only Storage
+-- Per-parameter settings for storing readings only when they change
+-- ============================================
+
+-- The monitors' reading writer (deadband_filter.py) compares each parsed
+-- reading with the last one it stored for the same router/interface/
+-- parameter. Unchanged readings only refresh latest_parameter_readings;
+-- parameter_readings gets a row when a field changes, a number moves more
+-- than deadband, or heartbeat_seconds have passed.
+--
+--   deadband           NULL = store every reading (default for all parameters)
+--                      0    = store on any change
+--                      >0   = numeric values must move more than this
+--   deadband_ignore    field names never compared, at any nesting level
+--   heartbeat_seconds  store at least this often (NULL = READING_DEADBAND_HEARTBEAT)
+--
+-- Run once on existing databases (after tejas_commands_schema.sql); new
+-- installs get this from schema_multi_parameter.sql / tejas_commands_schema.sql.
+
+ALTER TABLE monitoring_parameters ADD COLUMN IF NOT EXISTS deadband REAL;
+ALTER TABLE monitoring_parameters ADD COLUMN IF NOT EXISTS deadband_ignore TEXT[];
+ALTER TABLE monitoring_parameters ADD COLUMN IF NOT EXISTS heartbeat_seconds INTEGER;
+
+-- OSPF / BGP: store on any state change; timers, counters and uptimes
+-- move on every poll and are not compared
+UPDATE monitoring_parameters
+SET deadband = 0, deadband_ignore = ARRAY['dead_time', 'helper_age'], heartbeat_seconds = 900
+WHERE parameter_name = 'TEJAS_OSPF_NEIGHBORS';
+
+UPDATE monitoring_parameters
+SET deadband = 0, deadband_ignore = ARRAY['total_change_version', 'version', 'msg_rcvd', 'msg_sent', 'uptime'],
+    heartbeat_seconds = 900
+WHERE parameter_name = 'TEJAS_BGP_SUMMARY';
+
+-- SFP info: powers (dBm), temperature (C) and voltage (V) within 0.5 of
+-- the last stored reading count as unchanged
+UPDATE monitoring_parameters
+SET deadband = 0.5, deadband_ignore = NULL, heartbeat_seconds = 900
+WHERE parameter_name = 'TEJAS_SFP_100G_INFO';
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Current settings:
+-- SELECT parameter_name, deadband, deadband_ignore, heartbeat_seconds
+-- FROM monitoring_parameters WHERE deadband IS NOT NULL;
+--
+-- Back to storing every reading for one parameter:
+-- UPDATE monitoring_parameters SET deadband = NULL WHERE parameter_name = 'TEJAS_SFP_100G_INFO';
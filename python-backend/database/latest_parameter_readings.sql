@@ -0,0 +1,210 @@
+-- ============================================
+-- Latest Parameter Readings
+-- One row per router/interface/parameter with its newest reading, so the
+-- "current state" views no longer scan parameter_readings history
+-- ============================================
+
+-- reading_writer upserts into this table in the same transaction as the
+-- history insert (READING_WRITER_UPDATE_LATEST); a late, older reading never
+-- overwrites a newer one. Run this script once on existing databases (after
+-- schema_multi_parameter.sql and tejas_commands_schema.sql); new installs get
+-- the table and views from those files.
+
+CREATE TABLE IF NOT EXISTS latest_parameter_readings (
+    router_id INTEGER NOT NULL REFERENCES routers(id) ON DELETE CASCADE,
+    interface_id INTEGER REFERENCES router_interfaces(id) ON DELETE CASCADE,
+    interface_key INTEGER GENERATED ALWAYS AS (COALESCE(interface_id, 0)) STORED,  -- 0 = router-level
+    parameter_id INTEGER NOT NULL REFERENCES monitoring_parameters(id) ON DELETE CASCADE,
+    reading_data JSONB NOT NULL,
+    raw_output TEXT,
+    reading_time TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (router_id, interface_key, parameter_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_latest_readings_interface ON latest_parameter_readings(interface_id);
+CREATE INDEX IF NOT EXISTS idx_latest_readings_parameter ON latest_parameter_readings(parameter_id);
+
+-- Backfill from history
+INSERT INTO latest_parameter_readings (router_id, interface_id, parameter_id, reading_data, raw_output, reading_time)
+SELECT DISTINCT ON (router_id, COALESCE(interface_id, 0), parameter_id)
+    router_id, interface_id, parameter_id, reading_data, raw_output, reading_time
+FROM parameter_readings
+WHERE reading_time IS NOT NULL
+ORDER BY router_id, COALESCE(interface_id, 0), parameter_id, reading_time DESC, id DESC
+ON CONFLICT (router_id, interface_key, parameter_id) DO NOTHING;
+
+-- ============================================
+-- Views: read current state from latest_parameter_readings
+-- ============================================
+
+-- View: Latest readings for all parameters
+CREATE OR REPLACE VIEW v_latest_parameter_readings AS
+SELECT 
+    r.id as router_id,
+    r.hostname,
+    r.ip_address,
+    ri.id as interface_id,
+    ri.interface_name,
+    ri.interface_label,
+    mp.parameter_name,
+    mp.parameter_category,
+    lr.reading_data,
+    lr.reading_time
+FROM routers r
+LEFT JOIN router_interfaces ri ON r.id = ri.router_id
+JOIN monitoring_parameters mp ON mp.is_active = true
+LEFT JOIN LATERAL (
+    SELECT reading_data, reading_time
+    FROM latest_parameter_readings
+    WHERE router_id = r.id 
+      AND interface_key IN (COALESCE(ri.id, 0), 0)
+      AND parameter_id = mp.id
+    ORDER BY reading_time DESC
+    LIMIT 1
+) lr ON true
+WHERE r.is_active = true
+ORDER BY r.hostname, ri.interface_name, mp.parameter_category, mp.parameter_name;
+
+-- View: SFP Power readings only
+CREATE OR REPLACE VIEW v_sfp_power_readings AS
+SELECT 
+    r.hostname,
+    ri.interface_label,
+    ri.interface_name,
+    lr.reading_data->>'rx_power' as rx_power,
+    lr.reading_data->>'tx_power' as tx_power,
+    lr.reading_data->>'laser_type' as laser_type,
+    lr.reading_data->>'temperature' as temperature,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN router_interfaces ri ON lr.interface_id = ri.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+WHERE mp.parameter_category = 'OPTICAL'
+ORDER BY r.hostname, ri.interface_name;
+
+-- View: System health summary
+CREATE OR REPLACE VIEW v_system_health AS
+SELECT 
+    r.hostname,
+    r.ip_address,
+    r.location,
+    MAX(CASE WHEN mp.parameter_name = 'CPU_USAGE' 
+        THEN lr.reading_data->>'cpu_usage_5min' END) as cpu_usage,
+    MAX(CASE WHEN mp.parameter_name = 'MEMORY_USAGE' 
+        THEN lr.reading_data->>'memory_usage_percent' END) as memory_usage,
+    MAX(CASE WHEN mp.parameter_name = 'TEMPERATURE' 
+        THEN lr.reading_data->>'board_temp' END) as temperature,
+    MAX(lr.reading_time) as last_update
+FROM routers r
+LEFT JOIN latest_parameter_readings lr ON r.id = lr.router_id
+LEFT JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+WHERE mp.parameter_category = 'SYSTEM'
+GROUP BY r.id, r.hostname, r.ip_address, r.location
+ORDER BY r.hostname;
+
+-- View: Latest OSPF Neighbors
+CREATE OR REPLACE VIEW v_tejas_ospf_neighbors AS
+SELECT 
+    r.hostname,
+    r.ip_address,
+    lr.reading_data->>'neighbor_id' as neighbor_id,
+    lr.reading_data->>'state' as state,
+    lr.reading_data->>'neighbor_address' as neighbor_address,
+    lr.reading_data->>'interface' as interface,
+    lr.reading_data->>'bfd_status' as bfd_status,
+    lr.reading_data->>'area_id' as area_id,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+WHERE mp.parameter_name = 'TEJAS_OSPF_NEIGHBORS'
+ORDER BY r.hostname, lr.reading_data->>'neighbor_id';
+
+-- View: Latest BGP Summary
+CREATE OR REPLACE VIEW v_tejas_bgp_summary AS
+SELECT 
+    r.hostname,
+    r.ip_address,
+    lr.reading_data->>'router_id' as bgp_router_id,
+    lr.reading_data->>'local_as' as local_as,
+    lr.reading_data->>'established_count' as established_count,
+    lr.reading_data->>'configured_count' as configured_count,
+    lr.reading_data->>'forwarding_state' as forwarding_state,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+WHERE mp.parameter_name = 'TEJAS_BGP_SUMMARY'
+ORDER BY r.hostname;
+
+-- View: Latest SFP 100G Info
+CREATE OR REPLACE VIEW v_tejas_sfp_100g_info AS
+SELECT 
+    r.hostname,
+    ri.interface_name,
+    ri.interface_label,
+    lr.reading_data->>'laser_status' as laser_status,
+    lr.reading_data->>'operational_status' as operational_status,
+    lr.reading_data->>'laser_type' as laser_type,
+    lr.reading_data->>'rx_power' as rx_power,
+    lr.reading_data->>'tx_power' as tx_power,
+    lr.reading_data->>'module_temperature' as temperature,
+    lr.reading_data->>'module_voltage' as voltage,
+    lr.reading_data->>'vendor_name' as vendor,
+    lr.reading_data->>'serial_number' as serial_number,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN router_interfaces ri ON lr.interface_id = ri.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+WHERE mp.parameter_name = 'TEJAS_SFP_100G_INFO'
+ORDER BY r.hostname, ri.interface_name;
+
+-- View: Latest SFP 100G Stats (with all lanes)
+CREATE OR REPLACE VIEW v_tejas_sfp_100g_stats AS
+SELECT 
+    r.hostname,
+    ri.interface_name,
+    ri.interface_label,
+    lr.reading_data->>'rx_power_lane0' as rx_power_lane0,
+    lr.reading_data->>'rx_power_lane1' as rx_power_lane1,
+    lr.reading_data->>'rx_power_lane2' as rx_power_lane2,
+    lr.reading_data->>'rx_power_lane3' as rx_power_lane3,
+    lr.reading_data->>'tx_power_lane0' as tx_power_lane0,
+    lr.reading_data->>'tx_power_lane1' as tx_power_lane1,
+    lr.reading_data->>'tx_power_lane2' as tx_power_lane2,
+    lr.reading_data->>'tx_power_lane3' as tx_power_lane3,
+    lr.reading_data->>'module_temperature' as temperature,
+    lr.reading_data->>'module_voltage' as voltage,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN router_interfaces ri ON lr.interface_id = ri.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+WHERE mp.parameter_name = 'TEJAS_SFP_100G_STATS'
+ORDER BY r.hostname, ri.interface_name;
+
+-- Function to get latest reading for specific parameter
+CREATE OR REPLACE FUNCTION get_latest_reading(
+    p_router_id INTEGER,
+    p_interface_id INTEGER,
+    p_parameter_name VARCHAR
+)
+RETURNS JSONB AS $$
+DECLARE
+    result JSONB;
+BEGIN
+    SELECT reading_data INTO result
+    FROM latest_parameter_readings lr
+    JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+    WHERE lr.router_id = p_router_id
+      AND (lr.interface_id = p_interface_id OR p_interface_id IS NULL)
+      AND mp.parameter_name = p_parameter_name
+    ORDER BY lr.reading_time DESC
+    LIMIT 1;
+    
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql;
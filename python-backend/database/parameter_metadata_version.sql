@@ -0,0 +1,38 @@
+-- ============================================
+-- Parameter Metadata Versioning
+-- Lets the monitors' metadata cache detect parser changes
+-- ============================================
+
+-- The cache reloads when MAX(monitoring_parameters.updated_at) or the row
+-- counts change. Parsers have no updated_at of their own, so any parser
+-- insert/update/delete touches its parent parameter instead.
+
+CREATE OR REPLACE FUNCTION touch_parameter_on_parser_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE monitoring_parameters
+    SET updated_at = CURRENT_TIMESTAMP
+    WHERE id = COALESCE(NEW.parameter_id, OLD.parameter_id);
+
+    IF TG_OP = 'UPDATE' AND NEW.parameter_id <> OLD.parameter_id THEN
+        UPDATE monitoring_parameters
+        SET updated_at = CURRENT_TIMESTAMP
+        WHERE id = OLD.parameter_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS touch_parameter_on_parser_change ON parameter_parsers;
+
+CREATE TRIGGER touch_parameter_on_parser_change
+    AFTER INSERT OR UPDATE OR DELETE ON parameter_parsers
+    FOR EACH ROW
+    EXECUTE FUNCTION touch_parameter_on_parser_change();
+
+-- Version check the cache runs once per cycle:
+-- SELECT
+--     (SELECT MAX(updated_at) FROM monitoring_parameters),
+--     (SELECT COUNT(*) FROM monitoring_parameters),
+--     (SELECT COUNT(*) FROM parameter_parsers);
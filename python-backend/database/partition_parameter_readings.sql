@@ -0,0 +1,186 @@
+-- ============================================
+-- Parameter Readings Partitioning
+-- Range partitions of parameter_readings by reading_time, created ahead of
+-- time, and retention by dropping whole partitions instead of DELETE
+-- ============================================
+
+-- Run once after schema_multi_parameter.sql. On an existing database where
+-- parameter_readings is still a plain table, this script converts it in
+-- place (copies the rows into dated partitions). Daily partitions by
+-- default; for monthly ones run first:
+--     SET readings.partition_interval = 'month';
+-- Keep one interval per database - day and month ranges would overlap.
+--
+-- partition_maintenance.py calls the two functions below (daily cron job);
+-- the ingest path, latest_parameter_readings and the views are unchanged.
+
+-- ============================================
+-- Function: create_parameter_readings_partitions
+-- Creates the missing partitions from p_from (default: now) up to
+-- p_ahead intervals ahead; returns the names of the partitions created
+-- ============================================
+CREATE OR REPLACE FUNCTION create_parameter_readings_partitions(
+    p_interval TEXT DEFAULT 'day',
+    p_ahead INTEGER DEFAULT 7,
+    p_from TIMESTAMP DEFAULT NULL
+)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    v_step INTERVAL;
+    v_start TIMESTAMP;
+    v_end TIMESTAMP;
+    v_name TEXT;
+BEGIN
+    IF p_interval NOT IN ('day', 'month') THEN
+        RAISE EXCEPTION 'partition interval must be day or month, got %', p_interval;
+    END IF;
+
+    v_step := ('1 ' || p_interval)::INTERVAL;
+    v_start := date_trunc(p_interval, LEAST(COALESCE(p_from, LOCALTIMESTAMP), LOCALTIMESTAMP));
+    v_end := date_trunc(p_interval, LOCALTIMESTAMP) + v_step * (p_ahead + 1);
+
+    WHILE v_start < v_end LOOP
+        v_name := 'parameter_readings_p'
+                  || to_char(v_start, CASE p_interval WHEN 'day' THEN 'YYYYMMDD' ELSE 'YYYYMM' END);
+
+        IF to_regclass(v_name) IS NULL THEN
+            -- Build the partition standalone, move in any rows that landed in
+            -- the default partition for its range, then attach it (attaching
+            -- creates the parent's indexes and constraints on it)
+            EXECUTE format('CREATE TABLE %I (LIKE parameter_readings INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                           v_name);
+            EXECUTE format('WITH moved AS (
+                                DELETE FROM parameter_readings_default
+                                WHERE reading_time >= %L AND reading_time < %L
+                                RETURNING *
+                            )
+                            INSERT INTO %I SELECT * FROM moved',
+                           v_start, v_start + v_step, v_name);
+            EXECUTE format('ALTER TABLE parameter_readings ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           v_name, v_start, v_start + v_step);
+            RETURN NEXT v_name;
+        END IF;
+
+        v_start := v_start + v_step;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- Function: drop_parameter_readings_partitions
+-- Drops every partition whose range ends before now() - p_retention and
+-- deletes expired stragglers from the default partition; returns the
+-- names of the partitions dropped
+-- ============================================
+CREATE OR REPLACE FUNCTION drop_parameter_readings_partitions(p_retention INTERVAL)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    v_cutoff TIMESTAMP := LOCALTIMESTAMP - p_retention;
+    v_partition RECORD;
+BEGIN
+    FOR v_partition IN
+        SELECT c.relname,
+               substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)')::TIMESTAMP AS upper_bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'parameter_readings'::regclass
+        ORDER BY c.relname
+    LOOP
+        -- The default partition has no upper bound and is never dropped
+        IF v_partition.upper_bound IS NOT NULL AND v_partition.upper_bound <= v_cutoff THEN
+            EXECUTE format('DROP TABLE %I', v_partition.relname);
+            RETURN NEXT v_partition.relname;
+        END IF;
+    END LOOP;
+
+    DELETE FROM parameter_readings_default WHERE reading_time < v_cutoff;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- Convert an existing plain parameter_readings table
+-- ============================================
+DO $$
+DECLARE
+    v_interval TEXT := COALESCE(NULLIF(current_setting('readings.partition_interval', true), ''), 'day');
+    v_oldest TIMESTAMP;
+    v_index TEXT;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_class WHERE oid = to_regclass('parameter_readings') AND relkind = 'r'
+    ) THEN
+        RETURN;  -- already partitioned (or not created yet)
+    END IF;
+
+    ALTER TABLE parameter_readings RENAME TO parameter_readings_unpartitioned;
+    FOR v_index IN
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = 'parameter_readings_unpartitioned'::regclass
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', v_index, v_index || '_unpartitioned');
+    END LOOP;
+
+    UPDATE parameter_readings_unpartitioned
+    SET reading_time = COALESCE(created_at, LOCALTIMESTAMP)
+    WHERE reading_time IS NULL;
+
+    -- Same columns as the old table (including any added by later upgrade scripts)
+    CREATE TABLE parameter_readings (
+        LIKE parameter_readings_unpartitioned INCLUDING DEFAULTS,
+        PRIMARY KEY (id, reading_time)
+    ) PARTITION BY RANGE (reading_time);
+
+    ALTER TABLE parameter_readings
+        ADD FOREIGN KEY (router_id) REFERENCES routers(id) ON DELETE CASCADE,
+        ADD FOREIGN KEY (interface_id) REFERENCES router_interfaces(id) ON DELETE CASCADE,
+        ADD FOREIGN KEY (parameter_id) REFERENCES monitoring_parameters(id) ON DELETE CASCADE;
+
+    CREATE TABLE parameter_readings_default PARTITION OF parameter_readings DEFAULT;
+
+    CREATE INDEX idx_readings_router ON parameter_readings(router_id);
+    CREATE INDEX idx_readings_interface ON parameter_readings(interface_id);
+    CREATE INDEX idx_readings_parameter ON parameter_readings(parameter_id);
+    CREATE INDEX idx_readings_time ON parameter_readings(reading_time DESC);
+    CREATE INDEX idx_readings_data ON parameter_readings USING GIN (reading_data);
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'parameter_readings' AND column_name = 'raw_output_hash'
+    ) THEN
+        CREATE INDEX idx_readings_raw_output_hash ON parameter_readings(raw_output_hash);
+    END IF;
+
+    -- Partitions for the whole history first, so the copy lands in them
+    -- directly instead of going through the default partition
+    SELECT MIN(reading_time) INTO v_oldest FROM parameter_readings_unpartitioned;
+    PERFORM create_parameter_readings_partitions(v_interval, 7, v_oldest);
+
+    INSERT INTO parameter_readings SELECT * FROM parameter_readings_unpartitioned;
+
+    ALTER SEQUENCE parameter_readings_id_seq OWNED BY parameter_readings.id;
+    DROP TABLE parameter_readings_unpartitioned;
+
+    RAISE NOTICE 'parameter_readings converted to % partitions', v_interval;
+END;
+$$;
+
+-- ============================================
+-- Partitions for today and the week ahead
+-- ============================================
+SELECT create_parameter_readings_partitions(
+    COALESCE(NULLIF(current_setting('readings.partition_interval', true), ''), 'day'), 7
+);
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Partitions with their ranges and sizes:
+-- SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS range,
+--        pg_size_pretty(pg_total_relation_size(c.oid)) AS size
+-- FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+-- WHERE i.inhparent = 'parameter_readings'::regclass ORDER BY c.relname;
+--
+-- Rows waiting in the default partition (should be ~0 once maintenance runs):
+-- SELECT COUNT(*) FROM parameter_readings_default;
+--
+-- Drop partitions older than 90 days:
+-- SELECT drop_parameter_readings_partitions(INTERVAL '90 days');
@@ -0,0 +1,39 @@
+-- ============================================
+-- Priority Tiers
+-- Poll important interfaces and parameters more often than idle ones
+-- ============================================
+
+-- collection_daemon.py multiplies a parameter's poll_interval_seconds by
+-- its tier factor (COLLECTOR_TIER_FACTORS, default critical 0.25, high 0.5,
+-- normal 1, low 4):
+--
+--   monitoring_parameters.priority  tier of router parameters (OSPF, BGP)
+--                                   and default for interface parameters
+--   router_interfaces.priority      tier of that interface's parameters
+--                                   (NULL = the parameter's tier)
+--
+-- Each router is kept under COLLECTOR_ROUTER_COMMAND_BUDGET SSH commands
+-- per minute; over budget, low-tier polls are slowed first, then normal,
+-- high and critical. Changes apply on the daemon's next inventory reload.
+--
+-- Run once on existing databases (after collection_schedule.sql); new
+-- installs get this from schema_multi_parameter.sql / tejas_commands_schema.sql.
+
+ALTER TABLE router_interfaces ADD COLUMN IF NOT EXISTS priority VARCHAR(20)
+    CHECK (priority IN ('critical', 'high', 'normal', 'low'));
+ALTER TABLE monitoring_parameters ADD COLUMN IF NOT EXISTS priority VARCHAR(20)
+    CHECK (priority IN ('critical', 'high', 'normal', 'low'));
+
+-- Backbone link polled at the critical tier
+UPDATE router_interfaces SET priority = 'critical' WHERE interface_label = 'JUGIAL-PKT';
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Interfaces by tier:
+-- SELECT COALESCE(priority, 'normal') AS tier, COUNT(*)
+-- FROM router_interfaces WHERE is_monitored = true GROUP BY 1 ORDER BY 1;
+--
+-- Poll spare ports rarely:
+-- UPDATE router_interfaces SET priority = 'low'
+-- WHERE interface_label ILIKE '%SPARE%';
@@ -0,0 +1,67 @@
+-- ============================================
+-- Raw Output Store
+-- Each distinct CLI output stored once, compressed, keyed by its SHA-256;
+-- readings reference it by raw_output_hash instead of holding the text
+-- ============================================
+
+-- reading_writer (READING_WRITER_RAW_STORE) compresses outputs in Python
+-- (zlib, or zstd when installed) and writes the hash into
+-- parameter_readings.raw_output_hash / latest_parameter_readings.raw_output_hash;
+-- raw_output stays for rows written before the switch. Read the text back
+-- with raw_output_store.py (get_raw_output / --reading-id).
+--
+-- Run once on existing databases (after latest_parameter_readings.sql);
+-- new installs get this from schema_multi_parameter.sql. Then optionally:
+--     python raw_output_store.py --migrate
+
+CREATE TABLE IF NOT EXISTS raw_outputs (
+    hash VARCHAR(64) PRIMARY KEY,          -- hex SHA-256 of the UTF-8 text
+    encoding VARCHAR(10) NOT NULL,         -- zlib | zstd | none
+    payload BYTEA NOT NULL,
+    original_size INTEGER NOT NULL,        -- bytes before compression
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Already compressed; skip PostgreSQL's own TOAST compression attempt
+ALTER TABLE raw_outputs ALTER COLUMN payload SET STORAGE EXTERNAL;
+
+ALTER TABLE parameter_readings ADD COLUMN IF NOT EXISTS raw_output_hash VARCHAR(64);
+ALTER TABLE latest_parameter_readings ADD COLUMN IF NOT EXISTS raw_output_hash VARCHAR(64);
+
+-- Lets prune_raw_outputs find unreferenced outputs without scanning history
+CREATE INDEX IF NOT EXISTS idx_readings_raw_output_hash ON parameter_readings(raw_output_hash);
+
+-- ============================================
+-- Function: prune_raw_outputs
+-- Deletes outputs no reading references any more (e.g. after
+-- drop_parameter_readings_partitions); p_grace keeps recently stored ones
+-- that in-flight writes may still reference. Writers trust a stored hash
+-- for RAW_OUTPUT_CACHE_TTL and refresh created_at when they re-send it, so
+-- p_grace must stay well above that TTL. Returns outputs deleted.
+-- ============================================
+CREATE OR REPLACE FUNCTION prune_raw_outputs(p_grace INTERVAL DEFAULT INTERVAL '1 day')
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM raw_outputs ro
+    WHERE ro.created_at < LOCALTIMESTAMP - p_grace
+      AND NOT EXISTS (SELECT 1 FROM parameter_readings pr WHERE pr.raw_output_hash = ro.hash)
+      AND NOT EXISTS (SELECT 1 FROM latest_parameter_readings lr WHERE lr.raw_output_hash = ro.hash);
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Store size and compression ratio:
+-- SELECT COUNT(*), pg_size_pretty(SUM(original_size)) AS original,
+--        pg_size_pretty(SUM(octet_length(payload))) AS stored
+-- FROM raw_outputs;
+--
+-- Most repeated outputs:
+-- SELECT raw_output_hash, COUNT(*) FROM parameter_readings
+-- GROUP BY raw_output_hash ORDER BY COUNT(*) DESC LIMIT 20;
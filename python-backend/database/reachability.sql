@@ -0,0 +1,59 @@
+-- ============================================
+-- TCP Reachability
+-- router_ping_status filled by reachability_prober.py (one TCP connect
+-- sweep of the whole fleet) instead of one `ping` subprocess per router
+-- ============================================
+
+-- The prober connects to every router's ssh_port with a sub-second
+-- timeout and upserts all results in one statement. Columns keep their
+-- meaning for the dashboard:
+--
+--   is_online      SSH port accepted a connection
+--   response_time  TCP handshake time in ms
+--   packet_loss    failed connects out of REACHABILITY_ATTEMPTS, in %
+--
+-- collection_daemon.py sweeps every COLLECTOR_REACHABILITY_INTERVAL and
+-- CollectionEngine before every collection cycle, both writing here; routers that are down are not SSH'd
+-- (COLLECTOR_SKIP_UNREACHABLE) or polled last.
+--
+-- Run once after database/migrations/005_create_ping_status_table.sql;
+-- set PING_MONITOR_BACKEND=python so the Next.js ping loop stops.
+
+ALTER TABLE router_ping_status ADD COLUMN IF NOT EXISTS check_method VARCHAR(10) DEFAULT 'icmp';
+ALTER TABLE router_ping_status ADD COLUMN IF NOT EXISTS check_port INTEGER;
+ALTER TABLE router_ping_status ADD COLUMN IF NOT EXISTS last_online_at TIMESTAMP;
+ALTER TABLE router_ping_status ADD COLUMN IF NOT EXISTS consecutive_failures INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN router_ping_status.check_method IS 'icmp (lib/ping-monitor.js) or tcp (reachability_prober.py)';
+COMMENT ON COLUMN router_ping_status.consecutive_failures IS 'Sweeps in a row that found the router down';
+
+-- ============================================
+-- View: Routers down, longest outage first
+-- ============================================
+CREATE OR REPLACE VIEW v_routers_down AS
+SELECT
+    r.hostname,
+    r.ip_address,
+    r.location,
+    s.check_method,
+    s.check_port,
+    s.consecutive_failures,
+    s.last_online_at,
+    s.last_checked,
+    s.error_message
+FROM router_ping_status s
+JOIN routers r ON r.id = s.router_id
+WHERE s.is_online = false AND r.is_active = true
+ORDER BY s.last_online_at NULLS FIRST;
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Slowest handshakes:
+-- SELECT r.hostname, s.response_time FROM router_ping_status s
+-- JOIN routers r ON r.id = s.router_id WHERE s.is_online ORDER BY s.response_time DESC LIMIT 20;
+--
+-- Routers the sweep hasn't reached lately:
+-- SELECT r.hostname, s.last_checked FROM routers r
+-- LEFT JOIN router_ping_status s ON s.router_id = r.id
+-- WHERE r.is_active AND (s.last_checked IS NULL OR s.last_checked < NOW() - INTERVAL '10 minutes');
@@ -4,7 +4,9 @@
 -- ============================================
 
 -- Drop existing tables
+DROP TABLE IF EXISTS latest_parameter_readings CASCADE;
 DROP TABLE IF EXISTS parameter_readings CASCADE;
+DROP TABLE IF EXISTS raw_outputs CASCADE;
 DROP TABLE IF EXISTS parameter_parsers CASCADE;
 DROP TABLE IF EXISTS monitoring_parameters CASCADE;
 DROP TABLE IF EXISTS router_interfaces CASCADE;
@@ -43,6 +45,8 @@ CREATE TABLE router_interfaces (
     interface_label VARCHAR(100),
     interface_type VARCHAR(50),  -- e.g., '100G', '10G', 'GE', etc.
     is_monitored BOOLEAN DEFAULT true,
+    -- Poll tier (collection_daemon.py): 'critical', 'high', 'normal', 'low'; NULL = the parameter's tier
+    priority VARCHAR(20) CHECK (priority IN ('critical', 'high', 'normal', 'low')),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(router_id, interface_name)
@@ -63,6 +67,13 @@ CREATE TABLE monitoring_parameters (
     command_template VARCHAR(500),  -- e.g., 'show sfp 100g {interface}', 'show cpu-usage'
     applies_to VARCHAR(50),  -- 'INTERFACE', 'ROUTER', 'BOTH'
     is_active BOOLEAN DEFAULT true,
+    -- Change-only storage (deadband_filter.py): NULL = store every reading,
+    -- 0 = store on any change, >0 = numbers must move more than this
+    deadband REAL,
+    deadband_ignore TEXT[],  -- fields never compared (counters, timers, uptimes)
+    heartbeat_seconds INTEGER,  -- store at least this often (NULL = READING_DEADBAND_HEARTBEAT)
+    poll_interval_seconds INTEGER,  -- collection_daemon.py poll interval (NULL = COLLECTOR_DEFAULT_INTERVAL)
+    priority VARCHAR(20) CHECK (priority IN ('critical', 'high', 'normal', 'low')),  -- NULL = 'normal'
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -87,26 +98,74 @@ CREATE TABLE parameter_parsers (
 
 CREATE INDEX idx_parsers_parameter ON parameter_parsers(parameter_id);
 
+-- ============================================
+-- Table: raw_outputs
+-- Each distinct command output once, compressed, keyed by its SHA-256
+-- (written by reading_writer, read back with raw_output_store.py)
+-- ============================================
+CREATE TABLE raw_outputs (
+    hash VARCHAR(64) PRIMARY KEY,          -- hex SHA-256 of the UTF-8 text
+    encoding VARCHAR(10) NOT NULL,         -- zlib | zstd | none
+    payload BYTEA NOT NULL,
+    original_size INTEGER NOT NULL,        -- bytes before compression
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Already compressed; skip PostgreSQL's own TOAST compression attempt
+ALTER TABLE raw_outputs ALTER COLUMN payload SET STORAGE EXTERNAL;
+
 -- ============================================
 -- Table: parameter_readings
 -- Stores all parameter readings (flexible JSON storage)
+-- Range-partitioned by reading_time; partitions are created ahead of time
+-- and dropped after retention by partition_parameter_readings.sql /
+-- partition_maintenance.py
 -- ============================================
 CREATE TABLE parameter_readings (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     router_id INTEGER NOT NULL REFERENCES routers(id) ON DELETE CASCADE,
     interface_id INTEGER REFERENCES router_interfaces(id) ON DELETE CASCADE,
     parameter_id INTEGER NOT NULL REFERENCES monitoring_parameters(id) ON DELETE CASCADE,
     reading_data JSONB NOT NULL,  -- Flexible JSON storage for any parameters
-    raw_output TEXT,  -- Original command output
-    reading_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    raw_output TEXT,  -- Original command output (inline; older rows)
+    raw_output_hash VARCHAR(64),  -- Original command output in raw_outputs
+    reading_time TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, reading_time)  -- must include the partition key
+) PARTITION BY RANGE (reading_time);
+
+-- Catch-all so inserts never fail before the dated partitions exist;
+-- maintenance moves its rows into the matching partition once created
+CREATE TABLE parameter_readings_default PARTITION OF parameter_readings DEFAULT;
 
+-- Indexes on the parent are created on every partition (and on new ones)
 CREATE INDEX idx_readings_router ON parameter_readings(router_id);
 CREATE INDEX idx_readings_interface ON parameter_readings(interface_id);
 CREATE INDEX idx_readings_parameter ON parameter_readings(parameter_id);
 CREATE INDEX idx_readings_time ON parameter_readings(reading_time DESC);
 CREATE INDEX idx_readings_data ON parameter_readings USING GIN (reading_data);
+CREATE INDEX idx_readings_raw_output_hash ON parameter_readings(raw_output_hash);
+
+-- ============================================
+-- Table: latest_parameter_readings
+-- Newest reading per router/interface/parameter, upserted by the ingest
+-- path (reading_writer) so "current state" queries don't scan history
+-- ============================================
+CREATE TABLE latest_parameter_readings (
+    router_id INTEGER NOT NULL REFERENCES routers(id) ON DELETE CASCADE,
+    interface_id INTEGER REFERENCES router_interfaces(id) ON DELETE CASCADE,
+    interface_key INTEGER GENERATED ALWAYS AS (COALESCE(interface_id, 0)) STORED,  -- 0 = router-level
+    parameter_id INTEGER NOT NULL REFERENCES monitoring_parameters(id) ON DELETE CASCADE,
+    reading_data JSONB NOT NULL,
+    raw_output TEXT,
+    raw_output_hash VARCHAR(64),
+    reading_time TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (router_id, interface_key, parameter_id)
+);
+
+CREATE INDEX idx_latest_readings_interface ON latest_parameter_readings(interface_id);
+CREATE INDEX idx_latest_readings_parameter ON latest_parameter_readings(parameter_id);
 
 -- ============================================
 -- Sample Data - Monitoring Parameters
@@ -201,6 +260,9 @@ INSERT INTO router_interfaces (router_id, interface_name, interface_label, inter
 (2, '1/1/1', 'JUGIAL-PKT', '100G'),
 (2, '1/1/2', 'JUGIAL-MAHANPUR', '100G');
 
+-- Backbone link polled at the critical tier
+UPDATE router_interfaces SET priority = 'critical' WHERE interface_label = 'JUGIAL-PKT';
+
 -- ============================================
 -- Views for Easy Querying
 -- ============================================
@@ -216,20 +278,20 @@ SELECT
     ri.interface_label,
     mp.parameter_name,
     mp.parameter_category,
-    pr.reading_data,
-    pr.reading_time
+    lr.reading_data,
+    lr.reading_time
 FROM routers r
 LEFT JOIN router_interfaces ri ON r.id = ri.router_id
 JOIN monitoring_parameters mp ON mp.is_active = true
 LEFT JOIN LATERAL (
     SELECT reading_data, reading_time
-    FROM parameter_readings
+    FROM latest_parameter_readings
     WHERE router_id = r.id 
-      AND (interface_id = ri.id OR interface_id IS NULL)
+      AND interface_key IN (COALESCE(ri.id, 0), 0)
       AND parameter_id = mp.id
     ORDER BY reading_time DESC
     LIMIT 1
-) pr ON true
+) lr ON true
 WHERE r.is_active = true
 ORDER BY r.hostname, ri.interface_name, mp.parameter_category, mp.parameter_name;
 
@@ -239,22 +301,16 @@ SELECT
     r.hostname,
     ri.interface_label,
     ri.interface_name,
-    pr.reading_data->>'rx_power' as rx_power,
-    pr.reading_data->>'tx_power' as tx_power,
-    pr.reading_data->>'laser_type' as laser_type,
-    pr.reading_data->>'temperature' as temperature,
-    pr.reading_time
-FROM parameter_readings pr
-JOIN routers r ON pr.router_id = r.id
-JOIN router_interfaces ri ON pr.interface_id = ri.id
-JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
+    lr.reading_data->>'rx_power' as rx_power,
+    lr.reading_data->>'tx_power' as tx_power,
+    lr.reading_data->>'laser_type' as laser_type,
+    lr.reading_data->>'temperature' as temperature,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN router_interfaces ri ON lr.interface_id = ri.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
 WHERE mp.parameter_category = 'OPTICAL'
-  AND pr.reading_time = (
-      SELECT MAX(reading_time)
-      FROM parameter_readings
-      WHERE interface_id = pr.interface_id
-        AND parameter_id = pr.parameter_id
-  )
 ORDER BY r.hostname, ri.interface_name;
 
 -- View: System health summary
@@ -264,15 +320,15 @@ SELECT
     r.ip_address,
     r.location,
     MAX(CASE WHEN mp.parameter_name = 'CPU_USAGE' 
-        THEN pr.reading_data->>'cpu_usage_5min' END) as cpu_usage,
+        THEN lr.reading_data->>'cpu_usage_5min' END) as cpu_usage,
     MAX(CASE WHEN mp.parameter_name = 'MEMORY_USAGE' 
-        THEN pr.reading_data->>'memory_usage_percent' END) as memory_usage,
+        THEN lr.reading_data->>'memory_usage_percent' END) as memory_usage,
     MAX(CASE WHEN mp.parameter_name = 'TEMPERATURE' 
-        THEN pr.reading_data->>'board_temp' END) as temperature,
-    MAX(pr.reading_time) as last_update
+        THEN lr.reading_data->>'board_temp' END) as temperature,
+    MAX(lr.reading_time) as last_update
 FROM routers r
-LEFT JOIN parameter_readings pr ON r.id = pr.router_id
-LEFT JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
+LEFT JOIN latest_parameter_readings lr ON r.id = lr.router_id
+LEFT JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
 WHERE mp.parameter_category = 'SYSTEM'
 GROUP BY r.id, r.hostname, r.ip_address, r.location
 ORDER BY r.hostname;
@@ -292,18 +348,36 @@ DECLARE
     result JSONB;
 BEGIN
     SELECT reading_data INTO result
-    FROM parameter_readings pr
-    JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
-    WHERE pr.router_id = p_router_id
-      AND (pr.interface_id = p_interface_id OR p_interface_id IS NULL)
+    FROM latest_parameter_readings lr
+    JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
+    WHERE lr.router_id = p_router_id
+      AND (lr.interface_id = p_interface_id OR p_interface_id IS NULL)
       AND mp.parameter_name = p_parameter_name
-    ORDER BY pr.reading_time DESC
+    ORDER BY lr.reading_time DESC
     LIMIT 1;
     
     RETURN result;
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function to delete raw outputs no reading references any more
+-- (p_grace keeps recently stored ones in-flight writes may still reference;
+-- keep it well above the writers' RAW_OUTPUT_CACHE_TTL)
+CREATE OR REPLACE FUNCTION prune_raw_outputs(p_grace INTERVAL DEFAULT INTERVAL '1 day')
+RETURNS INTEGER AS $$
+DECLARE
+    v_deleted INTEGER;
+BEGIN
+    DELETE FROM raw_outputs ro
+    WHERE ro.created_at < LOCALTIMESTAMP - p_grace
+      AND NOT EXISTS (SELECT 1 FROM parameter_readings pr WHERE pr.raw_output_hash = ro.hash)
+      AND NOT EXISTS (SELECT 1 FROM latest_parameter_readings lr WHERE lr.raw_output_hash = ro.hash);
+
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
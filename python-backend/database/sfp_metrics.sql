@@ -0,0 +1,119 @@
+-- ============================================
+-- Typed SFP Metrics
+-- SFP 100G stats as REAL columns (one row per interface per poll) so
+-- range and trend queries don't cast JSONB text on every row
+-- ============================================
+
+-- Written in bulk by the Tejas monitors (sfp_metrics.py, SFP_METRICS_ENABLED)
+-- next to the TEJAS_SFP_100G_STATS reading, which stays as it is. Run once
+-- after tejas_commands_schema.sql (and latest_parameter_readings.sql).
+
+CREATE TABLE IF NOT EXISTS sfp_metrics (
+    router_id INTEGER NOT NULL REFERENCES routers(id) ON DELETE CASCADE,
+    interface_id INTEGER NOT NULL REFERENCES router_interfaces(id) ON DELETE CASCADE,
+    reading_time TIMESTAMP NOT NULL,
+    rx_power_lane0 REAL,        -- dBm
+    rx_power_lane1 REAL,
+    rx_power_lane2 REAL,
+    rx_power_lane3 REAL,
+    rx_power_avg REAL,
+    tx_power_lane0 REAL,        -- dBm
+    tx_power_lane1 REAL,
+    tx_power_lane2 REAL,
+    tx_power_lane3 REAL,
+    tx_power_avg REAL,
+    bias_current_lane0 REAL,    -- mA
+    bias_current_lane1 REAL,
+    bias_current_lane2 REAL,
+    bias_current_lane3 REAL,
+    module_temperature REAL,    -- C
+    module_voltage REAL,        -- V
+    inserted_at TIMESTAMP DEFAULT LOCALTIMESTAMP,  -- when the row landed; drives the SFP rollups
+    -- Covering: trend queries on the averages, temperature and voltage are
+    -- index-only scans over (interface_id, reading_time)
+    PRIMARY KEY (interface_id, reading_time)
+        INCLUDE (rx_power_avg, tx_power_avg, module_temperature, module_voltage)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sfp_metrics_router_time ON sfp_metrics(router_id, reading_time DESC);
+
+-- Backfill from the JSONB history ('N/A' and other non-numbers become NULL)
+CREATE FUNCTION pg_temp.to_real(p_value TEXT) RETURNS REAL AS $$
+    SELECT CASE WHEN p_value ~ '^\s*-?\d+(\.\d+)?\s*$' THEN p_value::REAL END
+$$ LANGUAGE sql IMMUTABLE;
+
+INSERT INTO sfp_metrics
+SELECT
+    pr.router_id, pr.interface_id, pr.reading_time,
+    pg_temp.to_real(pr.reading_data->>'rx_power_lane0'),
+    pg_temp.to_real(pr.reading_data->>'rx_power_lane1'),
+    pg_temp.to_real(pr.reading_data->>'rx_power_lane2'),
+    pg_temp.to_real(pr.reading_data->>'rx_power_lane3'),
+    pg_temp.to_real(pr.reading_data->>'rx_power_avg'),
+    pg_temp.to_real(pr.reading_data->>'tx_power_lane0'),
+    pg_temp.to_real(pr.reading_data->>'tx_power_lane1'),
+    pg_temp.to_real(pr.reading_data->>'tx_power_lane2'),
+    pg_temp.to_real(pr.reading_data->>'tx_power_lane3'),
+    pg_temp.to_real(pr.reading_data->>'tx_power_avg'),
+    pg_temp.to_real(pr.reading_data->>'bias_current_lane0'),
+    pg_temp.to_real(pr.reading_data->>'bias_current_lane1'),
+    pg_temp.to_real(pr.reading_data->>'bias_current_lane2'),
+    pg_temp.to_real(pr.reading_data->>'bias_current_lane3'),
+    pg_temp.to_real(pr.reading_data->>'module_temperature'),
+    pg_temp.to_real(pr.reading_data->>'module_voltage')
+FROM parameter_readings pr
+JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
+WHERE mp.parameter_name = 'TEJAS_SFP_100G_STATS'
+  AND pr.interface_id IS NOT NULL
+ON CONFLICT (interface_id, reading_time) DO NOTHING;
+
+-- ============================================
+-- View: Latest SFP 100G Stats (with all lanes)
+-- Now typed, from sfp_metrics; one index probe per interface
+-- ============================================
+DROP VIEW IF EXISTS v_tejas_sfp_100g_stats;
+CREATE VIEW v_tejas_sfp_100g_stats AS
+SELECT
+    r.hostname,
+    ri.interface_name,
+    ri.interface_label,
+    sm.rx_power_lane0,
+    sm.rx_power_lane1,
+    sm.rx_power_lane2,
+    sm.rx_power_lane3,
+    sm.tx_power_lane0,
+    sm.tx_power_lane1,
+    sm.tx_power_lane2,
+    sm.tx_power_lane3,
+    sm.module_temperature as temperature,
+    sm.module_voltage as voltage,
+    sm.reading_time,
+    sm.rx_power_avg,
+    sm.tx_power_avg,
+    sm.bias_current_lane0,
+    sm.bias_current_lane1,
+    sm.bias_current_lane2,
+    sm.bias_current_lane3
+FROM router_interfaces ri
+JOIN routers r ON ri.router_id = r.id
+JOIN LATERAL (
+    SELECT *
+    FROM sfp_metrics
+    WHERE interface_id = ri.id
+    ORDER BY reading_time DESC
+    LIMIT 1
+) sm ON true
+ORDER BY r.hostname, ri.interface_name;
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Hourly RX average for one interface over the last 90 days:
+-- SELECT date_trunc('hour', reading_time) AS hour, AVG(rx_power_avg), MIN(rx_power_avg)
+-- FROM sfp_metrics
+-- WHERE interface_id = 1 AND reading_time >= NOW() - INTERVAL '90 days'
+-- GROUP BY 1 ORDER BY 1;
+--
+-- Interfaces whose RX power dropped below -10 dBm today:
+-- SELECT DISTINCT interface_id FROM sfp_metrics
+-- WHERE reading_time >= CURRENT_DATE AND rx_power_avg < -10;
@@ -0,0 +1,213 @@
+-- ============================================
+-- SFP Power Rollups
+-- min/max/avg/last rx and tx power per interface and lane at 5-minute,
+-- hourly and daily resolution, so history charts don't scan raw readings
+-- ============================================
+
+-- Sources: sfp_metrics (Tejas monitors, lanes 0-3 plus the lane average)
+-- and sfp_readings (router_sfp_monitor, one module value). Either may be
+-- missing. refresh_sfp_power_rollups() folds in only rows inserted since
+-- each source's watermark; sfp_rollup_job.py runs it and serves the query API.
+--
+-- The delta goes by inserted_at (set by the database when the row lands),
+-- not reading_time (set at collection): readings can sit in the writer
+-- queue for minutes under backpressure, a writer reconnect or a shutdown
+-- drain, and would otherwise arrive behind the watermark and be skipped.
+-- Run once after sfp_metrics.sql (and/or schema.sql for sfp_readings).
+
+CREATE TABLE IF NOT EXISTS sfp_power_rollups (
+    bucket_seconds INTEGER NOT NULL,        -- 300 | 3600 | 86400
+    interface_id INTEGER NOT NULL REFERENCES router_interfaces(id) ON DELETE CASCADE,
+    lane SMALLINT NOT NULL,                 -- 0-3, or -1 for the module value
+    bucket_start TIMESTAMP NOT NULL,
+    samples INTEGER NOT NULL,
+    rx_min REAL,
+    rx_max REAL,
+    rx_sum DOUBLE PRECISION,
+    rx_count INTEGER NOT NULL DEFAULT 0,
+    rx_avg REAL GENERATED ALWAYS AS (rx_sum / NULLIF(rx_count, 0)) STORED,
+    rx_last REAL,
+    tx_min REAL,
+    tx_max REAL,
+    tx_sum DOUBLE PRECISION,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    tx_avg REAL GENERATED ALWAYS AS (tx_sum / NULLIF(tx_count, 0)) STORED,
+    tx_last REAL,
+    last_time TIMESTAMP NOT NULL,           -- newest sample in the bucket (for *_last)
+    PRIMARY KEY (bucket_seconds, interface_id, lane, bucket_start)
+);
+
+-- Rows already folded in, per source table
+CREATE TABLE IF NOT EXISTS sfp_rollup_watermarks (
+    source_table VARCHAR(50) PRIMARY KEY,
+    watermark TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO sfp_rollup_watermarks (source_table, watermark) VALUES
+    ('sfp_metrics', '-infinity'),
+    ('sfp_readings', '-infinity')
+ON CONFLICT (source_table) DO NOTHING;
+
+-- Delta scans read sources by inserted_at. The column is added without a
+-- default first so existing rows stay NULL (no table rewrite, and rows
+-- already rolled up aren't picked up again); those still ahead of the old
+-- reading_time watermark are folded in by reading_time one last time.
+DO $$
+BEGIN
+    IF to_regclass('sfp_metrics') IS NOT NULL THEN
+        ALTER TABLE sfp_metrics ADD COLUMN IF NOT EXISTS inserted_at TIMESTAMP;
+        ALTER TABLE sfp_metrics ALTER COLUMN inserted_at SET DEFAULT LOCALTIMESTAMP;
+        CREATE INDEX IF NOT EXISTS idx_sfp_metrics_inserted ON sfp_metrics(inserted_at);
+        CREATE INDEX IF NOT EXISTS idx_sfp_metrics_time ON sfp_metrics(reading_time);
+    END IF;
+    IF to_regclass('sfp_readings') IS NOT NULL THEN
+        ALTER TABLE sfp_readings ADD COLUMN IF NOT EXISTS inserted_at TIMESTAMP;
+        ALTER TABLE sfp_readings ALTER COLUMN inserted_at SET DEFAULT LOCALTIMESTAMP;
+        CREATE INDEX IF NOT EXISTS idx_sfp_readings_inserted ON sfp_readings(inserted_at);
+    END IF;
+END $$;
+
+-- ============================================
+-- Function: refresh_sfp_power_rollups
+-- Folds source rows inserted between the watermark and now() - p_lag into
+-- all three resolutions and advances the watermark, in one transaction.
+-- p_lag leaves time for writer transactions still in flight (inserted_at
+-- is their start time). Concurrent runs wait on the watermark row lock.
+-- ============================================
+CREATE OR REPLACE FUNCTION refresh_sfp_power_rollups(p_lag INTERVAL DEFAULT INTERVAL '2 minutes')
+RETURNS TABLE (source_table TEXT, samples BIGINT, from_time TIMESTAMP, to_time TIMESTAMP) AS $$
+#variable_conflict use_column
+DECLARE
+    v_upper TIMESTAMP := LOCALTIMESTAMP - p_lag;
+    v_metrics_from TIMESTAMP;
+    v_readings_from TIMESTAMP;
+    v_bucket INTEGER;
+BEGIN
+    SELECT w.watermark INTO v_metrics_from
+    FROM sfp_rollup_watermarks w WHERE w.source_table = 'sfp_metrics' FOR UPDATE;
+    SELECT w.watermark INTO v_readings_from
+    FROM sfp_rollup_watermarks w WHERE w.source_table = 'sfp_readings' FOR UPDATE;
+
+    DROP TABLE IF EXISTS pg_temp.sfp_rollup_delta;
+    CREATE TEMP TABLE sfp_rollup_delta (
+        source_table TEXT,
+        interface_id INTEGER,
+        lane SMALLINT,
+        reading_time TIMESTAMP,
+        rx REAL,
+        tx REAL
+    ) ON COMMIT DROP;
+
+    IF to_regclass('sfp_metrics') IS NOT NULL AND v_metrics_from IS NOT NULL THEN
+        INSERT INTO sfp_rollup_delta
+        SELECT 'sfp_metrics', m.interface_id, v.lane, m.reading_time, v.rx, v.tx
+        FROM sfp_metrics m
+        CROSS JOIN LATERAL (VALUES
+            (0::SMALLINT, m.rx_power_lane0, m.tx_power_lane0),
+            (1::SMALLINT, m.rx_power_lane1, m.tx_power_lane1),
+            (2::SMALLINT, m.rx_power_lane2, m.tx_power_lane2),
+            (3::SMALLINT, m.rx_power_lane3, m.tx_power_lane3),
+            (-1::SMALLINT, m.rx_power_avg, m.tx_power_avg)
+        ) AS v(lane, rx, tx)
+        WHERE m.inserted_at > v_metrics_from AND m.inserted_at <= v_upper
+          AND (v.rx IS NOT NULL OR v.tx IS NOT NULL);
+
+        -- Rows written before inserted_at existed
+        INSERT INTO sfp_rollup_delta
+        SELECT 'sfp_metrics', m.interface_id, v.lane, m.reading_time, v.rx, v.tx
+        FROM sfp_metrics m
+        CROSS JOIN LATERAL (VALUES
+            (0::SMALLINT, m.rx_power_lane0, m.tx_power_lane0),
+            (1::SMALLINT, m.rx_power_lane1, m.tx_power_lane1),
+            (2::SMALLINT, m.rx_power_lane2, m.tx_power_lane2),
+            (3::SMALLINT, m.rx_power_lane3, m.tx_power_lane3),
+            (-1::SMALLINT, m.rx_power_avg, m.tx_power_avg)
+        ) AS v(lane, rx, tx)
+        WHERE m.inserted_at IS NULL AND m.reading_time > v_metrics_from AND m.reading_time <= v_upper
+          AND (v.rx IS NOT NULL OR v.tx IS NOT NULL);
+    END IF;
+
+    IF to_regclass('sfp_readings') IS NOT NULL AND v_readings_from IS NOT NULL THEN
+        -- rx/tx are text there ('N/A' when the router didn't report them)
+        INSERT INTO sfp_rollup_delta
+        SELECT 'sfp_readings', s.interface_id, -1, s.reading_time,
+               substring(s.rx_power FROM '^\s*(-?\d+(?:\.\d+)?)')::REAL,
+               substring(s.tx_power FROM '^\s*(-?\d+(?:\.\d+)?)')::REAL
+        FROM sfp_readings s
+        WHERE (s.inserted_at > v_readings_from AND s.inserted_at <= v_upper)
+           OR (s.inserted_at IS NULL AND s.reading_time > v_readings_from AND s.reading_time <= v_upper);
+
+        DELETE FROM sfp_rollup_delta d
+        WHERE d.source_table = 'sfp_readings' AND d.rx IS NULL AND d.tx IS NULL;
+    END IF;
+
+    FOREACH v_bucket IN ARRAY ARRAY[300, 3600, 86400] LOOP
+        INSERT INTO sfp_power_rollups AS r (
+            bucket_seconds, interface_id, lane, bucket_start, samples,
+            rx_min, rx_max, rx_sum, rx_count, rx_last,
+            tx_min, tx_max, tx_sum, tx_count, tx_last, last_time
+        )
+        SELECT
+            v_bucket,
+            d.interface_id,
+            d.lane,
+            'epoch'::TIMESTAMP + floor(extract(epoch FROM d.reading_time) / v_bucket) * v_bucket * INTERVAL '1 second',
+            COUNT(*),
+            MIN(d.rx), MAX(d.rx), SUM(d.rx::DOUBLE PRECISION), COUNT(d.rx),
+            (array_agg(d.rx ORDER BY d.reading_time DESC) FILTER (WHERE d.rx IS NOT NULL))[1],
+            MIN(d.tx), MAX(d.tx), SUM(d.tx::DOUBLE PRECISION), COUNT(d.tx),
+            (array_agg(d.tx ORDER BY d.reading_time DESC) FILTER (WHERE d.tx IS NOT NULL))[1],
+            MAX(d.reading_time)
+        FROM sfp_rollup_delta d
+        GROUP BY 2, 3, 4
+        ON CONFLICT (bucket_seconds, interface_id, lane, bucket_start) DO UPDATE SET
+            samples = r.samples + EXCLUDED.samples,
+            rx_min = LEAST(r.rx_min, EXCLUDED.rx_min),
+            rx_max = GREATEST(r.rx_max, EXCLUDED.rx_max),
+            rx_sum = COALESCE(r.rx_sum, 0) + COALESCE(EXCLUDED.rx_sum, 0),
+            rx_count = r.rx_count + EXCLUDED.rx_count,
+            rx_last = CASE WHEN EXCLUDED.last_time >= r.last_time
+                           THEN COALESCE(EXCLUDED.rx_last, r.rx_last) ELSE r.rx_last END,
+            tx_min = LEAST(r.tx_min, EXCLUDED.tx_min),
+            tx_max = GREATEST(r.tx_max, EXCLUDED.tx_max),
+            tx_sum = COALESCE(r.tx_sum, 0) + COALESCE(EXCLUDED.tx_sum, 0),
+            tx_count = r.tx_count + EXCLUDED.tx_count,
+            tx_last = CASE WHEN EXCLUDED.last_time >= r.last_time
+                           THEN COALESCE(EXCLUDED.tx_last, r.tx_last) ELSE r.tx_last END,
+            last_time = GREATEST(r.last_time, EXCLUDED.last_time);
+    END LOOP;
+
+    -- Watermarks only move forward, up to the cutoff (not to the last row,
+    -- so a quiet source doesn't get re-scanned from far back next time)
+    UPDATE sfp_rollup_watermarks w
+    SET watermark = GREATEST(w.watermark, v_upper), updated_at = CURRENT_TIMESTAMP
+    WHERE w.source_table IN ('sfp_metrics', 'sfp_readings');
+
+    RETURN QUERY
+    SELECT 'sfp_metrics'::TEXT, COUNT(*) FILTER (WHERE d.source_table = 'sfp_metrics' AND d.lane = -1),
+           v_metrics_from, v_upper
+    FROM sfp_rollup_delta d
+    UNION ALL
+    SELECT 'sfp_readings'::TEXT, COUNT(*) FILTER (WHERE d.source_table = 'sfp_readings'),
+           v_readings_from, v_upper
+    FROM sfp_rollup_delta d;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- Useful queries
+-- ============================================
+-- Fold in new readings now:
+-- SELECT * FROM refresh_sfp_power_rollups();
+--
+-- Readings that reached the table long after collection (writer backlog):
+-- SELECT MAX(inserted_at - reading_time) FROM sfp_metrics
+-- WHERE inserted_at > NOW() - INTERVAL '1 day';
+--
+-- Hourly rx power of one interface (lane -1 = module / lane average):
+-- SELECT bucket_start, rx_min, rx_avg, rx_max, rx_last
+-- FROM sfp_power_rollups
+-- WHERE bucket_seconds = 3600 AND interface_id = 1 AND lane = -1
+--   AND bucket_start >= NOW() - INTERVAL '7 days'
+-- ORDER BY bucket_start;
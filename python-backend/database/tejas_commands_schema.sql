@@ -137,6 +137,78 @@ BEGIN
     (stats_param_id, 'interval_valid', 'Interval Valid\s*:\s*(\d+)', 'number', '', 16);
 END $$;
 
+-- Typed copy of the stats for range/trend queries (written by the Tejas
+-- monitors through sfp_metrics.py; the JSONB reading above stays as is)
+CREATE TABLE IF NOT EXISTS sfp_metrics (
+    router_id INTEGER NOT NULL REFERENCES routers(id) ON DELETE CASCADE,
+    interface_id INTEGER NOT NULL REFERENCES router_interfaces(id) ON DELETE CASCADE,
+    reading_time TIMESTAMP NOT NULL,
+    rx_power_lane0 REAL,        -- dBm
+    rx_power_lane1 REAL,
+    rx_power_lane2 REAL,
+    rx_power_lane3 REAL,
+    rx_power_avg REAL,
+    tx_power_lane0 REAL,        -- dBm
+    tx_power_lane1 REAL,
+    tx_power_lane2 REAL,
+    tx_power_lane3 REAL,
+    tx_power_avg REAL,
+    bias_current_lane0 REAL,    -- mA
+    bias_current_lane1 REAL,
+    bias_current_lane2 REAL,
+    bias_current_lane3 REAL,
+    module_temperature REAL,    -- C
+    module_voltage REAL,        -- V
+    -- Covering: trend queries on the averages, temperature and voltage are
+    -- index-only scans over (interface_id, reading_time)
+    PRIMARY KEY (interface_id, reading_time)
+        INCLUDE (rx_power_avg, tx_power_avg, module_temperature, module_voltage)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sfp_metrics_router_time ON sfp_metrics(router_id, reading_time DESC);
+
+-- ============================================
+-- 5. Change-only storage (deadband_filter.py)
+-- Readings equal to the last stored one (within the deadband) only
+-- refresh latest_parameter_readings; history gets a row on change or
+-- every heartbeat_seconds
+-- ============================================
+
+-- OSPF / BGP: store on any state change; timers, counters and uptimes
+-- move on every poll and are not compared
+UPDATE monitoring_parameters
+SET deadband = 0, deadband_ignore = ARRAY['dead_time', 'helper_age'], heartbeat_seconds = 900
+WHERE parameter_name = 'TEJAS_OSPF_NEIGHBORS';
+
+UPDATE monitoring_parameters
+SET deadband = 0, deadband_ignore = ARRAY['total_change_version', 'version', 'msg_rcvd', 'msg_sent', 'uptime'],
+    heartbeat_seconds = 900
+WHERE parameter_name = 'TEJAS_BGP_SUMMARY';
+
+-- SFP info: powers (dBm), temperature (C) and voltage (V) within 0.5 of
+-- the last stored reading count as unchanged
+UPDATE monitoring_parameters
+SET deadband = 0.5, deadband_ignore = NULL, heartbeat_seconds = 900
+WHERE parameter_name = 'TEJAS_SFP_100G_INFO';
+
+-- ============================================
+-- 6. Poll intervals (collection_daemon.py)
+-- How often the daemon collects each parameter from every router
+-- ============================================
+
+UPDATE monitoring_parameters SET poll_interval_seconds = 60
+WHERE parameter_name IN ('TEJAS_OSPF_NEIGHBORS', 'TEJAS_BGP_SUMMARY');
+
+UPDATE monitoring_parameters SET poll_interval_seconds = 300
+WHERE parameter_name = 'TEJAS_SFP_100G_STATS';
+
+UPDATE monitoring_parameters SET poll_interval_seconds = 900
+WHERE parameter_name = 'TEJAS_SFP_100G_INFO';
+
+-- Priority tiers scale these intervals per interface (router_interfaces.priority)
+-- and per parameter (monitoring_parameters.priority) - see priority_tiers.sql
+UPDATE router_interfaces SET priority = 'critical' WHERE interface_label = 'JUGIAL-PKT';
+
 -- ============================================
 -- Sample Data - Update existing routers
 -- ============================================
@@ -165,46 +237,34 @@ CREATE OR REPLACE VIEW v_tejas_ospf_neighbors AS
 SELECT 
     r.hostname,
     r.ip_address,
-    pr.reading_data->>'neighbor_id' as neighbor_id,
-    pr.reading_data->>'state' as state,
-    pr.reading_data->>'neighbor_address' as neighbor_address,
-    pr.reading_data->>'interface' as interface,
-    pr.reading_data->>'bfd_status' as bfd_status,
-    pr.reading_data->>'area_id' as area_id,
-    pr.reading_time
-FROM parameter_readings pr
-JOIN routers r ON pr.router_id = r.id
-JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
+    lr.reading_data->>'neighbor_id' as neighbor_id,
+    lr.reading_data->>'state' as state,
+    lr.reading_data->>'neighbor_address' as neighbor_address,
+    lr.reading_data->>'interface' as interface,
+    lr.reading_data->>'bfd_status' as bfd_status,
+    lr.reading_data->>'area_id' as area_id,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
 WHERE mp.parameter_name = 'TEJAS_OSPF_NEIGHBORS'
-  AND pr.reading_time = (
-      SELECT MAX(reading_time)
-      FROM parameter_readings
-      WHERE router_id = pr.router_id
-        AND parameter_id = pr.parameter_id
-  )
-ORDER BY r.hostname, pr.reading_data->>'neighbor_id';
+ORDER BY r.hostname, lr.reading_data->>'neighbor_id';
 
 -- View: Latest BGP Summary
 CREATE OR REPLACE VIEW v_tejas_bgp_summary AS
 SELECT 
     r.hostname,
     r.ip_address,
-    pr.reading_data->>'router_id' as bgp_router_id,
-    pr.reading_data->>'local_as' as local_as,
-    pr.reading_data->>'established_count' as established_count,
-    pr.reading_data->>'configured_count' as configured_count,
-    pr.reading_data->>'forwarding_state' as forwarding_state,
-    pr.reading_time
-FROM parameter_readings pr
-JOIN routers r ON pr.router_id = r.id
-JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
+    lr.reading_data->>'router_id' as bgp_router_id,
+    lr.reading_data->>'local_as' as local_as,
+    lr.reading_data->>'established_count' as established_count,
+    lr.reading_data->>'configured_count' as configured_count,
+    lr.reading_data->>'forwarding_state' as forwarding_state,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
 WHERE mp.parameter_name = 'TEJAS_BGP_SUMMARY'
-  AND pr.reading_time = (
-      SELECT MAX(reading_time)
-      FROM parameter_readings
-      WHERE router_id = pr.router_id
-        AND parameter_id = pr.parameter_id
-  )
 ORDER BY r.hostname;
 
 -- View: Latest SFP 100G Info
@@ -213,57 +273,56 @@ SELECT
     r.hostname,
     ri.interface_name,
     ri.interface_label,
-    pr.reading_data->>'laser_status' as laser_status,
-    pr.reading_data->>'operational_status' as operational_status,
-    pr.reading_data->>'laser_type' as laser_type,
-    pr.reading_data->>'rx_power' as rx_power,
-    pr.reading_data->>'tx_power' as tx_power,
-    pr.reading_data->>'module_temperature' as temperature,
-    pr.reading_data->>'module_voltage' as voltage,
-    pr.reading_data->>'vendor_name' as vendor,
-    pr.reading_data->>'serial_number' as serial_number,
-    pr.reading_time
-FROM parameter_readings pr
-JOIN routers r ON pr.router_id = r.id
-JOIN router_interfaces ri ON pr.interface_id = ri.id
-JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
+    lr.reading_data->>'laser_status' as laser_status,
+    lr.reading_data->>'operational_status' as operational_status,
+    lr.reading_data->>'laser_type' as laser_type,
+    lr.reading_data->>'rx_power' as rx_power,
+    lr.reading_data->>'tx_power' as tx_power,
+    lr.reading_data->>'module_temperature' as temperature,
+    lr.reading_data->>'module_voltage' as voltage,
+    lr.reading_data->>'vendor_name' as vendor,
+    lr.reading_data->>'serial_number' as serial_number,
+    lr.reading_time
+FROM latest_parameter_readings lr
+JOIN routers r ON lr.router_id = r.id
+JOIN router_interfaces ri ON lr.interface_id = ri.id
+JOIN monitoring_parameters mp ON lr.parameter_id = mp.id
 WHERE mp.parameter_name = 'TEJAS_SFP_100G_INFO'
-  AND pr.reading_time = (
-      SELECT MAX(reading_time)
-      FROM parameter_readings
-      WHERE interface_id = pr.interface_id
-        AND parameter_id = pr.parameter_id
-  )
 ORDER BY r.hostname, ri.interface_name;
 
--- View: Latest SFP 100G Stats (with all lanes)
-CREATE OR REPLACE VIEW v_tejas_sfp_100g_stats AS
-SELECT 
+-- View: Latest SFP 100G Stats (with all lanes, typed from sfp_metrics)
+DROP VIEW IF EXISTS v_tejas_sfp_100g_stats;
+CREATE VIEW v_tejas_sfp_100g_stats AS
+SELECT
     r.hostname,
     ri.interface_name,
     ri.interface_label,
-    pr.reading_data->>'rx_power_lane0' as rx_power_lane0,
-    pr.reading_data->>'rx_power_lane1' as rx_power_lane1,
-    pr.reading_data->>'rx_power_lane2' as rx_power_lane2,
-    pr.reading_data->>'rx_power_lane3' as rx_power_lane3,
-    pr.reading_data->>'tx_power_lane0' as tx_power_lane0,
-    pr.reading_data->>'tx_power_lane1' as tx_power_lane1,
-    pr.reading_data->>'tx_power_lane2' as tx_power_lane2,
-    pr.reading_data->>'tx_power_lane3' as tx_power_lane3,
-    pr.reading_data->>'module_temperature' as temperature,
-    pr.reading_data->>'module_voltage' as voltage,
-    pr.reading_time
-FROM parameter_readings pr
-JOIN routers r ON pr.router_id = r.id
-JOIN router_interfaces ri ON pr.interface_id = ri.id
-JOIN monitoring_parameters mp ON pr.parameter_id = mp.id
-WHERE mp.parameter_name = 'TEJAS_SFP_100G_STATS'
-  AND pr.reading_time = (
-      SELECT MAX(reading_time)
-      FROM parameter_readings
-      WHERE interface_id = pr.interface_id
-        AND parameter_id = pr.parameter_id
-  )
+    sm.rx_power_lane0,
+    sm.rx_power_lane1,
+    sm.rx_power_lane2,
+    sm.rx_power_lane3,
+    sm.tx_power_lane0,
+    sm.tx_power_lane1,
+    sm.tx_power_lane2,
+    sm.tx_power_lane3,
+    sm.module_temperature as temperature,
+    sm.module_voltage as voltage,
+    sm.reading_time,
+    sm.rx_power_avg,
+    sm.tx_power_avg,
+    sm.bias_current_lane0,
+    sm.bias_current_lane1,
+    sm.bias_current_lane2,
+    sm.bias_current_lane3
+FROM router_interfaces ri
+JOIN routers r ON ri.router_id = r.id
+JOIN LATERAL (
+    SELECT *
+    FROM sfp_metrics
+    WHERE interface_id = ri.id
+    ORDER BY reading_time DESC
+    LIMIT 1
+) sm ON true
 ORDER BY r.hostname, ri.interface_name;
 
 -- ============================================
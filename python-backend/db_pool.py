@@ -0,0 +1,195 @@
+"""
+PostgreSQL Connection Pool
+One process-wide psycopg2 ThreadedConnectionPool for the Flask endpoints, so
+requests check out an open connection instead of connecting every time
+
+Checkouts wait up to DB_POOL_CHECKOUT_TIMEOUT for a free connection (the
+plain ThreadedConnectionPool raises as soon as it is exhausted), and broken
+connections are detected and replaced instead of being handed out again.
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (override from .env); psycopg2 keeps at most MIN_CONN idle
+# connections open and closes the rest as they're returned
+DB_POOL_MIN_CONN = int(os.getenv('DB_POOL_MIN_CONN', '5'))
+DB_POOL_MAX_CONN = int(os.getenv('DB_POOL_MAX_CONN', '20'))
+DB_POOL_CHECKOUT_TIMEOUT = float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', '10'))
+
+# Connections idle longer than this get a SELECT 1 before reuse
+HEALTH_CHECK_AFTER = float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', '30'))
+
+# Errors that mean the connection itself is gone, not just the statement
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class DBConnectionPool:
+    """Thread-safe connection pool with checkout timeouts and health checks"""
+
+    def __init__(self, config, minconn=DB_POOL_MIN_CONN, maxconn=DB_POOL_MAX_CONN,
+                 checkout_timeout=DB_POOL_CHECKOUT_TIMEOUT, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+
+        self._pool = ThreadedConnectionPool(minconn, maxconn, **config, **connect_kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_used = {}   # id(conn) -> monotonic time it was returned
+        self._in_use = 0
+        self._closed = False
+
+        self.counters = {
+            'checkouts': 0,
+            'waits': 0,              # checkouts that found the pool exhausted
+            'wait_time': 0.0,        # seconds spent waiting for a free connection
+            'max_wait': 0.0,
+            'timeouts': 0,
+            'discarded_broken': 0
+        }
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _return(self, conn, close=False):
+        if self._closed:
+            conn.close()
+        else:
+            self._pool.putconn(conn, close=close)
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        self._return(conn, close=True)
+        self.counters['discarded_broken'] += 1
+
+    def getconn(self, timeout=None):
+        """Check out a connection, waiting up to timeout seconds for a free one"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+
+        start = time.monotonic()
+        waited = not self._slots.acquire(blocking=False)
+        if waited and not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self.counters['timeouts'] += 1
+                self.counters['waits'] += 1
+                self.counters['wait_time'] += time.monotonic() - start
+            raise TimeoutError(f"Timed out after {timeout:.0f}s waiting for a database connection")
+        wait = time.monotonic() - start
+
+        try:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Database connection pool is closed")
+
+                conn = self._pool.getconn()
+                idle_since = self._last_used.get(id(conn))
+                stale = idle_since is not None and time.monotonic() - idle_since > HEALTH_CHECK_AFTER
+                if conn.closed or (stale and not self._is_alive(conn)):
+                    with self._lock:
+                        self._discard(conn)
+                    logger.warning("⚠️  Discarded a broken database connection")
+                    continue
+                break
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self.counters['checkouts'] += 1
+            if waited:
+                self.counters['waits'] += 1
+                self.counters['wait_time'] += wait
+                self.counters['max_wait'] = max(self.counters['max_wait'], wait)
+        return conn
+
+    def putconn(self, conn, broken=False):
+        """Return a connection (closed instead if it is broken)"""
+        try:
+            with self._lock:
+                self._in_use -= 1
+                if broken or conn.closed:
+                    self._discard(conn)
+                    return
+                self._last_used[id(conn)] = time.monotonic()
+
+            # The pool rolls back an open transaction before keeping the connection
+            self._return(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Usage:
+            with pool.connection() as conn:
+                cursor = conn.cursor()
+                ...
+        """
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, broken)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            return {
+                'in_use': self._in_use,
+                'min_connections': self.minconn,
+                'max_connections': self.maxconn,
+                **counters,
+                'wait_time': round(counters['wait_time'], 3),
+                'max_wait': round(counters['max_wait'], 3),
+                'avg_wait': round(counters['wait_time'] / counters['waits'], 3) if counters['waits'] else 0.0
+            }
+
+    def close_all(self):
+        self._closed = True
+        self._pool.closeall()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_db_pool(config, **connect_kwargs):
+    """Shared pool for the whole process (created on first use with this config)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DBConnectionPool(config, **connect_kwargs)
+            atexit.register(_pool.close_all)
+        return _pool
+
+
+def peek_pool():
+    """The shared pool if it has been created, else None (never connects)"""
+    return _pool
@@ -0,0 +1,151 @@
+"""
+Deadband Change-Only Filter
+Decides whether a parsed reading goes to parameter_readings history: only
+when a field changed, a numeric value moved beyond the parameter's deadband,
+or the heartbeat interval passed since the last stored row
+
+The last stored reading per router/interface/parameter is kept in memory;
+settings come from monitoring_parameters through the metadata cache
+(deadband, deadband_ignore, heartbeat_seconds - database/deadband_storage.sql).
+Parameters without a deadband are stored every time. Readings the filter
+skips still refresh latest_parameter_readings.
+"""
+
+import os
+import time
+import logging
+import threading
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+READING_DEADBAND_ENABLED = os.getenv('READING_DEADBAND_ENABLED', 'true').lower() == 'true'
+READING_DEADBAND_HEARTBEAT = float(os.getenv('READING_DEADBAND_HEARTBEAT', '900'))
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def changed(old, new, deadband=0.0, ignore=frozenset()):
+    """
+    True if new differs from old: any structural or text change, or a
+    number (including numeric strings like '-2.31') moving more than deadband
+    """
+    if isinstance(new, dict):
+        if not isinstance(old, dict) or old.keys() - ignore != new.keys() - ignore:
+            return True
+        return any(changed(old[key], value, deadband, ignore)
+                   for key, value in new.items() if key not in ignore)
+
+    if isinstance(new, list):
+        if not isinstance(old, list) or len(old) != len(new):
+            return True
+        return any(changed(o, n, deadband, ignore) for o, n in zip(old, new))
+
+    if old == new:
+        return False
+
+    old_number, new_number = _number(old), _number(new)
+    if old_number is not None and new_number is not None:
+        return abs(new_number - old_number) > deadband
+    return True
+
+
+class DeadbandFilter:
+    """
+    Thread-safe last-stored cache shared by the collector threads
+
+    Usage:
+        deadband = DeadbandFilter(metadata)
+        if deadband.should_store(router_id, interface_id, 'TEJAS_BGP_SUMMARY', data):
+            ...  # write to history
+    """
+
+    def __init__(self, metadata, heartbeat=READING_DEADBAND_HEARTBEAT):
+        self.metadata = metadata
+        self.heartbeat = heartbeat
+
+        self._last = {}   # (router_id, interface_id, parameter) -> (reading_data, stored_at)
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'readings': 0,
+            'stored': 0,
+            'changes': 0,
+            'heartbeats': 0,
+            'suppressed': 0
+        }
+
+    def _settings(self, parameter):
+        """(deadband, ignored fields, heartbeat) for a parameter, or None to store everything"""
+        try:
+            row = self.metadata.parameter(parameter)
+        except Exception as e:
+            logger.warning(f"⚠️  Deadband settings unavailable, storing reading: {e}")
+            return None
+        if not row or row.get('deadband') is None:
+            return None
+        return (
+            float(row['deadband']),
+            frozenset(row.get('deadband_ignore') or ()),
+            row.get('heartbeat_seconds') or self.heartbeat
+        )
+
+    def should_store(self, router_id, interface_id, parameter, reading_data, now=None):
+        """True if this reading has to be written to history (and remember it as stored)"""
+        settings = self._settings(parameter)
+        key = (router_id, interface_id, parameter)
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            self.stats['readings'] += 1
+            if settings is None:
+                self.stats['stored'] += 1
+                return True
+
+            deadband, ignore, heartbeat = settings
+            last = self._last.get(key)
+            if last is None or changed(last[0], reading_data, deadband, ignore):
+                reason = 'changes'
+            elif now - last[1] >= heartbeat:
+                reason = 'heartbeats'
+            else:
+                self.stats['suppressed'] += 1
+                return False
+
+            self._last[key] = (reading_data, now)
+            self.stats['stored'] += 1
+            self.stats[reason] += 1
+            return True
+
+    def forget(self, router_id=None):
+        """Drop cached readings (all, or one router's) so the next poll is stored"""
+        with self._lock:
+            if router_id is None:
+                self._last.clear()
+            else:
+                for key in [key for key in self._last if key[0] == router_id]:
+                    del self._last[key]
+
+    def log_stats(self):
+        stats = self.stats
+        if stats['readings']:
+            logger.info(
+                f"🎚️  Deadband: {stats['stored']}/{stats['readings']} readings stored "
+                f"({stats['changes']} changes, {stats['heartbeats']} heartbeats), "
+                f"{stats['suppressed']} unchanged kept out of history"
+            )
@@ -0,0 +1,105 @@
+"""
+Fleet Inventory Loader
+Loads routers (with credentials), their monitored interfaces and the active
+monitoring parameters in one round-trip, instead of one interface query per
+router before collection can start
+
+One set-based query returns every row (as JSON, with whatever columns the
+deployed schema has) tagged with its kind; grouping by router happens in
+memory. Router rows carry both the view's column names (ip_address,
+ssh_port) and the host/port aliases the monitors use.
+"""
+
+import time
+import logging
+
+from psycopg2.extras import RealDictCursor
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_QUERY = """
+    WITH fleet AS (
+        SELECT * FROM v_routers_with_credentials
+        WHERE is_active = true
+          AND (%(device_type)s::varchar IS NULL OR device_type = %(device_type)s)
+    )
+    SELECT 'router' AS kind, f.id AS router_id,
+           to_jsonb(f) || jsonb_build_object('host', f.ip_address, 'port', f.ssh_port) AS data
+    FROM fleet f
+    UNION ALL
+    SELECT 'interface', i.router_id, to_jsonb(i)
+    FROM router_interfaces i
+    JOIN fleet f ON f.id = i.router_id
+    WHERE i.is_monitored = true
+"""
+
+PARAMETERS_QUERY = """
+    UNION ALL
+    SELECT 'parameter', NULL, to_jsonb(p)
+    FROM monitoring_parameters p
+    WHERE p.is_active = true
+"""
+
+
+class FleetInventory:
+    """Routers, interfaces per router and active parameters for one cycle"""
+
+    def __init__(self, routers=(), interfaces=None, parameters=()):
+        self.routers = list(routers)
+        self.interfaces_by_router = interfaces or {}
+        self.all_parameters = list(parameters)
+
+    def interfaces(self, router_id):
+        return self.interfaces_by_router.get(router_id, [])
+
+    def parameters(self, applies_to=None):
+        """Active parameters, optionally for INTERFACE or ROUTER (BOTH always included)"""
+        if applies_to:
+            return [p for p in self.all_parameters if p['applies_to'] in (applies_to, 'BOTH')]
+        return self.all_parameters
+
+    def items(self):
+        """[(router, interfaces)] in hostname order"""
+        return [(router, self.interfaces(router['id'])) for router in self.routers]
+
+    def __len__(self):
+        return len(self.routers)
+
+
+def load_fleet_inventory(conn, device_type=None, parameters=True):
+    """
+    Load the whole inventory in a single query
+
+    Args:
+        device_type: only routers of this type (e.g. 'tejas'); None for all
+        parameters: also load monitoring_parameters (schemas without the
+            multi-parameter tables pass False)
+    """
+    start = time.monotonic()
+    query = INVENTORY_QUERY + (PARAMETERS_QUERY if parameters else '')
+
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute(query, {'device_type': device_type})
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    routers, interfaces, parameters = [], {}, []
+    for row in rows:
+        if row['kind'] == 'router':
+            routers.append(row['data'])
+        elif row['kind'] == 'interface':
+            interfaces.setdefault(row['router_id'], []).append(row['data'])
+        else:
+            parameters.append(row['data'])
+
+    routers.sort(key=lambda r: r['hostname'])
+    for router_interfaces in interfaces.values():
+        router_interfaces.sort(key=lambda i: i['interface_name'])
+    parameters.sort(key=lambda p: (p['parameter_category'] or '', p['parameter_name']))
+
+    logger.info(f"📊 Loaded inventory: {len(routers)} routers, "
+                f"{sum(len(i) for i in interfaces.values())} interfaces, {len(parameters)} parameters "
+                f"in {time.monotonic() - start:.3f}s")
+    return FleetInventory(routers, interfaces, parameters)
@@ -0,0 +1,160 @@
+"""
+Parameter Metadata Cache
+Loads monitoring_parameters and parameter_parsers once and shares them with
+every worker thread; reloads only when the metadata version changes
+
+The version is MAX(updated_at) plus row counts, so edits, inserts and deletes
+are all picked up (see database/parameter_metadata_version.sql for the trigger
+that bumps the parent parameter when one of its parsers changes). The cache
+has its own connection, so refreshes from worker threads never share one
+with the caller, and each refresh is one read-only transaction.
+"""
+
+import os
+import time
+import logging
+import threading
+
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+import parser_registry
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds between version checks when callers don't refresh explicitly
+PARAMETER_CACHE_MAX_AGE = float(os.getenv('PARAMETER_CACHE_MAX_AGE', '60'))
+
+VERSION_QUERY = """
+    SELECT
+        (SELECT MAX(updated_at) FROM monitoring_parameters),
+        (SELECT COUNT(*) FROM monitoring_parameters),
+        (SELECT COUNT(*) FROM parameter_parsers)
+"""
+
+
+class ParameterMetadata:
+    """Immutable snapshot of parameter metadata (parsers are CompiledParser lists)"""
+
+    def __init__(self, version, parameters, parsers):
+        self.version = version
+        self.all_parameters = parameters
+        self.parameters = [p for p in parameters if p['is_active']]
+        self.ids_by_name = {p['parameter_name']: p['id'] for p in parameters}
+        self.by_key = {**{p['id']: p for p in parameters}, **{p['parameter_name']: p for p in parameters}}
+        self.parsers_by_parameter = parsers
+
+
+class ParameterMetadataCache:
+    """Thread-safe, version-checked cache in front of the parameter tables"""
+
+    def __init__(self, connect, max_age=PARAMETER_CACHE_MAX_AGE):
+        self.connect = connect      # callable returning a new psycopg2 connection
+        self.conn = None
+        self.max_age = max_age
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'loads': 0, 'version_checks': 0}
+
+    def _load(self, cursor, version):
+        # All columns, so optional ones (e.g. the deadband settings) come along when present
+        cursor.execute("""
+            SELECT *
+            FROM monitoring_parameters
+            ORDER BY parameter_category, parameter_name
+        """)
+        parameters = [dict(row) for row in cursor.fetchall()]
+
+        cursor.execute("""
+            SELECT id, parameter_id, field_name, regex_pattern, data_type, unit
+            FROM parameter_parsers
+            ORDER BY parameter_id, display_order
+        """)
+        rows = {}
+        for row in cursor.fetchall():
+            rows.setdefault(row['parameter_id'], []).append(row)
+
+        # Compile every pattern now; invalid ones are rejected here, once
+        parser_registry.parameter_parsers.clear()
+        parsers = {
+            parameter_id: parser_registry.parameter_parsers.load(parameter_rows)
+            for parameter_id, parameter_rows in rows.items()
+        }
+
+        self.stats['loads'] += 1
+        logger.info(f"📚 Loaded metadata: {len(parameters)} parameters, "
+                    f"{sum(len(p) for p in parsers.values())} parsers")
+        return ParameterMetadata(version, parameters, parsers)
+
+    def refresh(self, force=False):
+        """Check the version and reload if it changed (call once per cycle)"""
+        with self._lock:
+            if self.conn is None or self.conn.closed:
+                self.conn = self.connect()
+                self.conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+
+            # Version and rows from one snapshot; never left idle in transaction
+            ok = False
+            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                cursor.execute(VERSION_QUERY)
+                version = tuple(cursor.fetchone().values())
+                self.stats['version_checks'] += 1
+
+                if force or self._snapshot is None or self._snapshot.version != version:
+                    self._snapshot = self._load(cursor, version)
+                ok = True
+            finally:
+                cursor.close()
+                self._end_transaction(ok)
+
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def _end_transaction(self, ok):
+        try:
+            if ok:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        except Exception:
+            # Broken connection: reconnect on the next refresh
+            self.conn.close()
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+
+    def get(self):
+        """Current snapshot; re-checks the version at most every max_age seconds"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._checked_at > self.max_age:
+            try:
+                snapshot = self.refresh()
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                logger.warning(f"⚠️  Metadata refresh failed, using cached copy: {e}")
+        return snapshot
+
+    def parameters(self, applies_to=None):
+        """Active parameters, optionally for INTERFACE or ROUTER (BOTH always included)"""
+        parameters = self.get().parameters
+        if applies_to:
+            return [p for p in parameters if p['applies_to'] in (applies_to, 'BOTH')]
+        return parameters
+
+    def parsers(self, parameter_id):
+        return self.get().parsers_by_parameter.get(parameter_id, [])
+
+    def parameter_id(self, parameter_name):
+        return self.get().ids_by_name.get(parameter_name)
+
+    def parameter(self, parameter):
+        """monitoring_parameters row by id or parameter_name (None if unknown)"""
+        return self.get().by_key.get(parameter)
@@ -0,0 +1,86 @@
+"""
+Compiled Parser Registry
+Compiles parameter_parsers regex patterns once, keyed by parser id and
+pattern, with the flags fixed at compile time
+
+Invalid patterns (bad syntax, or no capture group) are rejected when the
+parsers are loaded and logged once, instead of failing on every reading.
+"""
+
+import re
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# ParameterParser has always matched case-insensitively
+PARAMETER_PARSER_FLAGS = re.IGNORECASE
+
+
+class CompiledParser:
+    """One parameter_parsers row with its compiled regex"""
+
+    __slots__ = ('parser_id', 'field_name', 'pattern', 'data_type', 'unit', 'regex', 'error')
+
+    def __init__(self, parser_id, field_name, pattern, data_type, unit, regex, error=None):
+        self.parser_id = parser_id
+        self.field_name = field_name
+        self.pattern = pattern
+        self.data_type = data_type
+        self.unit = unit
+        self.regex = regex
+        self.error = error
+
+    @property
+    def valid(self):
+        return self.regex is not None
+
+
+class PatternRegistry:
+    """Thread-safe cache of compiled parsers"""
+
+    def __init__(self, flags=PARAMETER_PARSER_FLAGS):
+        self.flags = flags
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def _compile(self, row):
+        parser_id = row.get('id')
+        pattern = row['regex_pattern']
+        regex, error = None, None
+
+        try:
+            regex = re.compile(pattern, self.flags)
+            if regex.groups < 1:
+                regex, error = None, "pattern has no capture group"
+        except (re.error, TypeError) as e:
+            error = str(e)
+
+        if error:
+            logger.error(f"❌ Rejected parser {parser_id} ({row['field_name']}): {error}")
+
+        return CompiledParser(parser_id, row['field_name'], pattern, row.get('data_type'),
+                              row.get('unit'), regex, error)
+
+    def get(self, row):
+        """Compiled parser for a parameter_parsers row (dict with id, field_name, regex_pattern, ...)"""
+        key = (row.get('id'), row['regex_pattern'])
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(key)
+                if compiled is None:
+                    compiled = self._compiled[key] = self._compile(row)
+        return compiled
+
+    def load(self, rows):
+        """Compile a list of parser rows up front (rejects invalid ones here)"""
+        return [self.get(row) for row in rows]
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+
+
+# Shared registry for parameter_parsers patterns
+parameter_parsers = PatternRegistry()
@@ -0,0 +1,123 @@
+"""
+Parameter Readings Partition Maintenance
+Creates parameter_readings partitions ahead of time and drops the ones past
+retention (database/partition_parameter_readings.sql), then prunes raw
+outputs no reading references any more (database/raw_output_store.sql)
+
+Run daily (cron / Task Scheduler). Dropping a partition frees its disk
+space at once and leaves no dead rows to vacuum, unlike DELETE.
+
+Usage:
+    python partition_maintenance.py
+    python partition_maintenance.py --retention-days 30 --ahead 14
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Partitioning configuration (override from .env)
+READINGS_PARTITION_INTERVAL = os.getenv('READINGS_PARTITION_INTERVAL', 'day')
+READINGS_PARTITIONS_AHEAD = int(os.getenv('READINGS_PARTITIONS_AHEAD', '7'))
+READINGS_RETENTION_DAYS = int(os.getenv('READINGS_RETENTION_DAYS', '90'))
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': int(os.getenv('DB_PORT', '5432')),
+    'database': os.getenv('DB_NAME', 'cntx_portal'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD')
+}
+
+
+def run_maintenance(conn, interval=READINGS_PARTITION_INTERVAL, ahead=READINGS_PARTITIONS_AHEAD,
+                    retention_days=READINGS_RETENTION_DAYS):
+    """
+    Create missing partitions and drop expired ones in one transaction
+
+    Args:
+        interval: 'day' or 'month' (must match the existing partitions)
+        ahead: partitions to keep ready beyond the current one
+        retention_days: drop partitions older than this; 0 keeps everything
+
+    Returns:
+        (created, dropped) partition names
+    """
+    pruned = 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT create_parameter_readings_partitions(%s, %s)", (interval, ahead))
+        created = [row[0] for row in cursor.fetchall()]
+
+        dropped = []
+        if retention_days > 0:
+            cursor.execute("SELECT drop_parameter_readings_partitions(%s * INTERVAL '1 day')",
+                           (retention_days,))
+            dropped = [row[0] for row in cursor.fetchall()]
+
+        # Outputs only the dropped partitions referenced (skipped without the raw output store)
+        if dropped:
+            cursor.execute("SELECT to_regproc('prune_raw_outputs') IS NOT NULL")
+            if cursor.fetchone()[0]:
+                cursor.execute("SELECT prune_raw_outputs()")
+                pruned = cursor.fetchone()[0]
+
+        cursor.execute("SELECT COUNT(*) FROM parameter_readings_default")
+        stragglers = cursor.fetchone()[0]
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    for name in created:
+        logger.info(f"🆕 Created partition {name}")
+    for name in dropped:
+        logger.info(f"🗑️  Dropped partition {name}")
+    if pruned:
+        logger.info(f"🗑️  Pruned {pruned} unreferenced raw outputs")
+    if stragglers:
+        logger.warning(f"⚠️  {stragglers} readings in parameter_readings_default "
+                       f"(outside every partition range)")
+    logger.info(f"✅ Partition maintenance done: {len(created)} created, {len(dropped)} dropped")
+
+    return created, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--interval', choices=('day', 'month'), default=READINGS_PARTITION_INTERVAL)
+    parser.add_argument('--ahead', type=int, default=READINGS_PARTITIONS_AHEAD)
+    parser.add_argument('--retention-days', type=int, default=READINGS_RETENTION_DAYS,
+                        help='0 keeps every partition')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not DB_CONFIG['password']:
+        logger.error("❌ DB_PASSWORD not set in environment variables!")
+        sys.exit(1)
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        run_maintenance(conn, args.interval, args.ahead, args.retention_days)
+    except Exception as e:
+        logger.error(f"❌ Partition maintenance failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
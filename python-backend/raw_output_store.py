@@ -0,0 +1,348 @@
+"""
+Content-Addressed Raw Output Store
+Keeps each distinct CLI output once, compressed, in raw_outputs keyed by its
+SHA-256; parameter_readings and latest_parameter_readings only hold the hash
+(raw_output_hash) instead of the full text (database/raw_output_store.sql)
+
+An output that is byte-identical to an earlier poll costs a 64-character
+reference instead of another copy of the text in the table and the WAL.
+Hashes known to be stored are cached per writer for RAW_OUTPUT_CACHE_TTL, so
+repeated outputs are not even sent to the database again. Re-sending a hash
+that is already stored refreshes its created_at once it is older than the
+TTL, so a cached hash always points at a row prune_raw_outputs still keeps
+(RAW_OUTPUT_CACHE_TTL must stay well inside its p_grace).
+
+Usage (debugging / reparsing):
+    python raw_output_store.py <hash>
+    python raw_output_store.py --reading-id 12345
+    python raw_output_store.py --stats
+    python raw_output_store.py --migrate      # move existing raw_output text into the store
+"""
+
+import os
+import sys
+import zlib
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Store configuration (override from .env)
+RAW_OUTPUT_COMPRESSION = os.getenv('RAW_OUTPUT_COMPRESSION', 'zlib')  # zlib | zstd | none
+RAW_OUTPUT_COMPRESSION_LEVEL = int(os.getenv('RAW_OUTPUT_COMPRESSION_LEVEL', '6'))
+RAW_OUTPUT_CACHE_SIZE = int(os.getenv('RAW_OUTPUT_CACHE_SIZE', '10000'))
+RAW_OUTPUT_CACHE_TTL = int(os.getenv('RAW_OUTPUT_CACHE_TTL', '3600'))  # seconds; well under prune grace (1 day)
+
+# An output stored long ago gets its created_at refreshed, restarting the
+# prune grace period for as long as this writer's cache trusts it
+RAW_OUTPUT_INSERT = """
+    INSERT INTO raw_outputs (hash, encoding, payload, original_size)
+    VALUES %s
+    ON CONFLICT (hash) DO UPDATE SET created_at = LOCALTIMESTAMP
+    WHERE raw_outputs.created_at < LOCALTIMESTAMP - INTERVAL '{ttl} seconds'
+"""
+
+
+def digest(text):
+    """Content hash of one output (hex SHA-256 of its UTF-8 bytes)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compress(data, encoding, level=RAW_OUTPUT_COMPRESSION_LEVEL):
+    if encoding == 'zlib':
+        return zlib.compress(data, level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return data
+
+
+def decompress(payload, encoding):
+    """Original text of a stored payload"""
+    payload = bytes(payload)
+    if encoding == 'zlib':
+        payload = zlib.decompress(payload)
+    elif encoding == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed (pip install zstandard)")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    return payload.decode('utf-8')
+
+
+class RawOutputStore:
+    """
+    Write side of the store, used by ReadingWriter
+
+    Usage:
+        store = RawOutputStore()
+        rows, pending = store.prepare(rows, column=4)   # raw text -> hash
+        store.save(cursor, pending)                     # same transaction as the readings
+        conn.commit()
+        store.remember(pending)
+    """
+
+    def __init__(self, compression=RAW_OUTPUT_COMPRESSION, level=RAW_OUTPUT_COMPRESSION_LEVEL,
+                 cache_size=RAW_OUTPUT_CACHE_SIZE, cache_ttl=RAW_OUTPUT_CACHE_TTL):
+        if compression == 'zstd' and zstandard is None:
+            logger.warning("⚠️  zstandard not installed, compressing raw outputs with zlib")
+            compression = 'zlib'
+        if compression not in ('zlib', 'zstd', 'none'):
+            raise ValueError(f"Unknown raw output compression: {compression}")
+
+        self.compression = compression
+        self.level = level
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.insert_query = RAW_OUTPUT_INSERT.format(ttl=int(cache_ttl))
+
+        self._known = OrderedDict()   # hash -> monotonic time committed to raw_outputs (LRU)
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'outputs': 0,
+            'deduplicated': 0,       # outputs already stored (cache or this batch)
+            'stored': 0,
+            'original_bytes': 0,
+            'stored_bytes': 0
+        }
+
+    def _is_known(self, hash_):
+        with self._lock:
+            stored_at = self._known.get(hash_)
+            if stored_at is None:
+                return False
+            if time.monotonic() - stored_at > self.cache_ttl:
+                # May be pruned by now; send it again (refreshing created_at if it's still there)
+                del self._known[hash_]
+                return False
+            self._known.move_to_end(hash_)
+            return True
+
+    def prepare(self, rows, column):
+        """
+        Replace the raw text in rows[column] by its hash
+
+        Returns:
+            (rows, pending) - pending maps hash -> raw_outputs row for the
+            outputs that still have to be saved
+        """
+        prepared = []
+        pending = {}
+
+        for row in rows:
+            text = row[column]
+            if text is None:
+                prepared.append(row)
+                continue
+
+            hash_ = digest(text)
+            self.stats['outputs'] += 1
+            if hash_ in pending or self._is_known(hash_):
+                self.stats['deduplicated'] += 1
+            else:
+                data = text.encode('utf-8')
+                payload = compress(data, self.compression, self.level)
+                pending[hash_] = (hash_, self.compression, payload, len(data))
+                self.stats['original_bytes'] += len(data)
+                self.stats['stored_bytes'] += len(payload)
+
+            prepared.append(row[:column] + (hash_,) + row[column + 1:])
+
+        return prepared, pending
+
+    def save(self, cursor, pending):
+        """Insert pending outputs (ones another writer already stored are kept, and kept alive)"""
+        if pending:
+            entries = list(pending.values())
+            execute_values(cursor, self.insert_query, entries, page_size=len(entries))
+
+    def remember(self, pending):
+        """Mark outputs as stored - call only after the transaction committed"""
+        now = time.monotonic()
+        with self._lock:
+            for hash_ in pending:
+                self._known[hash_] = now
+                self._known.move_to_end(hash_)
+            while len(self._known) > self.cache_size:
+                self._known.popitem(last=False)
+        self.stats['stored'] += len(pending)
+
+    @property
+    def compression_ratio(self):
+        stats = self.stats
+        return stats['original_bytes'] / stats['stored_bytes'] if stats['stored_bytes'] else 0.0
+
+
+def get_raw_outputs(conn, hashes):
+    """{hash: text} for the given hashes (missing ones are left out)"""
+    hashes = list({h for h in hashes if h})
+    if not hashes:
+        return {}
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT hash, encoding, payload FROM raw_outputs WHERE hash = ANY(%s)", (hashes,))
+        return {hash_: decompress(payload, encoding) for hash_, encoding, payload in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def get_raw_output(conn, hash_):
+    """Text of one stored output, or None"""
+    return get_raw_outputs(conn, [hash_]).get(hash_)
+
+
+def get_reading_raw_output(conn, reading_id):
+    """Raw output of one parameter_readings row, whether inline (older rows) or in the store"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT raw_output, raw_output_hash FROM parameter_readings WHERE id = %s", (reading_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+
+    if row is None:
+        return None
+    raw_output, hash_ = row
+    return raw_output if raw_output is not None else get_raw_output(conn, hash_)
+
+
+def migrate_inline_outputs(conn, store=None, batch_size=1000):
+    """
+    Move raw_output text of existing rows into the store, one batch per
+    transaction; returns rows migrated
+    """
+    store = store or RawOutputStore()
+    migrated = 0
+
+    for table in ('latest_parameter_readings', 'parameter_readings'):
+        while True:
+            cursor = conn.cursor()
+            try:
+                if table == 'parameter_readings':
+                    cursor.execute(
+                        "SELECT tableoid, ctid, raw_output FROM parameter_readings "
+                        "WHERE raw_output IS NOT NULL LIMIT %s",
+                        (batch_size,)
+                    )
+                else:
+                    cursor.execute(
+                        "SELECT router_id, interface_key, parameter_id, raw_output FROM latest_parameter_readings "
+                        "WHERE raw_output IS NOT NULL LIMIT %s",
+                        (batch_size,)
+                    )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                rows, pending = store.prepare(rows, column=len(rows[0]) - 1)
+                store.save(cursor, pending)
+                if table == 'parameter_readings':
+                    execute_values(
+                        cursor,
+                        "UPDATE parameter_readings pr SET raw_output_hash = v.hash, raw_output = NULL "
+                        "FROM (VALUES %s) AS v(tableoid, ctid, hash) "
+                        "WHERE pr.tableoid = v.tableoid::oid AND pr.ctid = v.ctid::tid",
+                        rows, page_size=len(rows)
+                    )
+                else:
+                    execute_values(
+                        cursor,
+                        "UPDATE latest_parameter_readings lr SET raw_output_hash = v.hash, raw_output = NULL "
+                        "FROM (VALUES %s) AS v(router_id, interface_key, parameter_id, hash) "
+                        "WHERE (lr.router_id, lr.interface_key, lr.parameter_id) = "
+                        "(v.router_id, v.interface_key, v.parameter_id)",
+                        rows, page_size=len(rows)
+                    )
+                conn.commit()
+                store.remember(pending)
+                migrated += len(rows)
+                logger.info(f"📦 Migrated {migrated} raw outputs ({table})")
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    return migrated
+
+
+def store_stats(conn):
+    """Row count and original vs stored size of the whole store"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(original_size), 0), COALESCE(SUM(octet_length(payload)), 0)
+            FROM raw_outputs
+        """)
+        outputs, original, stored = cursor.fetchone()
+    finally:
+        cursor.close()
+    return {
+        'outputs': outputs,
+        'original_bytes': original,
+        'stored_bytes': stored,
+        'compression_ratio': round(original / stored, 2) if stored else 0.0
+    }
+
+
+def main():
+    import psycopg2
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('hash', nargs='?', help='print the stored output with this hash')
+    parser.add_argument('--reading-id', type=int, help='print the raw output of this parameter_readings row')
+    parser.add_argument('--stats', action='store_true', help='store size and compression ratio')
+    parser.add_argument('--migrate', action='store_true', help='move inline raw_output text into the store')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    db_config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', '5432')),
+        'database': os.getenv('DB_NAME', 'cntx_portal'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD')
+    }
+    if not db_config['password']:
+        logger.error("❌ DB_PASSWORD not set in environment variables!")
+        sys.exit(1)
+
+    conn = psycopg2.connect(**db_config)
+    try:
+        if args.migrate:
+            logger.info(f"✅ Migrated {migrate_inline_outputs(conn, batch_size=args.batch_size)} raw outputs")
+        elif args.stats:
+            for key, value in store_stats(conn).items():
+                print(f"{key}: {value}")
+        elif args.reading_id is not None or args.hash:
+            text = (get_reading_raw_output(conn, args.reading_id) if args.reading_id is not None
+                    else get_raw_output(conn, args.hash))
+            if text is None:
+                logger.error("❌ Raw output not found")
+                sys.exit(1)
+            print(text)
+        else:
+            parser.print_help()
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+TCP Reachability Prober
+Checks the whole fleet at once by opening a TCP connection to every
+router's SSH port with a sub-second timeout, and records availability and
+RTT for all routers in one statement (router_ping_status,
+database/reachability.sql)
+
+Replaces the per-router `ping` subprocesses of lib/ping-monitor.js for the
+fleet sweep (set PING_MONITOR_BACKEND=python for the Next.js app). The
+collection daemon runs it every COLLECTOR_REACHABILITY_INTERVAL and
+CollectionEngine before each cycle, so SSH handshakes aren't started
+against routers that are down. A router is up when its SSH port accepts
+the connection; each router gets REACHABILITY_ATTEMPTS tries.
+
+Usage:
+    python reachability_prober.py               # one sweep
+    python reachability_prober.py --loop 60     # sweep every minute
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Sweep configuration (override from .env)
+REACHABILITY_TIMEOUT = float(os.getenv('REACHABILITY_TIMEOUT', '0.8'))        # seconds per connect
+REACHABILITY_ATTEMPTS = int(os.getenv('REACHABILITY_ATTEMPTS', '2'))
+REACHABILITY_CONCURRENCY = int(os.getenv('REACHABILITY_CONCURRENCY', '500'))  # connects in flight
+
+ROUTERS_QUERY = """
+    SELECT id, hostname, ip_address, ssh_port
+    FROM routers
+    WHERE is_active = true
+    ORDER BY hostname
+"""
+
+SAVE_QUERY = """
+    INSERT INTO router_ping_status (
+        router_id, is_online, response_time, packet_loss, error_message,
+        last_checked, updated_at, check_method, check_port, last_online_at, consecutive_failures
+    )
+    VALUES %s
+    ON CONFLICT (router_id) DO UPDATE SET
+        is_online = EXCLUDED.is_online,
+        response_time = EXCLUDED.response_time,
+        packet_loss = EXCLUDED.packet_loss,
+        error_message = EXCLUDED.error_message,
+        last_checked = EXCLUDED.last_checked,
+        updated_at = EXCLUDED.updated_at,
+        check_method = EXCLUDED.check_method,
+        check_port = EXCLUDED.check_port,
+        last_online_at = COALESCE(EXCLUDED.last_online_at, router_ping_status.last_online_at),
+        consecutive_failures = CASE WHEN EXCLUDED.is_online THEN 0
+                                    ELSE router_ping_status.consecutive_failures + 1 END
+"""
+SAVE_TEMPLATE = ("(%s, %s, %s, %s, %s, NOW(), NOW(), 'tcp', %s, CASE WHEN %s THEN NOW() END, "
+                 "CASE WHEN %s THEN 0 ELSE 1 END)")
+
+
+class HostUnreachableError(Exception):
+    """Set on collection jobs skipped because the sweep found the router down"""
+
+
+class ProbeResult:
+    """Outcome of probing one router"""
+
+    __slots__ = ('router_id', 'host', 'port', 'reachable', 'rtt', 'attempts', 'failures', 'error')
+
+    def __init__(self, router_id, host, port):
+        self.router_id = router_id
+        self.host = host
+        self.port = port
+        self.reachable = False
+        self.rtt = None             # ms to complete the TCP handshake
+        self.attempts = 0
+        self.failures = 0
+        self.error = None
+
+    @property
+    def packet_loss(self):
+        """Failed connects as a percentage, in ping's terms"""
+        return 100.0 * self.failures / self.attempts if self.attempts else None
+
+
+async def probe(result, timeout=REACHABILITY_TIMEOUT, attempts=REACHABILITY_ATTEMPTS):
+    """Connect to result.host:result.port until one attempt succeeds; fills in result"""
+    for _ in range(max(1, attempts)):
+        result.attempts += 1
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(result.host, result.port), timeout)
+        except asyncio.TimeoutError:
+            result.failures += 1
+            result.error = f"No answer on port {result.port} within {timeout * 1000:.0f} ms"
+            continue
+        except OSError as e:
+            result.failures += 1
+            result.error = e.strerror or str(e)
+            continue
+
+        result.rtt = (time.perf_counter() - start) * 1000
+        result.reachable = True
+        result.error = None
+        # Handshake done; don't wait for the SSH banner
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        break
+    return result
+
+
+async def sweep(targets, timeout=REACHABILITY_TIMEOUT, attempts=REACHABILITY_ATTEMPTS,
+                concurrency=REACHABILITY_CONCURRENCY):
+    """
+    Probe every (router_id, host, port) concurrently
+
+    Returns:
+        [ProbeResult] in target order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(result):
+        async with semaphore:
+            return await probe(result, timeout, attempts)
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(bounded(ProbeResult(*target)) for target in targets))
+
+    up = sum(1 for result in results if result.reachable)
+    logger.info(f"📡 Reachability: {up}/{len(results)} routers up "
+                f"({len(results) - up} down) in {time.monotonic() - start:.2f}s")
+    return results
+
+
+def router_targets(routers):
+    """Sweep targets for router rows (ip_address, ssh_port)"""
+    return [(router['id'], router['ip_address'], router['ssh_port'] or 22) for router in routers]
+
+
+def sweep_routers(routers, **kwargs):
+    """Blocking sweep of router rows"""
+    return asyncio.run(sweep(router_targets(routers), **kwargs))
+
+
+def save_results(conn, results):
+    """Upsert all results into router_ping_status in one statement"""
+    rows = [
+        (result.router_id, result.reachable, result.rtt, result.packet_loss, result.error,
+         result.port, result.reachable, result.reachable)
+        for result in results
+    ]
+    cursor = conn.cursor()
+    try:
+        execute_values(cursor, SAVE_QUERY, rows, template=SAVE_TEMPLATE, page_size=1000)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def main():
+    import psycopg2
+    from psycopg2.extras import RealDictCursor
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--loop', type=float, default=0, help='sweep every N seconds instead of once')
+    parser.add_argument('--timeout', type=float, default=REACHABILITY_TIMEOUT, help='seconds per connect')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    db_config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', '5432')),
+        'database': os.getenv('DB_NAME', 'cntx_portal'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD')
+    }
+    if not db_config['password']:
+        logger.error("❌ DB_PASSWORD not set in environment variables!")
+        sys.exit(1)
+
+    conn = psycopg2.connect(**db_config)
+    try:
+        while True:
+            start = time.monotonic()
+            try:
+                if conn.closed:
+                    conn = psycopg2.connect(**db_config)
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+                cursor.execute(ROUTERS_QUERY)
+                routers = cursor.fetchall()
+                cursor.close()
+                conn.commit()
+
+                results = sweep_routers(routers, timeout=args.timeout)
+                save_results(conn, results)
+            except Exception as e:
+                logger.error(f"❌ Reachability sweep failed: {e}")
+                if not args.loop:
+                    sys.exit(1)
+            if not args.loop:
+                break
+            time.sleep(max(0.0, args.loop - (time.monotonic() - start)))
+    except KeyboardInterrupt:
+        logger.info("⏹️  Stopped")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,688 @@
+"""
+Buffered Parameter Readings Writer
+Collects parameter_readings rows and writes them in bulk (COPY or multi-row
+INSERT), one transaction per flush instead of one per reading, and upserts
+the newest of them into latest_parameter_readings in the same transaction
+
+Rows marked history=False (unchanged readings the deadband filter kept out
+of history) only refresh latest_parameter_readings.
+
+With the raw output store on, the CLI text goes to raw_outputs (compressed,
+once per distinct output) in that same transaction and the readings only
+carry its hash (raw_output_store.py).
+
+QueuedReadingWriter puts the same rows on a bounded queue instead; dedicated
+writer threads own their own connections and do all the commits, so collector
+threads never share a transaction (and never roll back each other's rows).
+"""
+
+import io
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+
+from raw_output_store import RawOutputStore
+from deadband_filter import READING_DEADBAND_ENABLED, DeadbandFilter
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Flush policy (override from .env)
+READING_WRITER_FLUSH_SIZE = int(os.getenv('READING_WRITER_FLUSH_SIZE', '1000'))
+READING_WRITER_FLUSH_INTERVAL = float(os.getenv('READING_WRITER_FLUSH_INTERVAL', '5'))
+READING_WRITER_METHOD = os.getenv('READING_WRITER_METHOD', 'copy')  # copy | values
+READING_WRITER_UPDATE_LATEST = os.getenv('READING_WRITER_UPDATE_LATEST', 'true').lower() == 'true'
+READING_WRITER_RAW_STORE = os.getenv('READING_WRITER_RAW_STORE', 'true').lower() == 'true'
+
+# Writer threads (QueuedReadingWriter)
+READING_WRITER_QUEUE_SIZE = int(os.getenv('READING_WRITER_QUEUE_SIZE', '10000'))
+READING_WRITER_THREADS = int(os.getenv('READING_WRITER_THREADS', '1'))
+READING_WRITER_PUT_TIMEOUT = float(os.getenv('READING_WRITER_PUT_TIMEOUT', '30'))
+
+READING_COLUMNS = ('router_id', 'interface_id', 'parameter_id', 'reading_data', 'raw_output', 'reading_time')
+RAW_OUTPUT_COLUMN = READING_COLUMNS.index('raw_output')
+HISTORY_FIELD = len(READING_COLUMNS)  # queued rows carry a trailing "write to history" flag
+
+# Same rows with the raw text replaced by its raw_outputs hash
+STORED_READING_COLUMNS = READING_COLUMNS[:RAW_OUTPUT_COLUMN] + ('raw_output_hash',) + READING_COLUMNS[RAW_OUTPUT_COLUMN + 1:]
+
+# Current state per (router, interface, parameter); an older reading never overwrites a newer one
+LATEST_UPSERT = f"""
+    INSERT INTO latest_parameter_readings ({', '.join(READING_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (router_id, interface_key, parameter_id) DO UPDATE SET
+        reading_data = EXCLUDED.reading_data,
+        raw_output = EXCLUDED.raw_output,
+        reading_time = EXCLUDED.reading_time,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE latest_parameter_readings.reading_time <= EXCLUDED.reading_time
+"""
+STORED_LATEST_UPSERT = f"""
+    INSERT INTO latest_parameter_readings ({', '.join(STORED_READING_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (router_id, interface_key, parameter_id) DO UPDATE SET
+        reading_data = EXCLUDED.reading_data,
+        raw_output = NULL,
+        raw_output_hash = EXCLUDED.raw_output_hash,
+        reading_time = EXCLUDED.reading_time,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE latest_parameter_readings.reading_time <= EXCLUDED.reading_time
+"""
+LATEST_TEMPLATE = '(%s, %s, %s, %s::jsonb, %s, %s)'
+
+
+def _copy_field(value):
+    """Encode one value for COPY ... FROM STDIN (text format)"""
+    if value is None:
+        return '\\N'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+        .replace('\x00', '')
+    )
+
+
+def _discard(conn):
+    """
+    Roll back a failed transaction; True if the connection is still usable
+
+    A connection that can't even roll back (server restarted, network gone)
+    is closed, so QueuedWriter reconnects for the next batch.
+    """
+    try:
+        conn.rollback()
+        return True
+    except Exception as e:
+        logger.error(f"❌ Database connection lost, closing it: {e}")
+        try:
+            conn.close()
+        except Exception:
+            pass
+        return False
+
+
+class ReadingWriter:
+    """
+    Thread-safe buffer in front of parameter_readings
+
+    Usage:
+        writer = ReadingWriter(conn)
+        writer.add(router_id, interface_id, 'TEJAS_SFP_100G_INFO', data, raw_output)
+        ...
+        writer.flush()
+    """
+
+    def __init__(self, conn, metadata=None, flush_size=READING_WRITER_FLUSH_SIZE,
+                 flush_interval=READING_WRITER_FLUSH_INTERVAL, method=READING_WRITER_METHOD,
+                 update_latest=READING_WRITER_UPDATE_LATEST, raw_store=READING_WRITER_RAW_STORE):
+        self.conn = conn
+        self.metadata = metadata  # optional ParameterMetadataCache for name lookups
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.method = method
+        self.update_latest = update_latest
+
+        # raw_store: True for a new RawOutputStore, or a RawOutputStore to share
+        if raw_store is True:
+            raw_store = RawOutputStore()
+        self.raw_store = raw_store or None
+        self.columns = STORED_READING_COLUMNS if self.raw_store else READING_COLUMNS
+        self.latest_upsert = STORED_LATEST_UPSERT if self.raw_store else LATEST_UPSERT
+
+        self._buffer = []
+        self._lock = threading.Lock()          # guards the buffer
+        self._flush_lock = threading.RLock()   # one flush on the connection at a time
+        self._last_flush = time.monotonic()
+
+        self._parameter_ids = {}
+        self._missing_parameters = set()
+
+        self.stats = {
+            'rows_written': 0,
+            'rows_failed': 0,
+            'flushes': 0,
+            'flush_time': 0.0
+        }
+
+    def add(self, router_id, interface_id, parameter, reading_data, raw_output, reading_time=None,
+            history=True):
+        """
+        Queue one reading; flushes when the buffer is full or flush_interval has passed
+
+        Args:
+            parameter: monitoring_parameters.id, or parameter_name (resolved at flush)
+            history: False to only refresh latest_parameter_readings
+        """
+        row = self.row(router_id, interface_id, parameter, reading_data, raw_output, reading_time, history)
+
+        with self._lock:
+            self._buffer.append(row)
+            due = (
+                len(self._buffer) >= self.flush_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if due:
+            self.flush()
+
+    @staticmethod
+    def row(router_id, interface_id, parameter, reading_data, raw_output, reading_time=None, history=True):
+        """One parameter_readings row in READING_COLUMNS order, plus the history flag"""
+        return (
+            router_id,
+            interface_id,
+            parameter,
+            json.dumps(reading_data),
+            raw_output,
+            reading_time or datetime.now(),
+            history
+        )
+
+    def _lookup_parameter(self, parameter_name):
+        if self.metadata:
+            return self.metadata.parameter_id(parameter_name)
+        return self._parameter_ids.get(parameter_name)
+
+    def _resolve_parameters(self, cursor, rows):
+        """Map parameter names to ids (metadata cache, or one query per flush); drop unknown names"""
+        names = {row[2] for row in rows if isinstance(row[2], str)} - set(self._parameter_ids)
+        if names and not self.metadata:
+            cursor.execute(
+                "SELECT parameter_name, id FROM monitoring_parameters WHERE parameter_name = ANY(%s)",
+                (list(names),)
+            )
+            self._parameter_ids.update(cursor.fetchall())
+
+        resolved = []
+        for row in rows:
+            parameter = row[2]
+            if isinstance(parameter, str):
+                parameter_id = self._lookup_parameter(parameter)
+                if parameter_id is None:
+                    if parameter not in self._missing_parameters:
+                        logger.warning(f"⚠️  Parameter {parameter} not found")
+                        self._missing_parameters.add(parameter)
+                    continue
+                row = row[:2] + (parameter_id,) + row[3:]
+            resolved.append(row)
+
+        return resolved
+
+    def _write_copy(self, cursor, rows):
+        buf = io.StringIO()
+        for row in rows:
+            buf.write('\t'.join(_copy_field(value) for value in row))
+            buf.write('\n')
+        buf.seek(0)
+
+        cursor.copy_expert(
+            f"COPY parameter_readings ({', '.join(self.columns)}) FROM STDIN",
+            buf
+        )
+
+    def _write_values(self, cursor, rows):
+        execute_values(
+            cursor,
+            f"INSERT INTO parameter_readings ({', '.join(self.columns)}) VALUES %s",
+            rows,
+            page_size=len(rows)
+        )
+
+    @staticmethod
+    def _newest(rows):
+        """Newest row per (router, interface, parameter) in a batch"""
+        newest = {}
+        for row in rows:
+            key = row[:3]
+            if key not in newest or newest[key][5] <= row[5]:
+                newest[key] = row[:HISTORY_FIELD]
+        return list(newest.values())
+
+    def _upsert_latest(self, cursor, rows):
+        if self.update_latest and rows:
+            latest = self._newest(rows)
+            execute_values(cursor, self.latest_upsert, latest, template=LATEST_TEMPLATE, page_size=len(latest))
+
+    def _write_individually(self, rows, pending):
+        """Fallback after a failed batch: isolate bad rows with savepoints"""
+        written = 0
+        stored = {}
+        cursor = self.conn.cursor()
+
+        for row in rows:
+            hash_ = row[RAW_OUTPUT_COLUMN]
+            entry = {hash_: pending[hash_]} if hash_ in pending else {}
+
+            cursor.execute("SAVEPOINT reading_row")
+            try:
+                if entry:
+                    self.raw_store.save(cursor, entry)
+                if row[HISTORY_FIELD]:
+                    cursor.execute(
+                        f"INSERT INTO parameter_readings ({', '.join(self.columns)}) "
+                        f"VALUES (%s, %s, %s, %s, %s, %s)",
+                        row[:HISTORY_FIELD]
+                    )
+                self._upsert_latest(cursor, [row])
+                cursor.execute("RELEASE SAVEPOINT reading_row")
+                stored.update(entry)
+                written += 1
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT reading_row")
+                logger.error(f"❌ Error saving reading (router {row[0]}, parameter {row[2]}): {e}")
+
+        self.conn.commit()
+        cursor.close()
+        if self.raw_store:
+            self.raw_store.remember(stored)
+        return written
+
+    def flush(self):
+        """Write everything buffered so far in one transaction; returns rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+                self._last_flush = time.monotonic()
+
+            return self.write(rows)
+
+    def write(self, rows):
+        """Write these rows in one transaction (row by row if the batch fails); returns rows written"""
+        with self._flush_lock:
+            if not rows:
+                return 0
+
+            start = time.monotonic()
+            written = 0
+            queued = len(rows)
+
+            try:
+                cursor = self.conn.cursor()
+                rows = self._resolve_parameters(cursor, rows)
+            except Exception as e:
+                logger.error(f"❌ Error resolving parameters, dropping {queued} readings: {e}")
+                _discard(self.conn)
+                return self._record(start, 0, queued, 0)
+
+            # Raw text -> hash up front, so the row-by-row fallback gets the same rows
+            pending = {}
+            if rows and self.raw_store:
+                rows, pending = self.raw_store.prepare(rows, RAW_OUTPUT_COLUMN)
+
+            history = [row[:HISTORY_FIELD] for row in rows if row[HISTORY_FIELD]]
+            try:
+                if rows:
+                    if pending:
+                        self.raw_store.save(cursor, pending)
+                    if history and self.method == 'copy':
+                        self._write_copy(cursor, history)
+                    elif history:
+                        self._write_values(cursor, history)
+                    self._upsert_latest(cursor, rows)
+                self.conn.commit()
+                cursor.close()
+                if self.raw_store:
+                    self.raw_store.remember(pending)
+                written = len(rows)
+
+            except Exception as e:
+                logger.error(f"❌ Bulk write of {len(rows)} readings failed, retrying row by row: {e}")
+                if _discard(self.conn):
+                    try:
+                        written = self._write_individually(rows, pending)
+                    except Exception as e:
+                        logger.error(f"❌ Error saving readings: {e}")
+                        _discard(self.conn)
+
+            return self._record(start, written, queued, len(history))
+
+    def _record(self, start, written, queued, history):
+        elapsed = time.monotonic() - start
+        self.stats['rows_written'] += written
+        self.stats['rows_failed'] += queued - written
+        self.stats['flushes'] += 1
+        self.stats['flush_time'] += elapsed
+
+        if written:
+            logger.info(f"💾 Flushed {written} readings ({history} to history) in {elapsed:.3f}s "
+                        f"({written / max(elapsed, 1e-6):.0f} rows/s)")
+        return written
+
+    @property
+    def rows_per_second(self):
+        return self.stats['rows_written'] / self.stats['flush_time'] if self.stats['flush_time'] else 0.0
+
+    def close(self):
+        """Flush what's left (call before closing the connection)"""
+        self.flush()
+
+
+class BulkInsertWriter:
+    """
+    Writes rows for one INSERT ... VALUES %s statement in bulk on its own
+    connection; subclasses set INSERT_QUERY and LABEL (used with QueuedWriter)
+    """
+
+    INSERT_QUERY = None
+    LABEL = 'rows'
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def write(self, rows):
+        """Insert rows in one transaction, row by row if the batch fails; returns rows written"""
+        try:
+            cursor = self.conn.cursor()
+            try:
+                execute_values(cursor, self.INSERT_QUERY, rows, page_size=len(rows))
+                self.conn.commit()
+                return len(rows)
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.error(f"❌ Bulk insert of {len(rows)} {self.LABEL} failed, retrying row by row: {e}")
+            if not _discard(self.conn):
+                return 0
+
+        written = 0
+        for row in rows:
+            try:
+                cursor = self.conn.cursor()
+                try:
+                    execute_values(cursor, self.INSERT_QUERY, [row])
+                    self.conn.commit()
+                    written += 1
+                finally:
+                    cursor.close()
+            except Exception as e:
+                logger.error(f"❌ Error saving {self.LABEL} (router {row[0]}, interface {row[1]}): {e}")
+                if not _discard(self.conn):
+                    break
+        return written
+
+
+_FLUSH = object()
+_STOP = object()
+
+
+class QueuedWriter:
+    """
+    Bounded queue drained by writer threads that each own a connection
+
+    Args:
+        make_writer: called once per writer thread; returns an object with
+            write(rows) -> rows written and a .conn it owns (e.g. ReadingWriter)
+
+    put() blocks while the queue is full (backpressure on the collectors) and
+    drops the row after put_timeout seconds rather than stalling forever.
+    Rows put after close() (e.g. by polls still running at shutdown) are
+    dropped and counted, never left in a queue nobody drains.
+    """
+
+    def __init__(self, make_writer, name='writer', queue_size=READING_WRITER_QUEUE_SIZE,
+                 threads=READING_WRITER_THREADS, flush_size=READING_WRITER_FLUSH_SIZE,
+                 flush_interval=READING_WRITER_FLUSH_INTERVAL, put_timeout=READING_WRITER_PUT_TIMEOUT):
+        self.make_writer = make_writer
+        self.name = name
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self._flush_generation = 0
+        self._closed = False
+        self._late_rows = 0
+
+        self.stats = {
+            'rows_queued': 0,
+            'rows_written': 0,
+            'rows_failed': 0,
+            'rows_dropped': 0,
+            'flushes': 0,
+            'flush_time': 0.0,
+            'max_flush_time': 0.0,
+            'latency_total': 0.0,     # enqueue -> commit, summed over written rows
+            'max_latency': 0.0,
+            'max_queue_depth': 0,
+            'backpressure_waits': 0,
+            'backpressure_time': 0.0
+        }
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f'{name}-{i + 1}', daemon=True)
+            for i in range(max(threads, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _drop_late(self, count=1):
+        with self._stats_lock:
+            self.stats['rows_dropped'] += count
+            first = self._late_rows == 0
+            self._late_rows += count
+        if first:
+            logger.warning(f"⚠️  {self.name} is closed, dropping rows written after shutdown")
+
+    def put(self, row):
+        """Queue one row; blocks while the queue is full"""
+        if self._closed:
+            self._drop_late()
+            return False
+
+        item = (time.monotonic(), row)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            start = time.monotonic()
+            try:
+                self._queue.put(item, timeout=self.put_timeout)
+            except queue.Full:
+                with self._stats_lock:
+                    self.stats['rows_dropped'] += 1
+                logger.error(f"❌ {self.name} queue full for {self.put_timeout:.0f}s, dropping a row")
+                return False
+            finally:
+                with self._stats_lock:
+                    self.stats['backpressure_waits'] += 1
+                    self.stats['backpressure_time'] += time.monotonic() - start
+
+        with self._stats_lock:
+            self.stats['rows_queued'] += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._queue.qsize())
+        return True
+
+    def _connect(self):
+        try:
+            return self.make_writer()
+        except Exception as e:
+            logger.error(f"❌ {self.name} could not connect: {e}")
+            return None
+
+    def _write(self, writer, items):
+        if writer is None or writer.conn.closed:
+            writer = self._connect()
+
+        written = 0
+        start = time.monotonic()
+        if writer is not None:
+            try:
+                written = writer.write([row for _, row in items])
+            except Exception as e:
+                # Keep the thread alive; the next batch reconnects
+                logger.error(f"❌ {self.name} failed to write {len(items)} rows, reconnecting: {e}")
+                try:
+                    writer.conn.close()
+                except Exception:
+                    pass
+        done = time.monotonic()
+
+        with self._stats_lock:
+            stats = self.stats
+            stats['rows_written'] += written
+            stats['rows_failed'] += len(items) - written
+            stats['flushes'] += 1
+            stats['flush_time'] += done - start
+            stats['max_flush_time'] = max(stats['max_flush_time'], done - start)
+            if written:
+                stats['latency_total'] += (done - sum(queued_at for queued_at, _ in items) / len(items)) * written
+                stats['max_latency'] = max(stats['max_latency'], done - items[0][0])
+
+        return writer
+
+    def _run(self):
+        writer = self._connect()
+        items = []
+        taken = 0            # queue items not yet task_done (released once written)
+        generation = self._flush_generation
+        first_at = None
+        running = True
+
+        while running:
+            # Wake up at least every 0.2s while holding rows, to notice flush() requests
+            timeout = None
+            if items:
+                timeout = min(max(self.flush_interval - (time.monotonic() - first_at), 0), 0.2)
+
+            try:
+                item = self._queue.get(timeout=timeout)
+                taken += 1
+                if item is _STOP:
+                    running = False
+                elif item is not _FLUSH:
+                    if not items:
+                        first_at = time.monotonic()
+                    items.append(item)
+            except queue.Empty:
+                pass
+
+            flush_requested = generation != self._flush_generation
+            if items and (
+                not running
+                or flush_requested
+                or len(items) >= self.flush_size
+                or time.monotonic() - first_at >= self.flush_interval
+            ):
+                try:
+                    writer = self._write(writer, items)
+                finally:
+                    items = []
+
+            if not items:
+                generation = self._flush_generation
+                for _ in range(taken):
+                    self._queue.task_done()
+                taken = 0
+
+        if writer is not None:
+            writer.conn.close()
+
+    def flush(self):
+        """Block until every row queued so far is written; returns rows written meanwhile"""
+        written = self.stats['rows_written']
+        self._flush_generation += 1
+        for _ in self._threads:
+            self._queue.put(_FLUSH)
+        self._queue.join()
+        return self.stats['rows_written'] - written
+
+    def close(self):
+        """Write what's left, stop the writer threads and close their connections"""
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+        # Rows that raced past the closed check landed behind the STOPs
+        late = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item is not _FLUSH:
+                late += 1
+        if late:
+            self._drop_late(late)
+        if self._late_rows:
+            logger.warning(f"⚠️  {self.name}: {self._late_rows} rows arrived after shutdown and were dropped")
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    @property
+    def rows_per_second(self):
+        return self.stats['rows_written'] / self.stats['flush_time'] if self.stats['flush_time'] else 0.0
+
+    @property
+    def avg_latency(self):
+        return self.stats['latency_total'] / self.stats['rows_written'] if self.stats['rows_written'] else 0.0
+
+    def log_stats(self):
+        stats = self.stats
+        logger.info(
+            f"📬 {self.name}: {stats['rows_written']} written, {stats['rows_failed']} failed, "
+            f"{stats['rows_dropped']} dropped | queue depth {self.queue_depth} (max {stats['max_queue_depth']}) | "
+            f"latency avg {self.avg_latency * 1000:.0f}ms max {stats['max_latency'] * 1000:.0f}ms | "
+            f"backpressure {stats['backpressure_waits']}x {stats['backpressure_time']:.2f}s"
+        )
+
+
+class QueuedReadingWriter(QueuedWriter):
+    """
+    ReadingWriter's interface on top of writer threads
+
+    Usage:
+        writer = QueuedReadingWriter(lambda: psycopg2.connect(**DB_CONFIG), metadata)
+        writer.add(router_id, interface_id, 'TEJAS_SFP_100G_INFO', data, raw_output)
+        ...
+        writer.flush()
+        writer.close()
+    """
+
+    def __init__(self, connect, metadata=None, method=READING_WRITER_METHOD,
+                 deadband=READING_DEADBAND_ENABLED, **kwargs):
+        """
+        Args:
+            deadband: True for a DeadbandFilter over metadata (change-only
+                      history), a DeadbandFilter instance, or False/None
+        """
+        super().__init__(lambda: ReadingWriter(connect(), metadata, method=method),
+                         name='reading writer', **kwargs)
+        if deadband is True:
+            deadband = DeadbandFilter(metadata) if metadata is not None else None
+        self.deadband = deadband or None
+
+    def add(self, router_id, interface_id, parameter, reading_data, raw_output, reading_time=None):
+        """Queue one reading (see ReadingWriter.add); unchanged readings skip history"""
+        if self.closed:
+            return self.put(None)
+
+        history = True
+        if self.deadband is not None:
+            history = self.deadband.should_store(router_id, interface_id, parameter, reading_data)
+        return self.put(ReadingWriter.row(router_id, interface_id, parameter, reading_data,
+                                          raw_output, reading_time, history))
+
+    def log_stats(self):
+        super().log_stats()
+        if self.deadband is not None:
+            self.deadband.log_stats()
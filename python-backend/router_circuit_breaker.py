@@ -0,0 +1,278 @@
+"""
+Router Circuit Breaker
+Stops collectors and the API from spending a full SSH connect timeout on
+every poll of a router that is down (database/circuit_breaker.sql)
+
+After CIRCUIT_BREAKER_FAILURES consecutive connection failures a router's
+breaker opens and connects are refused at once. When the backoff has passed
+one poll is let through (half-open): success closes the breaker, failure
+opens it again for twice as long, up to CIRCUIT_BREAKER_MAX_BACKOFF.
+State is kept in router_circuit_breakers, so it survives between monitor
+runs and is shared by every collector process and the API.
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import psycopg2
+from psycopg2.extras import RealDictCursor, execute_values
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Breaker configuration (override from .env)
+CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+CIRCUIT_BREAKER_FAILURES = int(os.getenv('CIRCUIT_BREAKER_FAILURES', '3'))
+CIRCUIT_BREAKER_BACKOFF = float(os.getenv('CIRCUIT_BREAKER_BACKOFF', '60'))
+CIRCUIT_BREAKER_MAX_BACKOFF = float(os.getenv('CIRCUIT_BREAKER_MAX_BACKOFF', '3600'))
+CIRCUIT_BREAKER_SYNC_INTERVAL = float(os.getenv('CIRCUIT_BREAKER_SYNC_INTERVAL', '30'))
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+BREAKER_COLUMNS = ('router_id', 'state', 'consecutive_failures', 'trips', 'retry_at',
+                   'last_error', 'last_failure_at', 'last_success_at')
+
+UPSERT_QUERY = f"""
+    INSERT INTO router_circuit_breakers ({', '.join(BREAKER_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (router_id) DO UPDATE SET
+        {', '.join(f'{column} = EXCLUDED.{column}' for column in BREAKER_COLUMNS[1:])},
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of connecting to a router whose breaker is open"""
+
+    def __init__(self, router_id, retry_at):
+        self.router_id = router_id
+        self.retry_at = retry_at
+        super().__init__(f"Circuit open for router {router_id} (unreachable), "
+                         f"next attempt after {retry_at:%H:%M:%S}")
+
+
+class RouterBreaker:
+    """Breaker state of one router"""
+
+    __slots__ = BREAKER_COLUMNS + ('probing',)
+
+    def __init__(self, router_id):
+        self.router_id = router_id
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0              # times opened since the last success; sets the backoff
+        self.retry_at = None
+        self.last_error = None
+        self.last_failure_at = None
+        self.last_success_at = None
+        self.probing = False        # this process has the half-open poll in flight
+
+    def row(self):
+        return tuple(getattr(self, column) for column in BREAKER_COLUMNS)
+
+    def as_dict(self):
+        """JSON-ready state (timestamps as ISO strings)"""
+        return {column: value.isoformat() if isinstance(value, datetime) else value
+                for column, value in zip(BREAKER_COLUMNS, self.row())}
+
+
+class CircuitBreakerRegistry:
+    """
+    Thread-safe breakers for every router this process talks to
+
+    Usage:
+        breakers = get_breakers()
+        breakers.check(router_id)          # raises CircuitOpenError
+        try:
+            ssh.connect(...)
+        except Exception as e:
+            breakers.failure(router_id, e)
+            raise
+        breakers.success(router_id)
+    """
+
+    def __init__(self, failures=CIRCUIT_BREAKER_FAILURES, backoff=CIRCUIT_BREAKER_BACKOFF,
+                 max_backoff=CIRCUIT_BREAKER_MAX_BACKOFF, sync_interval=CIRCUIT_BREAKER_SYNC_INTERVAL,
+                 enabled=CIRCUIT_BREAKER_ENABLED):
+        self.failures = failures
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sync_interval = sync_interval
+        self.enabled = enabled
+
+        self._breakers = {}
+        self._dirty = set()         # router ids changed since the last sync
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._persist = True        # off once router_circuit_breakers turns out to be missing
+
+        self.stats = {'rejected': 0, 'probes': 0, 'opened': 0, 'closed': 0}
+
+    def _breaker(self, router_id):
+        breaker = self._breakers.get(router_id)
+        if breaker is None:
+            breaker = self._breakers[router_id] = RouterBreaker(router_id)
+        return breaker
+
+    def backoff_for(self, trips):
+        """Seconds a breaker stays open after its trips-th opening"""
+        return min(self.max_backoff, self.backoff * 2 ** max(trips - 1, 0))
+
+    def check(self, router_id, now=None):
+        """Return if a connect may be attempted now, raise CircuitOpenError if not"""
+        if not self.enabled:
+            return
+        now = now or datetime.now()
+
+        with self._lock:
+            breaker = self._breakers.get(router_id)
+            if breaker is None or breaker.state == CLOSED:
+                return
+
+            if breaker.probing or (breaker.retry_at and now < breaker.retry_at):
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(router_id, breaker.retry_at)
+
+            # Backoff over: one trial poll; other processes see it open until it reports back
+            breaker.state = HALF_OPEN
+            breaker.probing = True
+            breaker.retry_at = now + timedelta(seconds=self.backoff_for(breaker.trips))
+            self._dirty.add(router_id)
+            self.stats['probes'] += 1
+
+    def success(self, router_id, now=None):
+        """A connect to the router worked: close its breaker"""
+        with self._lock:
+            breaker = self._breakers.get(router_id)
+            if breaker is None or (breaker.state == CLOSED and not breaker.consecutive_failures):
+                return
+
+            reopened = breaker.state != CLOSED
+            breaker.state = CLOSED
+            breaker.consecutive_failures = 0
+            breaker.trips = 0
+            breaker.retry_at = None
+            breaker.probing = False
+            breaker.last_success_at = now or datetime.now()
+            self._dirty.add(router_id)
+
+        if reopened:
+            self.stats['closed'] += 1
+            logger.info(f"🔌 Router {router_id} reachable again, circuit closed")
+
+    def failure(self, router_id, error=None, now=None):
+        """A connect to the router failed: count it, opening the breaker at the threshold"""
+        if not self.enabled:
+            return
+        now = now or datetime.now()
+
+        with self._lock:
+            breaker = self._breaker(router_id)
+            breaker.consecutive_failures += 1
+            breaker.last_error = str(error) if error is not None else None
+            breaker.last_failure_at = now
+            self._dirty.add(router_id)
+
+            if breaker.state == CLOSED and breaker.consecutive_failures < self.failures:
+                return
+            if breaker.state == OPEN:
+                return          # a poll admitted before the breaker opened
+
+            breaker.state = OPEN
+            breaker.probing = False
+            breaker.trips += 1
+            backoff = self.backoff_for(breaker.trips)
+            breaker.retry_at = now + timedelta(seconds=backoff)
+            failures = breaker.consecutive_failures
+
+        self.stats['opened'] += 1
+        logger.warning(f"🔌 Circuit open for router {router_id} after {failures} failed connects, "
+                       f"next attempt in {backoff:.0f}s: {error}")
+
+    def state(self, router_id):
+        with self._lock:
+            breaker = self._breakers.get(router_id)
+            return breaker.state if breaker else CLOSED
+
+    def summary(self):
+        """Counters plus every breaker that isn't closed, for status output"""
+        with self._lock:
+            tripped = [breaker.as_dict() for breaker in self._breakers.values() if breaker.state != CLOSED]
+        return {
+            'open': sum(1 for breaker in tripped if breaker['state'] == OPEN),
+            'half_open': sum(1 for breaker in tripped if breaker['state'] == HALF_OPEN),
+            **self.stats,
+            'routers': sorted(tripped, key=lambda breaker: breaker['router_id'])
+        }
+
+    def sync_due(self, now=None):
+        now = now or datetime.now()
+        return self._synced_at is None or (now - self._synced_at).total_seconds() >= self.sync_interval
+
+    def sync(self, conn):
+        """
+        Write breakers changed here to router_circuit_breakers and take over
+        the others' state from it (changes made by other processes)
+
+        Never raises: a failed sync keeps the changes for the next one.
+        Without a connection (conn is None) there is nothing to sync.
+        """
+        if not self.enabled or not self._persist or conn is None:
+            return False
+
+        with self._lock:
+            dirty = {router_id: self._breakers[router_id].row() for router_id in self._dirty}
+            self._dirty.clear()
+        self._synced_at = datetime.now()
+
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            if dirty:
+                execute_values(cursor, UPSERT_QUERY, list(dirty.values()))
+            cursor.execute(f"SELECT {', '.join(BREAKER_COLUMNS)} FROM router_circuit_breakers")
+            rows = cursor.fetchall()
+            conn.commit()
+        except psycopg2.errors.UndefinedTable:
+            conn.rollback()
+            self._persist = False
+            logger.warning("⚠️  router_circuit_breakers table missing (database/circuit_breaker.sql), "
+                           "breaker state is kept in memory only")
+            return False
+        except Exception as e:
+            conn.rollback()
+            with self._lock:
+                self._dirty.update(dirty)
+            logger.warning(f"⚠️  Circuit breaker sync failed: {e}")
+            return False
+        finally:
+            cursor.close()
+
+        with self._lock:
+            for row in rows:
+                router_id = row['router_id']
+                breaker = self._breaker(router_id)
+                if router_id in self._dirty or breaker.probing:
+                    continue    # changed here since the snapshot, ours is newer
+                for column in BREAKER_COLUMNS[1:]:
+                    setattr(breaker, column, row[column])
+                if breaker.state == HALF_OPEN:
+                    breaker.state = OPEN    # someone else's trial; retry_at covers it
+        return True
+
+
+_breakers = None
+_breakers_lock = threading.Lock()
+
+
+def get_breakers():
+    """Shared breakers for the whole process"""
+    global _breakers
+    with _breakers_lock:
+        if _breakers is None:
+            _breakers = CircuitBreakerRegistry()
+        return _breakers
@@ -5,14 +5,17 @@ Fully configurable via database
 """
 
 import paramiko
-import time
-import re
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
 import logging
-import json
+import sys
+
+import ssh_command_reader
+from fleet_inventory import FleetInventory, load_fleet_inventory
+from collection_engine import CollectionEngine, CollectionJob
+from reading_writer import QueuedReadingWriter
+from parameter_metadata_cache import ParameterMetadataCache
+from router_circuit_breaker import CircuitOpenError, get_breakers
 
 # Setup logging
 logging.basicConfig(
@@ -36,11 +39,16 @@ class DatabaseManager:
     def __init__(self, config):
         self.config = config
         self.conn = None
+        self.metadata = None
+        self.writer = None
     
     def connect(self):
         """Connect to PostgreSQL database"""
         try:
             self.conn = psycopg2.connect(**self.config)
+            self.metadata = ParameterMetadataCache(lambda: psycopg2.connect(**self.config))
+            # Readings are written by dedicated writer threads on their own connections
+            self.writer = QueuedReadingWriter(lambda: psycopg2.connect(**self.config), self.metadata)
             logger.info("✅ Database connected successfully")
             return self.conn
         except Exception as e:
@@ -49,10 +57,24 @@ class DatabaseManager:
     
     def close(self):
         """Close database connection"""
+        if self.writer:
+            self.writer.close()
+        if self.metadata:
+            self.metadata.close()
         if self.conn:
             self.conn.close()
             logger.info("Database connection closed")
     
+    def get_fleet_inventory(self, device_type=None):
+        """Routers, monitored interfaces and active parameters in one query"""
+        try:
+            return load_fleet_inventory(self.conn, device_type)
+        
+        except Exception as e:
+            logger.error(f"❌ Error loading inventory: {e}")
+            self.conn.rollback()
+            return FleetInventory()
+    
     def get_routers(self):
         """Fetch all active routers"""
         try:
@@ -101,120 +123,64 @@ class DatabaseManager:
             return []
     
     def get_monitoring_parameters(self, applies_to=None):
-        """Fetch monitoring parameters"""
+        """Fetch monitoring parameters (from the metadata cache)"""
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            
-            if applies_to:
-                query = """
-                    SELECT id, parameter_name, parameter_category, command_template, applies_to
-                    FROM monitoring_parameters
-                    WHERE is_active = true AND (applies_to = %s OR applies_to = 'BOTH')
-                    ORDER BY parameter_category, parameter_name
-                """
-                cursor.execute(query, (applies_to,))
-            else:
-                query = """
-                    SELECT id, parameter_name, parameter_category, command_template, applies_to
-                    FROM monitoring_parameters
-                    WHERE is_active = true
-                    ORDER BY parameter_category, parameter_name
-                """
-                cursor.execute(query)
-            
-            parameters = cursor.fetchall()
-            cursor.close()
-            
-            return parameters
+            return self.metadata.parameters(applies_to)
         
         except Exception as e:
             logger.error(f"❌ Error fetching parameters: {e}")
             return []
     
     def get_parameter_parsers(self, parameter_id):
-        """Fetch regex parsers for a parameter"""
+        """Fetch regex parsers for a parameter (from the metadata cache)"""
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            
-            query = """
-                SELECT field_name, regex_pattern, data_type, unit
-                FROM parameter_parsers
-                WHERE parameter_id = %s
-                ORDER BY display_order
-            """
-            
-            cursor.execute(query, (parameter_id,))
-            parsers = cursor.fetchall()
-            cursor.close()
-            
-            return parsers
+            return self.metadata.parsers(parameter_id)
         
         except Exception as e:
             logger.error(f"❌ Error fetching parsers: {e}")
             return []
     
     def save_parameter_reading(self, router_id, interface_id, parameter_id, reading_data, raw_output):
-        """Save parameter reading to database"""
-        try:
-            cursor = self.conn.cursor()
-            
-            query = """
-                INSERT INTO parameter_readings 
-                (router_id, interface_id, parameter_id, reading_data, raw_output, reading_time)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            cursor.execute(query, (
-                router_id,
-                interface_id,
-                parameter_id,
-                json.dumps(reading_data),
-                raw_output,
-                datetime.now()
-            ))
-            
-            self.conn.commit()
-            cursor.close()
-            
-        except Exception as e:
-            logger.error(f"❌ Error saving reading: {e}")
-            self.conn.rollback()
+        """Queue parameter reading (written in bulk by the writer threads)"""
+        self.writer.add(router_id, interface_id, parameter_id, reading_data, raw_output)
 
 class ParameterParser:
     """Parse command output using regex patterns"""
     
+    TRUE_VALUES = frozenset(('true', 'yes', 'up', 'active', 'enabled'))
+    
     @staticmethod
     def parse_output(output, parsers):
-        """Parse output using provided regex patterns"""
+        """
+        Parse output using provided regex patterns
+        
+        parsers are CompiledParser objects (from the metadata cache, or
+        parser_registry.parameter_parsers.load), compiled once when loaded
+        """
         result = {}
         
         for parser in parsers:
-            field_name = parser['field_name']
-            regex_pattern = parser['regex_pattern']
-            data_type = parser['data_type']
+            # Invalid patterns were rejected (and logged) when loaded
+            regex = parser.regex
+            match = regex.search(output) if regex is not None else None
+            value = match.group(1) if match is not None else None
+            if value is None:
+                result[parser.field_name] = "N/A"
+                continue
             
-            try:
-                match = re.search(regex_pattern, output, re.IGNORECASE)
-                
-                if match:
-                    value = match.group(1).strip()
-                    
-                    # Convert data type
-                    if data_type == 'number':
-                        try:
-                            value = float(value.replace(',', ''))
-                        except:
-                            pass
-                    elif data_type == 'boolean':
-                        value = value.lower() in ['true', 'yes', 'up', 'active', 'enabled']
-                    
-                    result[field_name] = value
-                else:
-                    result[field_name] = "N/A"
+            value = value.strip()
+            
+            # Convert data type
+            data_type = parser.data_type
+            if data_type == 'number':
+                try:
+                    value = float(value.replace(',', ''))
+                except ValueError:
+                    pass
+            elif data_type == 'boolean':
+                value = value.lower() in ParameterParser.TRUE_VALUES
             
-            except Exception as e:
-                logger.error(f"❌ Error parsing {field_name}: {e}")
-                result[field_name] = "N/A"
+            result[parser.field_name] = value
         
         return result
 
@@ -234,9 +200,21 @@ class RouterMonitor:
         results = {
             'router': hostname,
             'interface_readings': {},
-            'router_readings': {}
+            'router_readings': {},
+            'command_timings': {}
         }
         
+        # Routers that keep failing to connect are skipped until their backoff passes
+        breakers = get_breakers()
+        try:
+            breakers.check(router_id)
+        except CircuitOpenError as e:
+            logger.warning(f"⏭️  Skipping {hostname}: {e}")
+            results['error'] = str(e)
+            results['circuit_open'] = True
+            return results
+        
+        connected = False
         try:
             logger.info(f"🔄 Connecting to {hostname} ({host})...")
             
@@ -251,13 +229,10 @@ class RouterMonitor:
             
             chan = ssh.invoke_shell()
             
-            # Disable pagination
-            chan.send('conf t\n')
-            time.sleep(1)
-            chan.send('set cli pagination off\n')
-            time.sleep(1)
-            chan.send('end\n')
-            time.sleep(1)
+            # Wait for prompt and disable pagination
+            prompt = ssh_command_reader.prepare_shell(chan)
+            connected = True
+            breakers.success(router_id)
             
             # Monitor INTERFACE-level parameters
             interface_params = [p for p in parameters if p['applies_to'] in ['INTERFACE', 'BOTH']]
@@ -284,16 +259,10 @@ class RouterMonitor:
                     
                     logger.info(f"    🔍 Checking {param_name}...")
                     
-                    # Execute command
-                    chan.send(f"{command}\n")
-                    time.sleep(2)
-                    
-                    # Read response
-                    resp = b""
-                    while chan.recv_ready():
-                        resp += chan.recv(9999)
-                    
-                    output = resp.decode('ascii', errors='ignore')
+                    # Execute command (returns as soon as the prompt reappears)
+                    command_result = ssh_command_reader.execute_command(chan, command, prompt)
+                    output = command_result.output
+                    results['command_timings'][command] = round(command_result.elapsed, 3)
                     
                     # Get parsers for this parameter
                     parsers = db_manager.get_parameter_parsers(param_id)
@@ -308,8 +277,6 @@ class RouterMonitor:
                     db_manager.save_parameter_reading(
                         router_id, interface_id, param_id, parsed_data, output
                     )
-                    
-                    time.sleep(1)
             
             # Monitor ROUTER-level parameters
             router_params = [p for p in parameters if p['applies_to'] in ['ROUTER', 'BOTH']]
@@ -324,16 +291,10 @@ class RouterMonitor:
                     
                     logger.info(f"    🔍 Checking {param_name}...")
                     
-                    # Execute command
-                    chan.send(f"{command}\n")
-                    time.sleep(2)
-                    
-                    # Read response
-                    resp = b""
-                    while chan.recv_ready():
-                        resp += chan.recv(9999)
-                    
-                    output = resp.decode('ascii', errors='ignore')
+                    # Execute command (returns as soon as the prompt reappears)
+                    command_result = ssh_command_reader.execute_command(chan, command, prompt)
+                    output = command_result.output
+                    results['command_timings'][command] = round(command_result.elapsed, 3)
                     
                     # Get parsers
                     parsers = db_manager.get_parameter_parsers(param_id)
@@ -348,29 +309,33 @@ class RouterMonitor:
                     db_manager.save_parameter_reading(
                         router_id, None, param_id, parsed_data, output
                     )
-                    
-                    time.sleep(1)
             
             ssh.close()
-            logger.info(f"✅ Completed monitoring {hostname}")
+            timings = results['command_timings']
+            logger.info(f"✅ Completed monitoring {hostname} "
+                        f"({len(timings)} commands, {sum(timings.values()):.2f}s on router)")
             
         except Exception as e:
             logger.error(f"❌ Error monitoring {hostname}: {e}")
+            if not connected:
+                breakers.failure(router_id, e)
         
         return results
     
     @staticmethod
     def monitor_all_routers(db_manager):
-        """Monitor all routers in parallel"""
+        """Monitor all routers concurrently"""
         # Get routers
-        routers = db_manager.get_routers()
+        # Routers, interfaces and parameters in one round-trip
+        inventory = db_manager.get_fleet_inventory()
         
-        if not routers:
+        if not inventory.routers:
             logger.warning("⚠️  No active routers found")
             return {}
         
-        # Get monitoring parameters
-        parameters = db_manager.get_monitoring_parameters()
+        # Parsers are compiled once for the whole cycle (reloaded only if they changed)
+        db_manager.metadata.refresh()
+        parameters = inventory.parameters()
         
         if not parameters:
             logger.warning("⚠️  No monitoring parameters configured")
@@ -378,30 +343,37 @@ class RouterMonitor:
         
         logger.info(f"📊 Monitoring {len(parameters)} parameters")
         
-        # Prepare router data
-        router_data = []
-        for router in routers:
-            interfaces = db_manager.get_router_interfaces(router['id'])
-            router_data.append((router, interfaces, parameters))
+        # Breaker state left by earlier runs and other collectors
+        breakers = get_breakers()
+        breakers.sync(db_manager.conn)
         
-        # Monitor in parallel
+        # Prepare one collection job per router
+        jobs = []
+        for router, interfaces in inventory.items():
+            jobs.append(CollectionJob(
+                router['id'], RouterMonitor.connect_and_monitor,
+                router, interfaces, parameters, db_manager
+            ))
+        
+        # Monitor concurrently (budgets from COLLECTOR_* env settings)
         all_results = {}
+        skipped = []
         
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [
-                executor.submit(
-                    RouterMonitor.connect_and_monitor,
-                    router, interfaces, parameters, db_manager
-                )
-                for router, interfaces, parameters in router_data
-            ]
-            
-            for future in futures:
-                try:
-                    result = future.result()
-                    all_results[result['router']] = result
-                except Exception as e:
-                    logger.error(f"❌ Error in parallel execution: {e}")
+        for job in CollectionEngine().run(jobs):
+            if job.ok:
+                if job.result.get('circuit_open'):
+                    skipped.append(job.result['router'])
+                    continue
+                all_results[job.result['router']] = job.result
+        
+        if skipped:
+            logger.warning(f"⏭️  {len(skipped)} unreachable routers skipped (circuit open): "
+                           f"{', '.join(sorted(skipped))}")
+        breakers.sync(db_manager.conn)
+        
+        # Wait until this cycle's readings are written
+        db_manager.writer.flush()
+        db_manager.writer.log_stats()
         
         return all_results
 
@@ -463,7 +435,8 @@ def main():
     finally:
         db_manager.close()
     
-    input("\nPress Enter to exit...")
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
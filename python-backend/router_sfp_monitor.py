@@ -4,13 +4,18 @@ Fetches router details from database and monitors SFP power levels
 """
 
 import paramiko
-import time
 import re
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
+import sys
+
+import ssh_command_reader
+from reading_writer import QueuedWriter, BulkInsertWriter
+from fleet_inventory import FleetInventory, load_fleet_inventory
+from router_circuit_breaker import CircuitOpenError, get_breakers
 
 # Setup logging
 logging.basicConfig(
@@ -28,17 +33,32 @@ DB_CONFIG = {
     'password': 'your_password'
 }
 
+class SFPReadingWriter(BulkInsertWriter):
+    """Writes sfp_readings rows in bulk on a writer thread's own connection"""
+    
+    INSERT_QUERY = """
+        INSERT INTO sfp_readings 
+        (router_id, interface_id, rx_power, tx_power, laser_type, reading_time)
+        VALUES %s
+    """
+    LABEL = 'SFP readings'
+
 class DatabaseManager:
     """Manage database connections and queries"""
     
     def __init__(self, config):
         self.config = config
         self.conn = None
+        self.writer = None
     
     def connect(self):
         """Connect to PostgreSQL database"""
         try:
             self.conn = psycopg2.connect(**self.config)
+            # Readings are written by a dedicated writer thread on its own connection
+            self.writer = QueuedWriter(
+                lambda: SFPReadingWriter(psycopg2.connect(**self.config)), name='sfp writer'
+            )
             logger.info("✅ Database connected successfully")
             return self.conn
         except Exception as e:
@@ -47,10 +67,22 @@ class DatabaseManager:
     
     def close(self):
         """Close database connection"""
+        if self.writer:
+            self.writer.close()
         if self.conn:
             self.conn.close()
             logger.info("Database connection closed")
     
+    def get_fleet_inventory(self, device_type=None):
+        """Routers and their monitored interfaces in one query"""
+        try:
+            return load_fleet_inventory(self.conn, device_type, parameters=False)
+        
+        except Exception as e:
+            logger.error(f"❌ Error loading inventory: {e}")
+            self.conn.rollback()
+            return FleetInventory()
+    
     def get_routers(self):
         """Fetch all active routers from database"""
         try:
@@ -111,31 +143,15 @@ class DatabaseManager:
             return []
     
     def save_sfp_reading(self, router_id, interface_id, rx_power, tx_power, laser_type):
-        """Save SFP reading to database"""
-        try:
-            cursor = self.conn.cursor()
-            
-            query = """
-                INSERT INTO sfp_readings 
-                (router_id, interface_id, rx_power, tx_power, laser_type, reading_time)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            cursor.execute(query, (
-                router_id,
-                interface_id,
-                rx_power,
-                tx_power,
-                laser_type,
-                datetime.now()
-            ))
-            
-            self.conn.commit()
-            cursor.close()
-            
-        except Exception as e:
-            logger.error(f"❌ Error saving SFP reading: {e}")
-            self.conn.rollback()
+        """Queue SFP reading (written in bulk by the writer thread)"""
+        self.writer.put((
+            router_id,
+            interface_id,
+            rx_power,
+            tx_power,
+            laser_type,
+            datetime.now()
+        ))
 
 class RouterSFPMonitor:
     """Monitor SFP power levels on routers"""
@@ -165,6 +181,15 @@ class RouterSFPMonitor:
         
         router_interface_outputs = {}
         
+        # Routers that keep failing to connect are skipped until their backoff passes
+        breakers = get_breakers()
+        try:
+            breakers.check(router_id)
+        except CircuitOpenError as e:
+            logger.warning(f"⏭️  Skipping {hostname}: {e}")
+            return (f"{host}:{hostname}", None)
+        
+        connected = False
         try:
             logger.info(f"🔄 Connecting to {hostname} ({host})...")
             
@@ -185,13 +210,10 @@ class RouterSFPMonitor:
             # Invoke shell
             chan = ssh.invoke_shell()
             
-            # Disable pagination
-            chan.send('conf t\n')
-            time.sleep(1)
-            chan.send('set cli pagination off\n')
-            time.sleep(1)
-            chan.send('end\n')
-            time.sleep(1)
+            # Wait for prompt and disable pagination
+            prompt = ssh_command_reader.prepare_shell(chan)
+            connected = True
+            breakers.success(router_id)
             
             # Monitor each interface
             for interface in interfaces:
@@ -202,16 +224,11 @@ class RouterSFPMonitor:
                 
                 logger.info(f"  📡 Checking {interface_label} ({interface_name})...")
                 
-                # Execute command
-                chan.send(f"{sfp_command} {interface_name}\n")
-                time.sleep(2)
-                
-                # Read response
-                resp = b""
-                while chan.recv_ready():
-                    resp += chan.recv(9999)
-                
-                output = resp.decode('ascii', errors='ignore')
+                # Execute command (returns as soon as the prompt reappears)
+                command_result = ssh_command_reader.execute_command(
+                    chan, f"{sfp_command} {interface_name}", prompt
+                )
+                output = command_result.output
                 
                 # Extract fields
                 rx_power, tx_power, laser_type = RouterSFPMonitor.extract_fields(output)
@@ -221,7 +238,8 @@ class RouterSFPMonitor:
                     'label': interface_label,
                     'RxPower': rx_power,
                     'TxPower': tx_power,
-                    'LaserType': laser_type
+                    'LaserType': laser_type,
+                    'ElapsedSec': round(command_result.elapsed, 3)
                 }
                 
                 # Save to database
@@ -232,14 +250,14 @@ class RouterSFPMonitor:
                     tx_power,
                     laser_type
                 )
-                
-                time.sleep(2)
             
             ssh.close()
             logger.info(f"✅ Completed monitoring {hostname}")
             
         except Exception as e:
             logger.error(f"❌ Error connecting to {hostname} ({host}): {e}")
+            if not connected:
+                breakers.failure(router_id, e)
         
         router_label = f"{host}:{hostname}"
         return (router_label, router_interface_outputs)
@@ -247,22 +265,23 @@ class RouterSFPMonitor:
     @staticmethod
     def monitor_all_routers(db_manager):
         """Monitor all routers in parallel"""
-        # Get routers from database
-        routers = db_manager.get_routers()
+        # Get routers and their interfaces from database (one query)
+        inventory = db_manager.get_fleet_inventory()
         
-        if not routers:
+        if not inventory.routers:
             logger.warning("⚠️  No active routers found in database")
             return {}
         
         # Prepare router data with interfaces
-        router_data = []
-        for router in routers:
-            interfaces = db_manager.get_router_interfaces(router['id'])
-            if interfaces:
-                router_data.append((router, interfaces))
+        router_data = [(router, interfaces) for router, interfaces in inventory.items() if interfaces]
+        
+        # Breaker state left by earlier runs and other collectors
+        breakers = get_breakers()
+        breakers.sync(db_manager.conn)
         
         # Monitor routers in parallel
         router_outputs = {}
+        skipped = []
         
         with ThreadPoolExecutor(max_workers=5) as executor:
             futures = [
@@ -278,10 +297,22 @@ class RouterSFPMonitor:
             for future in futures:
                 try:
                     router_label, router_interface_outputs = future.result()
+                    if router_interface_outputs is None:
+                        skipped.append(router_label)
+                        continue
                     router_outputs[router_label] = router_interface_outputs
                 except Exception as e:
                     logger.error(f"❌ Error in parallel execution: {e}")
         
+        if skipped:
+            logger.warning(f"⏭️  {len(skipped)} unreachable routers skipped (circuit open): "
+                           f"{', '.join(sorted(skipped))}")
+        breakers.sync(db_manager.conn)
+        
+        # Wait until this cycle's readings are written
+        db_manager.writer.flush()
+        db_manager.writer.log_stats()
+        
         return router_outputs
 
 def display_results(router_outputs):
@@ -334,7 +365,8 @@ def main():
         # Close database connection
         db_manager.close()
     
-    input("\nPress Enter to exit...")
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,63 @@
+"""
+Typed SFP Metrics Writer
+Writes parsed SFP 100G stats to sfp_metrics as REAL columns, one row per
+interface per poll (database/sfp_metrics.sql)
+
+The JSONB reading keeps every value as text, so range and trend queries had
+to cast each row; sfp_metrics rows are numbers already and the covering
+(interface_id, reading_time) primary key serves time-series queries as
+index scans.
+"""
+
+import os
+import logging
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from reading_writer import BulkInsertWriter
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SFP_METRICS_ENABLED = os.getenv('SFP_METRICS_ENABLED', 'true').lower() == 'true'
+
+# Value columns, named like the parse_sfp_100g_stats keys they come from
+SFP_METRIC_VALUES = (
+    'rx_power_lane0', 'rx_power_lane1', 'rx_power_lane2', 'rx_power_lane3', 'rx_power_avg',
+    'tx_power_lane0', 'tx_power_lane1', 'tx_power_lane2', 'tx_power_lane3', 'tx_power_avg',
+    'bias_current_lane0', 'bias_current_lane1', 'bias_current_lane2', 'bias_current_lane3',
+    'module_temperature', 'module_voltage'
+)
+SFP_METRIC_COLUMNS = ('router_id', 'interface_id', 'reading_time') + SFP_METRIC_VALUES
+
+# extract_sfp_100g_stats sections that fill those columns
+SFP_METRIC_SECTIONS = ('rx_power', 'tx_power', 'bias_current', 'module_temperature', 'module_voltage')
+
+
+def _real(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None  # missing or 'N/A'
+
+
+def sfp_metrics_row(router_id, interface_id, stats, reading_time=None):
+    """One sfp_metrics row from parse_sfp_100g_stats output, or None if it has no values"""
+    values = tuple(_real(stats.get(column)) for column in SFP_METRIC_VALUES)
+    if all(value is None for value in values):
+        return None
+    return (router_id, interface_id, reading_time or datetime.now()) + values
+
+
+class SFPMetricsWriter(BulkInsertWriter):
+    """Writes sfp_metrics rows in bulk on a writer thread's own connection"""
+
+    INSERT_QUERY = f"""
+        INSERT INTO sfp_metrics ({', '.join(SFP_METRIC_COLUMNS)})
+        VALUES %s
+        ON CONFLICT (interface_id, reading_time) DO NOTHING
+    """
+    LABEL = 'SFP metrics'
@@ -0,0 +1,217 @@
+"""
+Single-Pass SFP Output Extractor
+Fills every SFP 100G info/stats field from one scan over the "Key : Value"
+lines instead of one full-output regex search per field
+
+Each line is split at its separator and the key (without a trailing unit
+such as "(dBm)") is looked up in a dict of the wanted fields, whose value
+pattern then only has to match the text after the colon. A field the scan
+can't settle - its key is missing or its value doesn't parse - falls back
+to its original TejasCommandParser regex over the whole output. Results
+match the per-field parsers as long as keys are printed whole at the start
+of their line, which is how Tejas prints them.
+"""
+
+import re
+import threading
+
+
+# Value patterns a plain string check can settle: characters a value may consist of
+_VALUE_CHARS = {
+    r'(\d+)': '0123456789',
+    r'([\d.]+)': '0123456789.',
+    r'([-\d.]+)': '-0123456789.',
+}
+
+
+class FieldSpec:
+    """One field: its key, value pattern, original regex and how to turn a match into a value"""
+
+    __slots__ = ('field', 'key', 'value_regex', 'chars', 'word', 'regex', 'groups', 'strip')
+
+    def __init__(self, field, key, value_pattern, pattern, strip=False):
+        self.field = field
+        self.key = key
+        self.value_regex = re.compile(r'[ \t]*' + value_pattern)
+        self.chars = _VALUE_CHARS.get(value_pattern)
+        self.word = value_pattern == r'(\w+)'
+        self.regex = re.compile(pattern)
+        self.groups = self.regex.groups
+        self.strip = strip  # `(.+)` values keep trailing \r / spaces until stripped
+
+    def parse(self, text):
+        """Value from the text after the key's separator, or None if it doesn't match"""
+        if self.strip:
+            return text.strip() or None
+
+        # A value that is nothing but the pattern's characters is exactly what it captures
+        token = text.strip()
+        if token and (token.isalnum() if self.word else self.chars is not None and not token.strip(self.chars)):
+            return token
+
+        match = self.value_regex.match(text)
+        return self.value(match) if match else None
+
+    def value(self, match):
+        if self.groups > 1:
+            return match.groups()
+        value = match.group(1)
+        return value.strip() if self.strip else value
+
+    def fallback(self, output):
+        """The original whole-output regex search"""
+        match = self.regex.search(output)
+        return self.value(match) if match else None
+
+
+_LANES = r'.*?0=([-\d.]+);1=([-\d.]+);2=([-\d.]+);3=([-\d.]+)'
+
+SFP_100G_INFO_SPECS = [
+    FieldSpec('parent_interface', 'Parent', r'(.+)', r'Parent\s*:\s*(.+)', strip=True),
+    FieldSpec('laser_status', 'MSA Laser Status', r'(\w+)', r'MSA Laser Status\s*:\s*(\w+)'),
+    FieldSpec('present_status', 'Present Status', r'(\w+)', r'Present Status\s*:\s*(\w+)'),
+    FieldSpec('operational_status', 'Operational Status', r'(\w+)', r'Operational Status\s*:\s*(\w+)'),
+    FieldSpec('laser_type', 'Laser Type', r'(.+)', r'Laser Type\s*:\s*(.+)', strip=True),
+    FieldSpec('als_mode', 'ALS Mode', r'(\w+)', r'ALS Mode\s*:\s*(\w+)'),
+    FieldSpec('distance_range', 'Distance Range', r'(\d+)', r'Distance Range\s*:\s*(\d+)'),
+    FieldSpec('nominal_bit_rate', 'Nominal Bit Rate', r'([\d.]+)', r'Nominal Bit Rate.*?:\s*([\d.]+)'),
+    FieldSpec('rx_power', 'RxPower', r'([-\d.]+)', r'RxPower\s*:\s*([-\d.]+)'),
+    FieldSpec('tx_power', 'TxPower', r'([-\d.]+)', r'TxPower\s*:\s*([-\d.]+)'),
+    FieldSpec('laser_coherent', 'Laser Coherent', r'(\w+)', r'Laser Coherent\s*:\s*(\w+)'),
+    FieldSpec('module_temperature', 'Module Temperature', r'([-\d.]+)', r'Module Temperature.*?:\s*([-\d.]+)'),
+    FieldSpec('module_voltage', 'Module Voltage', r'([-\d.]+)', r'Module Voltage.*?:\s*([-\d.]+)'),
+    FieldSpec('product_code', 'Product Code', r'(.+)', r'Product Code\s*:\s*(.+)', strip=True),
+    FieldSpec('serial_number', 'Serial Number', r'(.+)', r'Serial Number\s*:\s*(.+)', strip=True),
+    FieldSpec('vendor_name', 'Vendor Name', r'(.+)', r'Vendor Name\s*:\s*(.+)', strip=True),
+]
+
+SFP_100G_STATS_SPECS = [
+    # No colon on this line: it splits at the "(" instead
+    FieldSpec('interval_seconds', 'CURRENT COUNTERS', r'(\d+)\)secs', r'CURRENT COUNTERS \((\d+)\)secs'),
+    FieldSpec('rx_power', 'Received Power', _LANES, r'Received Power' + _LANES),
+    FieldSpec('tx_power', 'Transmit Power', _LANES, r'Transmit Power' + _LANES),
+    FieldSpec('bias_current', 'Tx Laser Bias Current', _LANES, r'Tx Laser Bias Current' + _LANES),
+    FieldSpec('module_voltage', 'Module Voltage', r'([-\d.]+)', r'Module Voltage.*?:\s*([-\d.]+)'),
+    FieldSpec('module_temperature', 'Module Temperature', r'([-\d.]+)', r'Module Temperature.*?:\s*([-\d.]+)'),
+    FieldSpec('interval_valid', 'Interval Valid', r'(\d+)', r'Interval Valid\s*:\s*(\d+)'),
+]
+
+SFP_100G_INFO_FIELDS = tuple(spec.field for spec in SFP_100G_INFO_SPECS)
+SFP_100G_STATS_SECTIONS = tuple(spec.field for spec in SFP_100G_STATS_SPECS)
+
+
+# Distinct key texts remembered per scanner before starting over
+_MAX_KEYS = 4096
+
+
+class _Scanner:
+    """Key -> field lookup for a set of fields"""
+
+    def __init__(self, specs):
+        self.specs = specs
+        self.by_key = {spec.key: spec for spec in specs}
+        self.keys = {}     # key text as printed (padding, unit) -> FieldSpec or None
+
+    def _lookup(self, head):
+        key = head.strip()
+        spec = self.by_key.get(key)
+        if spec is None and key.endswith(')'):
+            spec = self.by_key.get(key[:key.rfind('(')].rstrip())    # "Module Voltage (V)"
+
+        # Routers print the same keys every poll: normalise each one once
+        if len(self.keys) >= _MAX_KEYS:
+            self.keys.clear()
+        self.keys[head] = spec
+        return spec
+
+    def scan(self, output):
+        keys = self.keys
+        found = {}
+        remaining = len(self.specs)
+
+        for line in output.splitlines():
+            head, sep, text = line.partition(':')
+            if not sep:
+                head, sep, text = line.partition('(')    # "CURRENT COUNTERS (900)secs"
+                if not sep:
+                    continue
+            try:
+                spec = keys[head]
+            except KeyError:
+                spec = self._lookup(head)
+            if spec is None or spec.field in found:
+                continue
+
+            value = spec.parse(text)
+            if value is not None:
+                found[spec.field] = value
+                remaining -= 1
+                if remaining == 0:
+                    return found
+
+        for spec in self.specs:
+            if spec.field not in found:
+                value = spec.fallback(output)
+                if value is not None:
+                    found[spec.field] = value
+
+        return found
+
+
+_scanners = {}
+_scanners_lock = threading.Lock()
+
+
+def _scanner(specs, fields):
+    """Scanner for exactly these fields (built once per field set)"""
+    key = (id(specs), fields)
+    scanner = _scanners.get(key)
+    if scanner is None:
+        with _scanners_lock:
+            scanner = _scanners.get(key)
+            if scanner is None:
+                wanted = set(fields)
+                scanner = _scanners[key] = _Scanner([spec for spec in specs if spec.field in wanted])
+    return scanner
+
+
+def extract_sfp_100g_info(output, fields=SFP_100G_INFO_FIELDS):
+    """
+    Same result as the per-field TejasCommandParser.parse_sfp_100g_info
+
+    Args:
+        fields: field names to return, in order (missing ones are 'N/A')
+    """
+    found = _scanner(SFP_100G_INFO_SPECS, tuple(fields)).scan(output)
+    return {field: found.get(field, 'N/A') for field in fields}
+
+
+def _lanes(result, prefix, lanes, average):
+    for lane, value in enumerate(lanes):
+        result[f'{prefix}_lane{lane}'] = value
+    if average:
+        powers = [float(value) for value in lanes]
+        result[f'{prefix}_avg'] = str(round(sum(powers) / len(powers), 4))
+
+
+def extract_sfp_100g_stats(output, sections=SFP_100G_STATS_SECTIONS):
+    """
+    Same result as the per-field TejasCommandParser.parse_sfp_100g_stats
+
+    Args:
+        sections: which groups to return, in order; rx/tx power also get an _avg
+    """
+    found = _scanner(SFP_100G_STATS_SPECS, tuple(sections)).scan(output)
+
+    result = {}
+    for section in sections:
+        if section not in found:
+            continue
+        if section == 'bias_current':
+            _lanes(result, 'bias_current', found[section], average=False)
+        elif section in ('rx_power', 'tx_power'):
+            _lanes(result, section, found[section], average=True)
+        else:
+            result[section] = found[section]
+
+    return result
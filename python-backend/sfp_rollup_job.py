@@ -0,0 +1,184 @@
+"""
+SFP Power Rollup Job
+Keeps sfp_power_rollups (5-minute, hourly and daily min/max/avg/last rx/tx
+power per interface and lane) up to date from sfp_metrics and sfp_readings,
+and answers history queries from the rollups (database/sfp_power_rollups.sql)
+
+Each run folds in only the rows inserted since the source's watermark
+(by inserted_at, so readings that sat in the writer queue still count), so
+it is cheap to run every few minutes.
+
+Usage:
+    python sfp_rollup_job.py                 # one run
+    python sfp_rollup_job.py --loop 300      # run every 5 minutes
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Rollup configuration (override from .env)
+SFP_ROLLUP_LAG = int(os.getenv('SFP_ROLLUP_LAG', '120'))   # seconds left for writer transactions in flight
+SFP_ROLLUP_MAX_POINTS = int(os.getenv('SFP_ROLLUP_MAX_POINTS', '500'))
+
+# bucket seconds -> retention in days (0 = keep forever)
+ROLLUP_RETENTION_DAYS = {
+    300: int(os.getenv('SFP_ROLLUP_RETENTION_5M_DAYS', '35')),
+    3600: int(os.getenv('SFP_ROLLUP_RETENTION_1H_DAYS', '400')),
+    86400: int(os.getenv('SFP_ROLLUP_RETENTION_1D_DAYS', '0'))
+}
+RESOLUTION_NAMES = {300: '5m', 3600: '1h', 86400: '1d'}
+
+MODULE_LANE = -1  # module value (lane average for Tejas, the only value for sfp_readings)
+
+HISTORY_QUERY = """
+    SELECT bucket_start, samples,
+           rx_min, rx_avg, rx_max, rx_last,
+           tx_min, tx_avg, tx_max, tx_last
+    FROM sfp_power_rollups
+    WHERE bucket_seconds = %s AND interface_id = %s AND lane = %s
+      AND bucket_start >= %s AND bucket_start < %s
+    ORDER BY bucket_start
+"""
+
+
+def run_rollups(conn, lag=SFP_ROLLUP_LAG, retention_days=None):
+    """
+    Fold new readings into the rollups and drop expired buckets, in one transaction
+
+    Returns:
+        {source_table: samples folded in}
+    """
+    retention_days = ROLLUP_RETENTION_DAYS if retention_days is None else retention_days
+    start = time.monotonic()
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT source_table, samples FROM refresh_sfp_power_rollups(%s * INTERVAL '1 second')",
+                       (lag,))
+        folded = dict(cursor.fetchall())
+
+        expired = 0
+        for bucket_seconds, days in retention_days.items():
+            if days > 0:
+                cursor.execute(
+                    "DELETE FROM sfp_power_rollups WHERE bucket_seconds = %s "
+                    "AND bucket_start < LOCALTIMESTAMP - %s * INTERVAL '1 day'",
+                    (bucket_seconds, days)
+                )
+                expired += cursor.rowcount
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    logger.info(f"📈 SFP rollups: {folded.get('sfp_metrics', 0)} sfp_metrics + "
+                f"{folded.get('sfp_readings', 0)} sfp_readings samples folded in, "
+                f"{expired} expired buckets dropped in {time.monotonic() - start:.2f}s")
+    return folded
+
+
+def choose_resolution(start, end, max_points=SFP_ROLLUP_MAX_POINTS, now=None):
+    """
+    Bucket size for a history query: the finest resolution whose rollups
+    still cover start (retention) and that returns at most max_points
+    buckets; daily if none does
+    """
+    now = now or datetime.now()
+    span = (end - start).total_seconds()
+
+    for bucket_seconds in sorted(ROLLUP_RETENTION_DAYS):
+        days = ROLLUP_RETENTION_DAYS[bucket_seconds]
+        if days > 0 and start < now - timedelta(days=days):
+            continue
+        if span / bucket_seconds <= max_points:
+            return bucket_seconds
+
+    return max(ROLLUP_RETENTION_DAYS)
+
+
+def get_sfp_power_history(conn, interface_id, start, end, max_points=SFP_ROLLUP_MAX_POINTS, lane=MODULE_LANE):
+    """
+    rx/tx power history of one interface from the rollups
+
+    Args:
+        start, end: datetimes (end exclusive)
+        max_points: point budget for the chart
+        lane: 0-3 for one lane, -1 for the module value
+
+    Returns:
+        {'resolution': '1h', 'bucket_seconds': 3600, 'points': [{bucket_start, samples, rx_min, ...}]}
+    """
+    bucket_seconds = choose_resolution(start, end, max_points)
+
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute(HISTORY_QUERY, (bucket_seconds, interface_id, lane, start, end))
+        points = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    return {
+        'resolution': RESOLUTION_NAMES[bucket_seconds],
+        'bucket_seconds': bucket_seconds,
+        'points': [dict(point) for point in points]
+    }
+
+
+def main():
+    import psycopg2
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--loop', type=float, default=0, help='run every N seconds instead of once')
+    parser.add_argument('--lag', type=int, default=SFP_ROLLUP_LAG, help='seconds left for in-flight writes')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    db_config = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': int(os.getenv('DB_PORT', '5432')),
+        'database': os.getenv('DB_NAME', 'cntx_portal'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD')
+    }
+    if not db_config['password']:
+        logger.error("❌ DB_PASSWORD not set in environment variables!")
+        sys.exit(1)
+
+    conn = psycopg2.connect(**db_config)
+    try:
+        while True:
+            try:
+                if conn.closed:
+                    conn = psycopg2.connect(**db_config)
+                run_rollups(conn, args.lag)
+            except Exception as e:
+                logger.error(f"❌ SFP rollup run failed: {e}")
+                if not args.loop:
+                    sys.exit(1)
+            if not args.loop:
+                break
+            time.sleep(args.loop)
+    except KeyboardInterrupt:
+        logger.info("⏹️  Stopped")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
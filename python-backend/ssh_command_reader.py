@@ -0,0 +1,429 @@
+"""
+Prompt-Aware SSH Command Reader
+Reads Tejas CLI output until the prompt reappears instead of sleeping a fixed time
+Every command gets a hard deadline and a byte cap, and reports how long it took
+Batches can be pipelined on one channel and split back on prompt boundaries
+"""
+
+import os
+import re
+import time
+import select
+import logging
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Per-command limits (override from .env)
+SSH_COMMAND_TIMEOUT = float(os.getenv('SSH_COMMAND_TIMEOUT', '30'))
+SSH_MAX_OUTPUT_BYTES = int(os.getenv('SSH_MAX_OUTPUT_BYTES', str(4 * 1024 * 1024)))
+SSH_LOGIN_NUDGE_AFTER = float(os.getenv('SSH_LOGIN_NUDGE_AFTER', '1.5'))  # silent login: press Enter after (seconds)
+
+RECV_CHUNK_SIZE = 65535
+
+# Only the tail of the buffer is checked for the prompt, so long outputs are not rescanned
+PROMPT_SEARCH_WINDOW = 256
+
+# Prompt patterns are PROMPT_PREFIX + <core> + PROMPT_SUFFIX; the core alone
+# marks command boundaries inside a pipelined stream
+PROMPT_PREFIX = rb'(?:^|[\r\n])'
+PROMPT_SUFFIX = rb'\s*$'
+
+# Generic Tejas prompt: "HOSTNAME#", "HOSTNAME>" or "HOSTNAME(config)#" at the end of the buffer
+GENERIC_PROMPT_PATTERN = re.compile(
+    PROMPT_PREFIX + rb'[\w.\-/:@]+(?:\([\w.\-/ ]*\))?\s?[#>]' + PROMPT_SUFFIX
+)
+
+# Pipelining: write a batch of commands at once and split the combined output
+SSH_PIPELINE_COMMANDS = os.getenv('SSH_PIPELINE_COMMANDS', 'true').lower() == 'true'
+SSH_PIPELINE_ECHO_TIMEOUT = float(os.getenv('SSH_PIPELINE_ECHO_TIMEOUT', '2'))     # next echo after a prompt (seconds)
+SSH_PIPELINE_RETRY_AFTER = float(os.getenv('SSH_PIPELINE_RETRY_AFTER', '3600'))   # retry pipelining a dropping CLI after (seconds)
+
+# Quiet period used to decide a desynced shell has finished talking
+RESYNC_QUIET_PERIOD = 0.3
+
+# Commands sent once per session to disable paging
+PAGINATION_OFF_COMMANDS = ['conf t', 'set cli pagination off', 'end']
+
+
+class CommandResult:
+    """Output of one CLI command and how the read ended"""
+
+    __slots__ = ('command', 'output', 'elapsed', 'prompt_seen', 'truncated', 'bytes_read')
+
+    def __init__(self, command, output, elapsed, prompt_seen, truncated, bytes_read):
+        self.command = command
+        self.output = output
+        self.elapsed = elapsed
+        self.prompt_seen = prompt_seen
+        self.truncated = truncated
+        self.bytes_read = bytes_read
+
+    @property
+    def timed_out(self):
+        return not self.prompt_seen
+
+    def __repr__(self):
+        return (f"CommandResult({self.command!r}, {self.bytes_read} bytes, "
+                f"{self.elapsed:.3f}s, prompt_seen={self.prompt_seen}, truncated={self.truncated})")
+
+
+def compile_prompt_pattern(hostname=None):
+    """Build prompt regex for a known hostname (falls back to generic pattern)"""
+    if not hostname:
+        return GENERIC_PROMPT_PATTERN
+
+    return re.compile(
+        PROMPT_PREFIX + re.escape(hostname.encode('ascii', errors='ignore')) +
+        rb'(?:\([^)\r\n]*\))?\s?[#>]' + PROMPT_SUFFIX
+    )
+
+
+def read_until_prompt(chan, prompt_pattern=None, timeout=SSH_COMMAND_TIMEOUT,
+                      max_bytes=SSH_MAX_OUTPUT_BYTES):
+    """
+    Read from channel until prompt appears, deadline passes or channel closes
+
+    Returns:
+        (output_bytes, prompt_seen, truncated)
+    """
+    pattern = prompt_pattern or GENERIC_PROMPT_PATTERN
+    deadline = time.monotonic() + timeout
+
+    chunks = []
+    bytes_kept = 0
+    tail = b""
+    truncated = False
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return b"".join(chunks), False, truncated
+
+        if not chan.recv_ready():
+            if chan.closed or chan.exit_status_ready():
+                return b"".join(chunks), False, truncated
+
+            # Block until data arrives instead of polling with sleep
+            select.select([chan], [], [], min(remaining, 1.0))
+            continue
+
+        data = chan.recv(RECV_CHUNK_SIZE)
+        if not data:
+            return b"".join(chunks), False, truncated
+
+        # Keep up to the byte cap, discard the rest but keep reading until the prompt
+        # so the next command does not see this command's leftover output
+        if bytes_kept < max_bytes:
+            kept = data[:max_bytes - bytes_kept]
+            chunks.append(kept)
+            bytes_kept += len(kept)
+            if len(kept) < len(data):
+                truncated = True
+        else:
+            truncated = True
+
+        tail = (tail + data)[-PROMPT_SEARCH_WINDOW:]
+        if pattern.search(tail):
+            return b"".join(chunks), True, truncated
+
+
+def execute_command(chan, command, prompt_pattern=None, timeout=SSH_COMMAND_TIMEOUT,
+                    max_bytes=SSH_MAX_OUTPUT_BYTES, encoding='ascii'):
+    """Send command and return CommandResult as soon as the prompt reappears"""
+    start = time.monotonic()
+    chan.send(f"{command}\n")
+
+    raw, prompt_seen, truncated = read_until_prompt(chan, prompt_pattern, timeout, max_bytes)
+    elapsed = time.monotonic() - start
+
+    if not prompt_seen:
+        logger.warning(f"⚠️  '{command}' did not return to prompt within {timeout}s "
+                       f"({len(raw)} bytes read)")
+    if truncated:
+        logger.warning(f"⚠️  '{command}' output truncated at {max_bytes} bytes")
+
+    return CommandResult(
+        command,
+        raw.decode(encoding, errors='ignore'),
+        elapsed,
+        prompt_seen,
+        truncated,
+        len(raw)
+    )
+
+
+def detect_hostname(banner):
+    """Extract hostname from the last prompt line of the login banner"""
+    lines = banner.strip().splitlines()
+    if not lines:
+        return None
+
+    match = re.match(r'^([\w.\-/:@]+)(?:\([^)]*\))?\s?[#>]$', lines[-1].strip())
+    return match.group(1) if match else None
+
+
+def prepare_shell(chan, timeout=SSH_COMMAND_TIMEOUT, disable_pagination=True):
+    """
+    Wait for the login prompt and turn off CLI pagination
+
+    Returns:
+        Compiled prompt pattern for this router's hostname
+    """
+    raw, prompt_seen, _ = read_until_prompt(chan, GENERIC_PROMPT_PATTERN, min(timeout, SSH_LOGIN_NUDGE_AFTER))
+
+    if not prompt_seen:
+        # Some routers print nothing until a key is pressed; don't wait out the full timeout first
+        chan.send("\n")
+        more, prompt_seen, _ = read_until_prompt(chan, GENERIC_PROMPT_PATTERN, timeout)
+        raw += more
+
+    hostname = detect_hostname(raw.decode('ascii', errors='ignore'))
+    prompt_pattern = compile_prompt_pattern(hostname)
+
+    if disable_pagination:
+        for command in PAGINATION_OFF_COMMANDS:
+            execute_command(chan, command, prompt_pattern, timeout)
+
+    return prompt_pattern
+
+
+# ============================================
+# Pipelined execution
+# ============================================
+
+# Prompts of CLIs seen dropping typed-ahead input -> monotonic time to try pipelining again;
+# until then they run one at a time
+_typeahead_unsupported = {}
+_typeahead_lock = threading.Lock()
+
+
+def _pipelining_blocked(pattern):
+    with _typeahead_lock:
+        retry_at = _typeahead_unsupported.get(pattern.pattern)
+        if retry_at is not None and time.monotonic() >= retry_at:
+            del _typeahead_unsupported[pattern.pattern]
+            retry_at = None
+    return retry_at is not None
+
+
+def _block_pipelining(pattern):
+    with _typeahead_lock:
+        _typeahead_unsupported[pattern.pattern] = time.monotonic() + SSH_PIPELINE_RETRY_AFTER
+
+
+def boundary_pattern(prompt_pattern):
+    """Prompt regex matching at any line start (not only at the end of the buffer)"""
+    core = prompt_pattern.pattern[len(PROMPT_PREFIX):-len(PROMPT_SUFFIX)]
+    return re.compile(rb'(?m)^' + core)
+
+
+def _read_prompts(chan, boundary, count, timeout, max_bytes, echo_timeout=SSH_PIPELINE_ECHO_TIMEOUT):
+    """
+    Read until `count` prompts have been seen; the deadline restarts at every prompt
+    so each command in the batch gets the same budget as a single command. A shell
+    that stays silent for echo_timeout after a prompt has dropped the rest of the batch.
+
+    Returns:
+        (output_bytes, prompt_end_offsets, prompt_times, complete)
+    """
+    buf = bytearray()
+    ends = []
+    times = []
+    scan_from = 0
+    deadline = time.monotonic() + timeout
+
+    while len(ends) < count:
+        now = time.monotonic()
+        remaining = deadline - now
+        if ends and len(buf) == ends[-1]:
+            # A CLI that kept the typed-ahead commands echoes the next one right away
+            remaining = min(remaining, times[-1] + echo_timeout - now)
+        if remaining <= 0:
+            return bytes(buf), ends, times, False
+
+        if not chan.recv_ready():
+            if chan.closed or chan.exit_status_ready():
+                return bytes(buf), ends, times, False
+
+            select.select([chan], [], [], min(remaining, 1.0))
+            continue
+
+        data = chan.recv(RECV_CHUNK_SIZE)
+        if not data:
+            return bytes(buf), ends, times, False
+
+        buf += data
+        if len(buf) > max_bytes:
+            return bytes(buf), ends, times, False
+
+        # Prompts always start a line, so only rescan from the last line start
+        for match in boundary.finditer(buf, scan_from):
+            ends.append(match.end())
+            times.append(time.monotonic())
+            scan_from = match.end()
+            deadline = time.monotonic() + timeout
+            if len(ends) == count:
+                break
+        else:
+            scan_from = max(scan_from, buf.rfind(b"\n", scan_from) + 1)
+
+    return bytes(buf), ends, times, True
+
+
+def split_pipelined_output(raw, commands, prompt_ends):
+    """
+    Split a pipelined stream into per-command outputs using the echoed command
+    lines and prompt boundaries. Each piece looks exactly like what a
+    one-at-a-time read returns: echo, output, trailing prompt.
+
+    Returns:
+        List of output bytes, or None if the stream doesn't line up with the commands
+    """
+    if len(prompt_ends) < len(commands):
+        return None
+
+    outputs = []
+    start = 0
+
+    for command, end in zip(commands, prompt_ends):
+        segment = raw[start:end]
+        echo = segment.split(b"\n", 1)[0].strip()
+
+        if echo != command.encode('ascii', errors='ignore').strip():
+            return None
+
+        outputs.append(segment)
+        start = end
+
+    return outputs
+
+
+def typeahead_dropped(raw, commands, prompt_ends):
+    """
+    Whether an incomplete pipelined read shows the CLI discarding typed-ahead input:
+    an echo that doesn't match its command (merged or missing), or the shell idle at
+    a prompt with commands outstanding. A command that echoed but didn't finish
+    (slow router, byte cap) is not evidence against pipelining.
+    """
+    start = 0
+    for command, end in zip(commands, prompt_ends):
+        echo = raw[start:end].split(b"\n", 1)[0].strip()
+        if echo != command.encode('ascii', errors='ignore').strip():
+            return True
+        start = end
+
+    if len(prompt_ends) >= len(commands):
+        return False
+
+    pending = raw[start:].lstrip(b"\r\n")
+    if not pending:
+        return bool(prompt_ends)
+
+    # The next command started: its echo (possibly still arriving) must be that command
+    expected = commands[len(prompt_ends)].encode('ascii', errors='ignore').strip()
+    echo, newline, _ = pending.partition(b"\n")
+    if newline:
+        return echo.strip() != expected
+    return not expected.startswith(echo.strip())
+
+
+def resync(chan, prompt_pattern, timeout=SSH_COMMAND_TIMEOUT):
+    """Bring a desynced shell back to a clean prompt"""
+    deadline = time.monotonic() + timeout
+    chan.send("\n")
+
+    while time.monotonic() < deadline:
+        _, prompt_seen, _ = read_until_prompt(chan, prompt_pattern, deadline - time.monotonic())
+
+        # Still talking after the prompt means more queued commands are finishing
+        select.select([chan], [], [], RESYNC_QUIET_PERIOD)
+        if prompt_seen and not chan.recv_ready():
+            return True
+
+    return False
+
+
+def execute_pipelined(chan, commands, prompt_pattern, timeout=SSH_COMMAND_TIMEOUT,
+                      max_bytes=SSH_MAX_OUTPUT_BYTES, encoding='ascii'):
+    """
+    Write all commands at once and split the combined output
+
+    Returns:
+        List of CommandResult, or None if the batch didn't complete (the shell is
+        resynced first; the router is only switched to one-at-a-time execution
+        when it was seen dropping typed-ahead input)
+    """
+    boundary = boundary_pattern(prompt_pattern)
+
+    start = time.monotonic()
+    chan.send("".join(f"{command}\n" for command in commands))
+
+    raw, ends, times, complete = _read_prompts(
+        chan, boundary, len(commands), timeout, max_bytes * len(commands)
+    )
+    outputs = split_pipelined_output(raw, commands, ends) if complete else None
+
+    if outputs is None:
+        logger.warning(f"⚠️  Pipelined batch of {len(commands)} commands did not line up "
+                       f"({len(ends)} prompts seen), resyncing shell")
+        if len(raw) <= max_bytes * len(commands) and typeahead_dropped(raw, commands, ends):
+            _block_pipelining(prompt_pattern)
+            logger.warning(f"⚠️  CLI dropped typed-ahead input, running this router one command "
+                           f"at a time for {SSH_PIPELINE_RETRY_AFTER:.0f}s")
+        resync(chan, prompt_pattern, timeout)
+        return None
+
+    results = []
+    previous = start
+    for command, output, seen_at in zip(commands, outputs, times):
+        truncated = len(output) > max_bytes
+        results.append(CommandResult(
+            command,
+            output[:max_bytes].decode(encoding, errors='ignore'),
+            seen_at - previous,
+            True,
+            truncated,
+            min(len(output), max_bytes)
+        ))
+        previous = seen_at
+
+    return results
+
+
+def execute_batch(chan, commands, prompt_pattern=None, timeout=SSH_COMMAND_TIMEOUT,
+                  max_bytes=SSH_MAX_OUTPUT_BYTES, encoding='ascii', pipeline=SSH_PIPELINE_COMMANDS):
+    """
+    Run a list of commands on one shell
+
+    Pipelined when enabled and the router's prompt is known; falls back to one
+    command at a time when the batch fails (for SSH_PIPELINE_RETRY_AFTER when the
+    CLI dropped typed-ahead input).
+
+    Returns:
+        List of CommandResult in the same order as commands
+    """
+    pattern = prompt_pattern or GENERIC_PROMPT_PATTERN
+
+    can_pipeline = (
+        pipeline
+        and len(commands) > 1
+        and pattern is not GENERIC_PROMPT_PATTERN
+        and not _pipelining_blocked(pattern)
+    )
+
+    if can_pipeline:
+        results = execute_pipelined(chan, commands, pattern, timeout, max_bytes, encoding)
+        if results is not None:
+            return results
+
+        logger.warning("⚠️  Falling back to one-at-a-time execution for this batch")
+
+    return [
+        execute_command(chan, command, pattern, timeout, max_bytes, encoding)
+        for command in commands
+    ]
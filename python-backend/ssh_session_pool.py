@@ -0,0 +1,320 @@
+"""
+Persistent SSH Session Pool
+Keeps one authenticated, pagination-off shell per router so repeated
+dashboard requests only pay for the commands themselves
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+import paramiko
+from dotenv import load_dotenv
+
+import ssh_command_reader
+from router_circuit_breaker import get_breakers
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (override from .env)
+SSH_POOL_MAX_SESSIONS = int(os.getenv('SSH_POOL_MAX_SESSIONS', '50'))
+SSH_POOL_IDLE_TIMEOUT = float(os.getenv('SSH_POOL_IDLE_TIMEOUT', '300'))
+SSH_POOL_ACQUIRE_TIMEOUT = float(os.getenv('SSH_POOL_ACQUIRE_TIMEOUT', '30'))
+SSH_KEEPALIVE_INTERVAL = int(os.getenv('SSH_KEEPALIVE_INTERVAL', '30'))
+SSH_CONNECT_TIMEOUT = float(os.getenv('SSH_CONNECT_TIMEOUT', '30'))
+
+# Sessions idle longer than this get a prompt round-trip before reuse
+HEALTH_PROBE_AFTER = float(os.getenv('SSH_POOL_HEALTH_PROBE_AFTER', '15'))
+HEALTH_PROBE_TIMEOUT = 5
+
+
+class PooledSession:
+    """One authenticated shell on one router"""
+
+    def __init__(self, router_id, fingerprint, ssh, shell, prompt_pattern):
+        self.router_id = router_id
+        self.fingerprint = fingerprint
+        self.ssh = ssh
+        self.shell = shell
+        self.prompt_pattern = prompt_pattern
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.in_use = False
+        self.broken = False
+        self.commands_executed = 0
+
+    def is_alive(self):
+        """Cheap liveness check (no network traffic)"""
+        transport = self.ssh.get_transport()
+        return (
+            not self.broken
+            and transport is not None
+            and transport.is_active()
+            and not self.shell.closed
+        )
+
+    def drain(self):
+        """Drop anything left over from a previous request"""
+        while self.shell.recv_ready():
+            self.shell.recv(ssh_command_reader.RECV_CHUNK_SIZE)
+
+    def probe(self):
+        """Send an empty line and expect the prompt back"""
+        self.shell.send("\n")
+        _, prompt_seen, _ = ssh_command_reader.read_until_prompt(
+            self.shell, self.prompt_pattern, HEALTH_PROBE_TIMEOUT
+        )
+        return prompt_seen
+
+    def execute(self, command, timeout=ssh_command_reader.SSH_COMMAND_TIMEOUT,
+                encoding='utf-8'):
+        """Run a command on this session's shell"""
+        result = ssh_command_reader.execute_command(
+            self.shell, command, self.prompt_pattern, timeout, encoding=encoding
+        )
+        self.commands_executed += 1
+
+        # Shell is out of sync with the prompt, don't hand it to the next request
+        if result.timed_out:
+            self.broken = True
+
+        return result
+
+    def close(self):
+        try:
+            self.shell.close()
+        except Exception:
+            pass
+        try:
+            self.ssh.close()
+        except Exception:
+            pass
+
+
+class SSHSessionPool:
+    """Process-wide pool of shell sessions keyed by router id"""
+
+    def __init__(self, max_sessions=SSH_POOL_MAX_SESSIONS, idle_timeout=SSH_POOL_IDLE_TIMEOUT,
+                 keepalive_interval=SSH_KEEPALIVE_INTERVAL, connect_timeout=SSH_CONNECT_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.connect_timeout = connect_timeout
+
+        self._sessions = {}
+        self._pending = set()  # router ids with a connect in progress
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.counters = {
+            'created': 0,
+            'reused': 0,
+            'evicted_idle': 0,
+            'evicted_lru': 0,
+            'discarded_unhealthy': 0
+        }
+
+        self._reaper = threading.Thread(target=self._reap_idle, name='ssh-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    @staticmethod
+    def _fingerprint(router):
+        return (router['ip_address'], router['ssh_port'] or 22, router['username'], router['password'])
+
+    def _open_session(self, router, fingerprint):
+        # Fails fast (CircuitOpenError) for routers that keep refusing connects
+        breakers = get_breakers()
+        breakers.check(router['id'])
+
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            ssh.connect(
+                hostname=router['ip_address'],
+                port=router['ssh_port'] or 22,
+                username=router['username'],
+                password=router['password'],
+                timeout=self.connect_timeout,
+                look_for_keys=False,
+                allow_agent=False
+            )
+            ssh.get_transport().set_keepalive(self.keepalive_interval)
+            shell = ssh.invoke_shell()
+            prompt_pattern = ssh_command_reader.prepare_shell(shell)
+        except Exception as e:
+            ssh.close()
+            breakers.failure(router['id'], e)
+            raise
+        breakers.success(router['id'])
+
+        logger.info(f"[POOL] Opened session for router {router['id']} ({router['hostname']})")
+        return PooledSession(router['id'], fingerprint, ssh, shell, prompt_pattern)
+
+    def _evict_lru_idle(self):
+        """Close least recently used idle session to make room (caller holds lock)"""
+        idle = [s for s in self._sessions.values() if not s.in_use]
+        if not idle:
+            return False
+
+        victim = min(idle, key=lambda s: s.last_used)
+        del self._sessions[victim.router_id]
+        victim.close()
+        self.counters['evicted_lru'] += 1
+        return True
+
+    def acquire(self, router, timeout=SSH_POOL_ACQUIRE_TIMEOUT):
+        """Check out the router's session, opening one if needed"""
+        router_id = router['id']
+        fingerprint = self._fingerprint(router)
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("SSH session pool is closed")
+
+                session = self._sessions.get(router_id)
+
+                if session and not session.in_use:
+                    stale = session.fingerprint != fingerprint or not session.is_alive()
+                    if stale:
+                        del self._sessions[router_id]
+                        session.close()
+                        self.counters['discarded_unhealthy'] += 1
+                        continue
+                    else:
+                        session.in_use = True
+                        break
+
+                elif session is None and router_id not in self._pending:
+                    if len(self._sessions) + len(self._pending) < self.max_sessions or self._evict_lru_idle():
+                        self._pending.add(router_id)
+                        break
+
+                # Session busy, being opened, or pool full: wait for a release
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for SSH session to router {router_id}")
+                self._cond.wait(remaining)
+
+        if session is None:
+            try:
+                session = self._open_session(router, fingerprint)
+            except Exception:
+                with self._cond:
+                    self._pending.discard(router_id)
+                    self._cond.notify_all()
+                raise
+
+            with self._cond:
+                self._pending.discard(router_id)
+                session.in_use = True
+                self._sessions[router_id] = session
+                self.counters['created'] += 1
+            return session, False
+
+        # Health check outside the lock, it talks to the router
+        healthy = True
+        try:
+            session.drain()
+            if time.monotonic() - session.last_used > HEALTH_PROBE_AFTER:
+                healthy = session.probe()
+        except Exception as e:
+            logger.warning(f"[POOL] Health check failed for router {router_id}: {e}")
+            healthy = False
+
+        if not healthy:
+            self.release(session, discard=True)
+            with self._cond:
+                self.counters['discarded_unhealthy'] += 1
+            return self.acquire(router, max(deadline - time.monotonic(), 0))
+
+        with self._cond:
+            self.counters['reused'] += 1
+        return session, True
+
+    def release(self, session, discard=False):
+        """Return session to the pool (or close it if broken)"""
+        with self._cond:
+            session.in_use = False
+            session.last_used = time.monotonic()
+
+            if discard or session.broken or self._closed:
+                if self._sessions.get(session.router_id) is session:
+                    del self._sessions[session.router_id]
+                session.close()
+
+            self._cond.notify_all()
+
+    @contextmanager
+    def session(self, router):
+        """
+        Usage:
+            with pool.session(router) as (session, reused):
+                session.execute('show ip ospf neighbor')
+        """
+        session, reused = self.acquire(router)
+        try:
+            yield session, reused
+        except Exception:
+            session.broken = True
+            raise
+        finally:
+            self.release(session)
+
+    def _reap_idle(self):
+        """Background thread: close sessions idle longer than idle_timeout"""
+        while True:
+            time.sleep(min(self.idle_timeout / 2, 30))
+
+            with self._cond:
+                if self._closed:
+                    return
+
+                now = time.monotonic()
+                for router_id, session in list(self._sessions.items()):
+                    if session.in_use:
+                        continue
+                    if now - session.last_used > self.idle_timeout or not session.is_alive():
+                        del self._sessions[router_id]
+                        session.close()
+                        self.counters['evicted_idle'] += 1
+
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'open_sessions': len(self._sessions),
+                'in_use': sum(1 for s in self._sessions.values() if s.in_use),
+                'max_sessions': self.max_sessions,
+                **self.counters
+            }
+
+    def close_all(self):
+        with self._cond:
+            self._closed = True
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._cond.notify_all()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool():
+    """Shared pool for the whole process"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SSHSessionPool()
+            atexit.register(_pool.close_all)
+        return _pool
@@ -8,6 +8,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
 import logging
+import sys
 import json
 import os
 from dotenv import load_dotenv
@@ -389,7 +390,8 @@ def main():
     finally:
         db_manager.close()
     
-    input("\nPress Enter to exit...")
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
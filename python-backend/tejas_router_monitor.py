@@ -5,14 +5,22 @@ Based on actual Tejas command outputs
 """
 
 import paramiko
-import time
 import re
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
-import json
+import sys
+
+import ssh_command_reader
+import sfp_output_extractor
+import cli_table_parser
+from fleet_inventory import FleetInventory, load_fleet_inventory
+from collection_engine import CollectionEngine, CollectionJob
+from reading_writer import QueuedWriter, QueuedReadingWriter
+from sfp_metrics import SFP_METRICS_ENABLED, SFPMetricsWriter, sfp_metrics_row
+from parameter_metadata_cache import ParameterMetadataCache
+from router_circuit_breaker import CircuitOpenError, get_breakers
 
 # Setup logging
 logging.basicConfig(
@@ -37,40 +45,35 @@ DB_CONFIG = {
 class TejasCommandParser:
     """Parse Tejas router command outputs"""
     
+    # Patterns are compiled once at import, not on every output
+    IPV4_RE = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
+    ROUTER_ID_RE = re.compile(r'BGP router identifier is ([\d.]+)')
+    LOCAL_AS_RE = re.compile(r'Local AS number (\d+)')
+    ESTABLISHED_RE = re.compile(r'Established Count\s*:\s*(\d+)')
+    CONFIGURED_RE = re.compile(r'Configured count\s*:\s*(\d+)')
+    CHANGE_VERSION_RE = re.compile(r'Total Change version\s*:\s*(\d+)')
+    FORWARDING_RE = re.compile(r'Forwarding State is (\w+)')
+    
+    OSPF_NEIGHBOR_FIELDS = (
+        'neighbor_id', 'priority', 'state', 'dead_time', 'neighbor_address', 'interface',
+        'helper_status', 'helper_age', 'helper_er', 'bfd_status', 'area_id'
+    )
+    BGP_NEIGHBOR_FIELDS = (
+        'description', 'neighbor', 'version', 'as_number', 'msg_rcvd', 'msg_sent', 'uptime', 'state'
+    )
+    
+    SFP_100G_INFO_FIELDS = sfp_output_extractor.SFP_100G_INFO_FIELDS
+    
     @staticmethod
     def parse_ospf_neighbors(output):
         """Parse OSPF neighbor output"""
         neighbors = []
         
-        # Find the table section
-        lines = output.split('\n')
-        in_table = False
-        
-        for line in lines:
-            # Skip until we find the separator line
-            if '---' in line and 'Neighbor-ID' in output[:output.index(line)]:
-                in_table = True
-                continue
-            
-            if in_table and line.strip():
-                # Parse neighbor line
-                # Format: Neighbor-ID  Pri  State  DeadTime  Address  Interface  Helper  HelperAge  HelperER  Bfd  AreaID
-                parts = line.split()
-                if len(parts) >= 11 and re.match(r'^\d+\.\d+\.\d+\.\d+$', parts[0]):
-                    neighbor = {
-                        'neighbor_id': parts[0],
-                        'priority': parts[1],
-                        'state': parts[2],
-                        'dead_time': parts[3],
-                        'neighbor_address': parts[4],
-                        'interface': parts[5],
-                        'helper_status': parts[6],
-                        'helper_age': parts[7],
-                        'helper_er': parts[8],
-                        'bfd_status': parts[9],
-                        'area_id': parts[10]
-                    }
-                    neighbors.append(neighbor)
+        # Header and separator are found once; rows are split on the header's columns
+        # Format: Neighbor-ID  Pri  State  DeadTime  Address  Interface  Helper  HelperAge  HelperER  Bfd  AreaID
+        for cells in cli_table_parser.parse_table(output, 'Neighbor-ID'):
+            if len(cells) >= 11 and all(cells[:11]) and TejasCommandParser.IPV4_RE.match(cells[0]):
+                neighbors.append(dict(zip(TejasCommandParser.OSPF_NEIGHBOR_FIELDS, cells)))
         
         return {
             'neighbor_count': len(neighbors),
@@ -83,56 +86,40 @@ class TejasCommandParser:
         result = {}
         
         # Extract router ID and AS
-        router_id_match = re.search(r'BGP router identifier is ([\d.]+)', output)
+        router_id_match = TejasCommandParser.ROUTER_ID_RE.search(output)
         if router_id_match:
             result['router_id'] = router_id_match.group(1)
         
-        local_as_match = re.search(r'Local AS number (\d+)', output)
+        local_as_match = TejasCommandParser.LOCAL_AS_RE.search(output)
         if local_as_match:
             result['local_as'] = local_as_match.group(1)
         
         # Extract counts
-        established_match = re.search(r'Established Count\s*:\s*(\d+)', output)
+        established_match = TejasCommandParser.ESTABLISHED_RE.search(output)
         if established_match:
             result['established_count'] = established_match.group(1)
         
-        configured_match = re.search(r'Configured count\s*:\s*(\d+)', output)
+        configured_match = TejasCommandParser.CONFIGURED_RE.search(output)
         if configured_match:
             result['configured_count'] = configured_match.group(1)
         
-        change_version_match = re.search(r'Total Change version\s*:\s*(\d+)', output)
+        change_version_match = TejasCommandParser.CHANGE_VERSION_RE.search(output)
         if change_version_match:
             result['total_change_version'] = change_version_match.group(1)
         
-        forwarding_match = re.search(r'Forwarding State is (\w+)', output)
+        forwarding_match = TejasCommandParser.FORWARDING_RE.search(output)
         if forwarding_match:
             result['forwarding_state'] = forwarding_match.group(1)
         
         # Parse neighbor table
         neighbors = []
-        lines = output.split('\n')
-        in_table = False
-        
-        for line in lines:
-            if '---' in line and 'Neighbor' in output[:output.index(line)]:
-                in_table = True
-                continue
-            
-            if in_table and line.strip():
-                parts = line.split()
-                if len(parts) >= 8 and re.match(r'^\d+\.\d+\.\d+\.\d+$', parts[1]):
-                    neighbor = {
-                        'description': parts[0],
-                        'neighbor': parts[1],
-                        'version': parts[2],
-                        'as_number': parts[3],
-                        'msg_rcvd': parts[4],
-                        'msg_sent': parts[5],
-                        'uptime': parts[6],
-                        'state': parts[7],
-                        'updown_count': parts[8] if len(parts) > 8 else 'N/A'
-                    }
-                    neighbors.append(neighbor)
+        fields = TejasCommandParser.BGP_NEIGHBOR_FIELDS
+        is_ipv4 = TejasCommandParser.IPV4_RE.match
+        for cells in cli_table_parser.parse_table(output, 'Neighbor'):
+            if len(cells) >= 8 and is_ipv4(cells[1]) and all(cells[:8]):
+                neighbor = dict(zip(fields, cells))
+                neighbor['updown_count'] = cells[8] if len(cells) > 8 and cells[8] else 'N/A'
+                neighbors.append(neighbor)
         
         result['bgp_neighbors'] = neighbors
         result['bgp_neighbor_count'] = len(neighbors)
@@ -141,96 +128,13 @@ class TejasCommandParser:
     
     @staticmethod
     def parse_sfp_100g_info(output):
-        """Parse SFP 100G info output"""
-        result = {}
-        
-        # Simple field extraction
-        fields = {
-            'parent_interface': r'Parent\s*:\s*(.+)',
-            'laser_status': r'MSA Laser Status\s*:\s*(\w+)',
-            'present_status': r'Present Status\s*:\s*(\w+)',
-            'operational_status': r'Operational Status\s*:\s*(\w+)',
-            'laser_type': r'Laser Type\s*:\s*(.+)',
-            'als_mode': r'ALS Mode\s*:\s*(\w+)',
-            'distance_range': r'Distance Range\s*:\s*(\d+)',
-            'nominal_bit_rate': r'Nominal Bit Rate.*?:\s*([\d.]+)',
-            'rx_power': r'RxPower\s*:\s*([-\d.]+)',
-            'tx_power': r'TxPower\s*:\s*([-\d.]+)',
-            'laser_coherent': r'Laser Coherent\s*:\s*(\w+)',
-            'module_temperature': r'Module Temperature.*?:\s*([-\d.]+)',
-            'module_voltage': r'Module Voltage.*?:\s*([-\d.]+)',
-            'product_code': r'Product Code\s*:\s*(.+)',
-            'serial_number': r'Serial Number\s*:\s*(.+)',
-            'vendor_name': r'Vendor Name\s*:\s*(.+)'
-        }
-        
-        for field, pattern in fields.items():
-            match = re.search(pattern, output)
-            if match:
-                result[field] = match.group(1).strip()
-            else:
-                result[field] = 'N/A'
-        
-        return result
+        """Parse SFP 100G info output (single pass over the Key : Value lines)"""
+        return sfp_output_extractor.extract_sfp_100g_info(output, TejasCommandParser.SFP_100G_INFO_FIELDS)
     
     @staticmethod
     def parse_sfp_100g_stats(output):
-        """Parse SFP 100G stats output"""
-        result = {}
-        
-        # Extract interval
-        interval_match = re.search(r'CURRENT COUNTERS \((\d+)\)secs', output)
-        if interval_match:
-            result['interval_seconds'] = interval_match.group(1)
-        
-        # Extract RX power for all lanes
-        rx_power_match = re.search(r'Received Power.*?0=([-\d.]+);1=([-\d.]+);2=([-\d.]+);3=([-\d.]+)', output)
-        if rx_power_match:
-            result['rx_power_lane0'] = rx_power_match.group(1)
-            result['rx_power_lane1'] = rx_power_match.group(2)
-            result['rx_power_lane2'] = rx_power_match.group(3)
-            result['rx_power_lane3'] = rx_power_match.group(4)
-            
-            # Calculate average RX power
-            rx_powers = [float(rx_power_match.group(i)) for i in range(1, 5)]
-            result['rx_power_avg'] = str(round(sum(rx_powers) / len(rx_powers), 4))
-        
-        # Extract TX power for all lanes
-        tx_power_match = re.search(r'Transmit Power.*?0=([-\d.]+);1=([-\d.]+);2=([-\d.]+);3=([-\d.]+)', output)
-        if tx_power_match:
-            result['tx_power_lane0'] = tx_power_match.group(1)
-            result['tx_power_lane1'] = tx_power_match.group(2)
-            result['tx_power_lane2'] = tx_power_match.group(3)
-            result['tx_power_lane3'] = tx_power_match.group(4)
-            
-            # Calculate average TX power
-            tx_powers = [float(tx_power_match.group(i)) for i in range(1, 5)]
-            result['tx_power_avg'] = str(round(sum(tx_powers) / len(tx_powers), 4))
-        
-        # Extract bias current for all lanes
-        bias_match = re.search(r'Tx Laser Bias Current.*?0=([-\d.]+);1=([-\d.]+);2=([-\d.]+);3=([-\d.]+)', output)
-        if bias_match:
-            result['bias_current_lane0'] = bias_match.group(1)
-            result['bias_current_lane1'] = bias_match.group(2)
-            result['bias_current_lane2'] = bias_match.group(3)
-            result['bias_current_lane3'] = bias_match.group(4)
-        
-        # Extract module voltage
-        voltage_match = re.search(r'Module Voltage.*?:\s*([-\d.]+)', output)
-        if voltage_match:
-            result['module_voltage'] = voltage_match.group(1)
-        
-        # Extract module temperature
-        temp_match = re.search(r'Module Temperature.*?:\s*([-\d.]+)', output)
-        if temp_match:
-            result['module_temperature'] = temp_match.group(1)
-        
-        # Extract interval valid
-        valid_match = re.search(r'Interval Valid\s*:\s*(\d+)', output)
-        if valid_match:
-            result['interval_valid'] = valid_match.group(1)
-        
-        return result
+        """Parse SFP 100G stats output (single pass, all lane groups)"""
+        return sfp_output_extractor.extract_sfp_100g_stats(output)
 
 class DatabaseManager:
     """Database operations"""
@@ -238,10 +142,20 @@ class DatabaseManager:
     def __init__(self, config):
         self.config = config
         self.conn = None
+        self.metadata = None
+        self.writer = None
+        self.metrics_writer = None
     
     def connect(self):
         try:
             self.conn = psycopg2.connect(**self.config)
+            self.metadata = ParameterMetadataCache(lambda: psycopg2.connect(**self.config))
+            # Readings are written by dedicated writer threads on their own connections
+            self.writer = QueuedReadingWriter(lambda: psycopg2.connect(**self.config), self.metadata)
+            if SFP_METRICS_ENABLED:
+                self.metrics_writer = QueuedWriter(
+                    lambda: SFPMetricsWriter(psycopg2.connect(**self.config)), name='sfp metrics writer'
+                )
             logger.info("✅ Database connected")
             return self.conn
         except Exception as e:
@@ -249,9 +163,25 @@ class DatabaseManager:
             raise
     
     def close(self):
+        if self.writer:
+            self.writer.close()
+        if self.metrics_writer:
+            self.metrics_writer.close()
+        if self.metadata:
+            self.metadata.close()
         if self.conn:
             self.conn.close()
     
+    def get_fleet_inventory(self, device_type=None):
+        """Routers and their monitored interfaces in one query"""
+        try:
+            return load_fleet_inventory(self.conn, device_type, parameters=False)
+        
+        except Exception as e:
+            logger.error(f"❌ Error loading inventory: {e}")
+            self.conn.rollback()
+            return FleetInventory()
+    
     def get_tejas_routers(self):
         """Get all Tejas routers"""
         try:
@@ -299,60 +229,39 @@ class DatabaseManager:
             return []
     
     def save_reading(self, router_id, interface_id, parameter_name, reading_data, raw_output):
-        """Save parameter reading"""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Get parameter ID
-            cursor.execute(
-                "SELECT id FROM monitoring_parameters WHERE parameter_name = %s",
-                (parameter_name,)
-            )
-            result = cursor.fetchone()
-            
-            if not result:
-                logger.warning(f"⚠️  Parameter {parameter_name} not found")
-                return
-            
-            parameter_id = result[0]
-            
-            # Insert reading
-            query = """
-                INSERT INTO parameter_readings 
-                (router_id, interface_id, parameter_id, reading_data, raw_output, reading_time)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            cursor.execute(query, (
-                router_id,
-                interface_id,
-                parameter_id,
-                json.dumps(reading_data),
-                raw_output,
-                datetime.now()
-            ))
-            
-            self.conn.commit()
-            cursor.close()
-            
-        except Exception as e:
-            logger.error(f"❌ Error saving reading: {e}")
-            self.conn.rollback()
+        """Queue parameter reading (written in bulk by the writer threads)"""
+        self.writer.add(router_id, interface_id, parameter_name, reading_data, raw_output)
+    
+    def save_sfp_metrics(self, router_id, interface_id, sfp_stats_data):
+        """Queue typed SFP stats for sfp_metrics (skipped when nothing parsed)"""
+        if self.metrics_writer:
+            row = sfp_metrics_row(router_id, interface_id, sfp_stats_data)
+            if row:
+                self.metrics_writer.put(row)
 
 class TejasRouterMonitor:
     """Monitor Tejas routers"""
     
     @staticmethod
-    def execute_command(chan, command, wait_time=2):
-        """Execute command and return output"""
-        chan.send(f"{command}\n")
-        time.sleep(wait_time)
+    def execute_command(chan, command, prompt_pattern=None, timings=None):
+        """Execute command and return output as soon as the prompt reappears"""
+        result = ssh_command_reader.execute_command(chan, command, prompt_pattern)
         
-        resp = b""
-        while chan.recv_ready():
-            resp += chan.recv(9999)
+        if timings is not None:
+            timings[command] = round(result.elapsed, 3)
         
-        return resp.decode('ascii', errors='ignore')
+        return result.output
+    
+    @staticmethod
+    def execute_commands(chan, commands, prompt_pattern=None, timings=None):
+        """Execute a batch of commands in one pipelined burst, returns {command: output}"""
+        results = ssh_command_reader.execute_batch(chan, commands, prompt_pattern)
+        
+        if timings is not None:
+            for result in results:
+                timings[result.command] = round(result.elapsed, 3)
+        
+        return {result.command: result.output for result in results}
     
     @staticmethod
     def monitor_router(router, interfaces, db_manager):
@@ -368,9 +277,22 @@ class TejasRouterMonitor:
             'router': hostname,
             'ospf': None,
             'bgp': None,
-            'interfaces': {}
+            'interfaces': {},
+            'command_timings': {}
         }
+        timings = results['command_timings']
         
+        # Routers that keep failing to connect are skipped until their backoff passes
+        breakers = get_breakers()
+        try:
+            breakers.check(router_id)
+        except CircuitOpenError as e:
+            logger.warning(f"⏭️  Skipping {hostname}: {e}")
+            results['error'] = str(e)
+            results['circuit_open'] = True
+            return results
+        
+        connected = False
         try:
             logger.info(f"🔄 Connecting to {hostname} ({host})...")
             
@@ -382,15 +304,23 @@ class TejasRouterMonitor:
                        look_for_keys=False, allow_agent=False, timeout=10)
             
             chan = ssh.invoke_shell()
-            time.sleep(1)
             
-            # Clear initial output
-            if chan.recv_ready():
-                chan.recv(9999)
+            # Wait for prompt and disable pagination
+            prompt = ssh_command_reader.prepare_shell(chan)
+            connected = True
+            breakers.success(router_id)
+            
+            # Send every command for this router as one batch
+            commands = ['sh ip ospf ne', 'sh ip bgp summary sorted']
+            for interface in interfaces:
+                commands.append(f"sh sfp 100g {interface['interface_name']}")
+                commands.append(f"sh sfp stats 100g {interface['interface_name']}")
+            
+            outputs = TejasRouterMonitor.execute_commands(chan, commands, prompt, timings)
             
             # 1. Monitor OSPF Neighbors
             logger.info(f"  🔍 Checking OSPF neighbors...")
-            ospf_output = TejasRouterMonitor.execute_command(chan, 'sh ip ospf ne')
+            ospf_output = outputs['sh ip ospf ne']
             ospf_data = TejasCommandParser.parse_ospf_neighbors(ospf_output)
             results['ospf'] = ospf_data
             
@@ -400,7 +330,7 @@ class TejasRouterMonitor:
             
             # 2. Monitor BGP Summary
             logger.info(f"  🔍 Checking BGP summary...")
-            bgp_output = TejasRouterMonitor.execute_command(chan, 'sh ip bgp summary sorted', 3)
+            bgp_output = outputs['sh ip bgp summary sorted']
             bgp_data = TejasCommandParser.parse_bgp_summary(bgp_output)
             results['bgp'] = bgp_data
             
@@ -424,9 +354,7 @@ class TejasRouterMonitor:
                 
                 # SFP Info
                 logger.info(f"    🔍 Getting SFP info...")
-                sfp_info_output = TejasRouterMonitor.execute_command(
-                    chan, f'sh sfp 100g {interface_name}', 2
-                )
+                sfp_info_output = outputs[f'sh sfp 100g {interface_name}']
                 sfp_info_data = TejasCommandParser.parse_sfp_100g_info(sfp_info_output)
                 results['interfaces'][interface_name]['sfp_info'] = sfp_info_data
                 
@@ -436,53 +364,70 @@ class TejasRouterMonitor:
                 
                 # SFP Stats
                 logger.info(f"    🔍 Getting SFP stats...")
-                sfp_stats_output = TejasRouterMonitor.execute_command(
-                    chan, f'sh sfp stats 100g {interface_name}', 2
-                )
+                sfp_stats_output = outputs[f'sh sfp stats 100g {interface_name}']
                 sfp_stats_data = TejasCommandParser.parse_sfp_100g_stats(sfp_stats_output)
                 results['interfaces'][interface_name]['sfp_stats'] = sfp_stats_data
                 
                 # Save to database
                 db_manager.save_reading(router_id, interface_id, 'TEJAS_SFP_100G_STATS',
                                        sfp_stats_data, sfp_stats_output)
+                db_manager.save_sfp_metrics(router_id, interface_id, sfp_stats_data)
             
             ssh.close()
-            logger.info(f"✅ Completed monitoring {hostname}")
+            logger.info(f"✅ Completed monitoring {hostname} "
+                        f"({len(timings)} commands, {sum(timings.values()):.2f}s on router)")
             
         except Exception as e:
             logger.error(f"❌ Error monitoring {hostname}: {e}")
+            if not connected:
+                breakers.failure(router_id, e)
         
         return results
     
     @staticmethod
     def monitor_all_routers(db_manager):
         """Monitor all Tejas routers"""
-        routers = db_manager.get_tejas_routers()
+        # Routers and interfaces in one round-trip
+        inventory = db_manager.get_fleet_inventory('tejas')
         
-        if not routers:
+        if not inventory.routers:
             logger.warning("⚠️  No Tejas routers found")
             return {}
         
+        # Parameter name -> id mapping for this cycle's readings
+        db_manager.metadata.refresh()
+        
+        # Breaker state left by earlier runs and other collectors
+        breakers = get_breakers()
+        breakers.sync(db_manager.conn)
+        
         all_results = {}
+        skipped = []
         
-        # Monitor routers in parallel
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            
-            for router in routers:
-                interfaces = db_manager.get_router_interfaces(router['id'])
-                future = executor.submit(
-                    TejasRouterMonitor.monitor_router,
-                    router, interfaces, db_manager
-                )
-                futures.append(future)
-            
-            for future in futures:
-                try:
-                    result = future.result()
-                    all_results[result['router']] = result
-                except Exception as e:
-                    logger.error(f"❌ Error in parallel execution: {e}")
+        jobs = []
+        for router, interfaces in inventory.items():
+            jobs.append(CollectionJob(
+                router['id'], TejasRouterMonitor.monitor_router, router, interfaces, db_manager
+            ))
+        
+        # Monitor routers concurrently (budgets from COLLECTOR_* env settings)
+        for job in CollectionEngine().run(jobs):
+            if job.ok:
+                all_results[job.result['router']] = job.result
+                if job.result.get('circuit_open'):
+                    skipped.append(job.result['router'])
+        
+        if skipped:
+            logger.warning(f"⏭️  {len(skipped)} unreachable routers skipped (circuit open): "
+                           f"{', '.join(sorted(skipped))}")
+        breakers.sync(db_manager.conn)
+        
+        # Wait until this cycle's readings are written
+        db_manager.writer.flush()
+        db_manager.writer.log_stats()
+        if db_manager.metrics_writer:
+            db_manager.metrics_writer.flush()
+            db_manager.metrics_writer.log_stats()
         
         return all_results
 
@@ -557,7 +502,8 @@ def main():
     finally:
         db_manager.close()
     
-    input("\nPress Enter to exit...")
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
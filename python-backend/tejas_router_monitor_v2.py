@@ -4,15 +4,18 @@ With Centralized Credentials Support
 """
 
 import paramiko
-import time
 import re
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
+import sys
 import json
 
+import ssh_command_reader
+from router_circuit_breaker import CircuitOpenError, get_breakers
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -321,16 +324,14 @@ class TejasRouterMonitor:
     """Monitor Tejas routers"""
     
     @staticmethod
-    def execute_command(chan, command, wait_time=2):
-        """Execute command and return output"""
-        chan.send(f"{command}\n")
-        time.sleep(wait_time)
+    def execute_command(chan, command, prompt_pattern=None, timings=None):
+        """Execute command and return output as soon as the prompt reappears"""
+        result = ssh_command_reader.execute_command(chan, command, prompt_pattern)
         
-        resp = b""
-        while chan.recv_ready():
-            resp += chan.recv(9999)
+        if timings is not None:
+            timings[command] = round(result.elapsed, 3)
         
-        return resp.decode('ascii', errors='ignore')
+        return result.output
     
     @staticmethod
     def monitor_router(router, interfaces, db_manager):
@@ -348,9 +349,22 @@ class TejasRouterMonitor:
             'router': hostname,
             'ospf': None,
             'bgp': None,
-            'interfaces': {}
+            'interfaces': {},
+            'command_timings': {}
         }
+        timings = results['command_timings']
         
+        # Routers that keep failing to connect are skipped until their backoff passes
+        breakers = get_breakers()
+        try:
+            breakers.check(router_id)
+        except CircuitOpenError as e:
+            logger.warning(f"⏭️  Skipping {hostname}: {e}")
+            results['error'] = str(e)
+            results['circuit_open'] = True
+            return results
+        
+        connected = False
         try:
             logger.info(f"🔄 Connecting to {hostname} ({host})...")
             
@@ -361,14 +375,17 @@ class TejasRouterMonitor:
                        look_for_keys=False, allow_agent=False, timeout=10)
             
             chan = ssh.invoke_shell()
-            time.sleep(1)
-            
-            if chan.recv_ready():
-                chan.recv(9999)
             
+            # Wait for prompt and disable pagination
+            prompt = ssh_command_reader.prepare_shell(chan)
+            connected = True
+            breakers.success(router_id)
+
             # Monitor OSPF
             logger.info(f"  🔍 Checking OSPF neighbors...")
-            ospf_output = TejasRouterMonitor.execute_command(chan, 'sh ip ospf ne')
+            ospf_output = TejasRouterMonitor.execute_command(
+                chan, 'sh ip ospf ne', prompt, timings
+            )
             ospf_data = TejasCommandParser.parse_ospf_neighbors(ospf_output)
             results['ospf'] = ospf_data
             db_manager.save_reading(router_id, None, 'TEJAS_OSPF_NEIGHBORS', 
@@ -376,7 +393,9 @@ class TejasRouterMonitor:
             
             # Monitor BGP
             logger.info(f"  🔍 Checking BGP summary...")
-            bgp_output = TejasRouterMonitor.execute_command(chan, 'sh ip bgp summary sorted', 3)
+            bgp_output = TejasRouterMonitor.execute_command(
+                chan, 'sh ip bgp summary sorted', prompt, timings
+            )
             bgp_data = TejasCommandParser.parse_bgp_summary(bgp_output)
             results['bgp'] = bgp_data
             db_manager.save_reading(router_id, None, 'TEJAS_BGP_SUMMARY', 
@@ -398,7 +417,7 @@ class TejasRouterMonitor:
                 
                 # SFP Info
                 sfp_info_output = TejasRouterMonitor.execute_command(
-                    chan, f'sh sfp 100g {interface_name}', 2
+                    chan, f'sh sfp 100g {interface_name}', prompt, timings
                 )
                 sfp_info_data = TejasCommandParser.parse_sfp_100g_info(sfp_info_output)
                 results['interfaces'][interface_name]['sfp_info'] = sfp_info_data
@@ -407,7 +426,7 @@ class TejasRouterMonitor:
                 
                 # SFP Stats
                 sfp_stats_output = TejasRouterMonitor.execute_command(
-                    chan, f'sh sfp stats 100g {interface_name}', 2
+                    chan, f'sh sfp stats 100g {interface_name}', prompt, timings
                 )
                 sfp_stats_data = TejasCommandParser.parse_sfp_100g_stats(sfp_stats_output)
                 results['interfaces'][interface_name]['sfp_stats'] = sfp_stats_data
@@ -415,10 +434,13 @@ class TejasRouterMonitor:
                                        sfp_stats_data, sfp_stats_output)
             
             ssh.close()
-            logger.info(f"✅ Completed monitoring {hostname}")
+            logger.info(f"✅ Completed monitoring {hostname} "
+                        f"({len(timings)} commands, {sum(timings.values()):.2f}s on router)")
             
         except Exception as e:
             logger.error(f"❌ Error monitoring {hostname}: {e}")
+            if not connected:
+                breakers.failure(router_id, e)
         
         return results
     
@@ -431,7 +453,12 @@ class TejasRouterMonitor:
             logger.warning("⚠️  No Tejas routers found")
             return {}
         
+        # Breaker state left by earlier runs and other collectors
+        breakers = get_breakers()
+        breakers.sync(db_manager.conn)
+        
         all_results = {}
+        skipped = []
         
         with ThreadPoolExecutor(max_workers=3) as executor:
             futures = []
@@ -448,9 +475,16 @@ class TejasRouterMonitor:
                 try:
                     result = future.result()
                     all_results[result['router']] = result
+                    if result.get('circuit_open'):
+                        skipped.append(result['router'])
                 except Exception as e:
                     logger.error(f"❌ Error in parallel execution: {e}")
         
+        if skipped:
+            logger.warning(f"⏭️  {len(skipped)} unreachable routers skipped (circuit open): "
+                           f"{', '.join(sorted(skipped))}")
+        breakers.sync(db_manager.conn)
+        
         return all_results
 
 def display_results(all_results):
@@ -515,7 +549,8 @@ def main():
     finally:
         db_manager.close()
     
-    input("\nPress Enter to exit...")
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
@@ -4,17 +4,26 @@ With Centralized Credentials Support and Environment Variables
 """
 
 import paramiko
-import time
 import re
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
-import json
+import sys
 import os
 from dotenv import load_dotenv
 
+import ssh_command_reader
+import sfp_output_extractor
+import cli_table_parser
+from fleet_inventory import FleetInventory, load_fleet_inventory
+from collection_engine import CollectionEngine, CollectionJob
+from reading_writer import QueuedWriter, QueuedReadingWriter
+from sfp_metrics import SFP_METRICS_ENABLED, SFP_METRIC_SECTIONS, SFPMetricsWriter, sfp_metrics_row
+from parameter_metadata_cache import ParameterMetadataCache
+from router_circuit_breaker import CircuitOpenError, get_breakers
+from reachability_prober import HostUnreachableError, save_results
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -51,35 +60,41 @@ if not DB_CONFIG['password']:
 class TejasCommandParser:
     """Parse Tejas router command outputs"""
     
+    # Patterns are compiled once at import, not on every output
+    IPV4_RE = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
+    ROUTER_ID_RE = re.compile(r'BGP router identifier is ([\d.]+)')
+    LOCAL_AS_RE = re.compile(r'Local AS number (\d+)')
+    ESTABLISHED_RE = re.compile(r'Established Count\s*:\s*(\d+)')
+    CONFIGURED_RE = re.compile(r'Configured count\s*:\s*(\d+)')
+    FORWARDING_RE = re.compile(r'Forwarding State is (\w+)')
+    
+    OSPF_NEIGHBOR_FIELDS = (
+        'neighbor_id', 'priority', 'state', 'dead_time', 'neighbor_address', 'interface',
+        'helper_status', 'helper_age', 'helper_er', 'bfd_status', 'area_id'
+    )
+    
+    SFP_100G_INFO_FIELDS = (
+        'laser_status',
+        'operational_status',
+        'laser_type',
+        'rx_power',
+        'tx_power',
+        'module_temperature',
+        'module_voltage',
+        'serial_number',
+        'vendor_name'
+    )
+    
     @staticmethod
     def parse_ospf_neighbors(output):
         """Parse OSPF neighbor output"""
         neighbors = []
-        lines = output.split('\n')
-        in_table = False
         
-        for line in lines:
-            if '---' in line and 'Neighbor-ID' in output[:output.index(line)] if line in output else False:
-                in_table = True
-                continue
-            
-            if in_table and line.strip():
-                parts = line.split()
-                if len(parts) >= 11 and re.match(r'^\d+\.\d+\.\d+\.\d+$', parts[0]):
-                    neighbor = {
-                        'neighbor_id': parts[0],
-                        'priority': parts[1],
-                        'state': parts[2],
-                        'dead_time': parts[3],
-                        'neighbor_address': parts[4],
-                        'interface': parts[5],
-                        'helper_status': parts[6],
-                        'helper_age': parts[7],
-                        'helper_er': parts[8],
-                        'bfd_status': parts[9],
-                        'area_id': parts[10]
-                    }
-                    neighbors.append(neighbor)
+        # Header and separator are found once; rows are split on the header's columns
+        # Format: Neighbor-ID  Pri  State  DeadTime  Address  Interface  Helper  HelperAge  HelperER  Bfd  AreaID
+        for cells in cli_table_parser.parse_table(output, 'Neighbor-ID'):
+            if len(cells) >= 11 and all(cells[:11]) and TejasCommandParser.IPV4_RE.match(cells[0]):
+                neighbors.append(dict(zip(TejasCommandParser.OSPF_NEIGHBOR_FIELDS, cells)))
         
         return {
             'neighbor_count': len(neighbors),
@@ -91,23 +106,23 @@ class TejasCommandParser:
         """Parse BGP summary output"""
         result = {}
         
-        router_id_match = re.search(r'BGP router identifier is ([\d.]+)', output)
+        router_id_match = TejasCommandParser.ROUTER_ID_RE.search(output)
         if router_id_match:
             result['router_id'] = router_id_match.group(1)
         
-        local_as_match = re.search(r'Local AS number (\d+)', output)
+        local_as_match = TejasCommandParser.LOCAL_AS_RE.search(output)
         if local_as_match:
             result['local_as'] = local_as_match.group(1)
         
-        established_match = re.search(r'Established Count\s*:\s*(\d+)', output)
+        established_match = TejasCommandParser.ESTABLISHED_RE.search(output)
         if established_match:
             result['established_count'] = established_match.group(1)
         
-        configured_match = re.search(r'Configured count\s*:\s*(\d+)', output)
+        configured_match = TejasCommandParser.CONFIGURED_RE.search(output)
         if configured_match:
             result['configured_count'] = configured_match.group(1)
         
-        forwarding_match = re.search(r'Forwarding State is (\w+)', output)
+        forwarding_match = TejasCommandParser.FORWARDING_RE.search(output)
         if forwarding_match:
             result['forwarding_state'] = forwarding_match.group(1)
         
@@ -115,56 +130,13 @@ class TejasCommandParser:
     
     @staticmethod
     def parse_sfp_100g_info(output):
-        """Parse SFP 100G info output"""
-        result = {}
-        
-        fields = {
-            'laser_status': r'MSA Laser Status\s*:\s*(\w+)',
-            'operational_status': r'Operational Status\s*:\s*(\w+)',
-            'laser_type': r'Laser Type\s*:\s*(.+)',
-            'rx_power': r'RxPower\s*:\s*([-\d.]+)',
-            'tx_power': r'TxPower\s*:\s*([-\d.]+)',
-            'module_temperature': r'Module Temperature.*?:\s*([-\d.]+)',
-            'module_voltage': r'Module Voltage.*?:\s*([-\d.]+)',
-            'serial_number': r'Serial Number\s*:\s*(.+)',
-            'vendor_name': r'Vendor Name\s*:\s*(.+)'
-        }
-        
-        for field, pattern in fields.items():
-            match = re.search(pattern, output)
-            if match:
-                result[field] = match.group(1).strip()
-            else:
-                result[field] = 'N/A'
-        
-        return result
+        """Parse SFP 100G info output (single pass over the Key : Value lines)"""
+        return sfp_output_extractor.extract_sfp_100g_info(output, TejasCommandParser.SFP_100G_INFO_FIELDS)
     
     @staticmethod
     def parse_sfp_100g_stats(output):
-        """Parse SFP 100G stats output"""
-        result = {}
-        
-        rx_power_match = re.search(r'Received Power.*?0=([-\d.]+);1=([-\d.]+);2=([-\d.]+);3=([-\d.]+)', output)
-        if rx_power_match:
-            result['rx_power_lane0'] = rx_power_match.group(1)
-            result['rx_power_lane1'] = rx_power_match.group(2)
-            result['rx_power_lane2'] = rx_power_match.group(3)
-            result['rx_power_lane3'] = rx_power_match.group(4)
-            
-            rx_powers = [float(rx_power_match.group(i)) for i in range(1, 5)]
-            result['rx_power_avg'] = str(round(sum(rx_powers) / len(rx_powers), 4))
-        
-        tx_power_match = re.search(r'Transmit Power.*?0=([-\d.]+);1=([-\d.]+);2=([-\d.]+);3=([-\d.]+)', output)
-        if tx_power_match:
-            result['tx_power_lane0'] = tx_power_match.group(1)
-            result['tx_power_lane1'] = tx_power_match.group(2)
-            result['tx_power_lane2'] = tx_power_match.group(3)
-            result['tx_power_lane3'] = tx_power_match.group(4)
-            
-            tx_powers = [float(tx_power_match.group(i)) for i in range(1, 5)]
-            result['tx_power_avg'] = str(round(sum(tx_powers) / len(tx_powers), 4))
-        
-        return result
+        """Parse SFP 100G stats output (single pass; every section sfp_metrics stores)"""
+        return sfp_output_extractor.extract_sfp_100g_stats(output, SFP_METRIC_SECTIONS)
 
 class DatabaseManager:
     """Database operations"""
@@ -172,10 +144,20 @@ class DatabaseManager:
     def __init__(self, config):
         self.config = config
         self.conn = None
+        self.metadata = None
+        self.writer = None
+        self.metrics_writer = None
     
     def connect(self):
         try:
             self.conn = psycopg2.connect(**self.config)
+            self.metadata = ParameterMetadataCache(lambda: psycopg2.connect(**self.config))
+            # Readings are written by dedicated writer threads on their own connections
+            self.writer = QueuedReadingWriter(lambda: psycopg2.connect(**self.config), self.metadata)
+            if SFP_METRICS_ENABLED:
+                self.metrics_writer = QueuedWriter(
+                    lambda: SFPMetricsWriter(psycopg2.connect(**self.config)), name='sfp metrics writer'
+                )
             logger.info("✅ Database connected")
             return self.conn
         except Exception as e:
@@ -183,9 +165,32 @@ class DatabaseManager:
             raise
     
     def close(self):
+        if self.writer:
+            self.writer.close()
+        if self.metrics_writer:
+            self.metrics_writer.close()
+        if self.metadata:
+            self.metadata.close()
         if self.conn:
             self.conn.close()
     
+    def get_fleet_inventory(self, device_type=None):
+        """Routers and their monitored interfaces in one query"""
+        try:
+            return load_fleet_inventory(self.conn, device_type, parameters=False)
+        
+        except Exception as e:
+            logger.error(f"❌ Error loading inventory: {e}")
+            self.conn.rollback()
+            return FleetInventory()
+    
+    def save_reachability(self, results):
+        """This cycle's TCP sweep into router_ping_status, in one statement"""
+        try:
+            save_results(self.conn, results)
+        except Exception as e:
+            logger.warning(f"⚠️  Could not save reachability results: {e}")
+    
     def get_tejas_routers(self):
         """Get all Tejas routers"""
         try:
@@ -231,62 +236,60 @@ class DatabaseManager:
             return []
     
     def save_reading(self, router_id, interface_id, parameter_name, reading_data, raw_output):
-        """Save parameter reading"""
-        try:
-            cursor = self.conn.cursor()
-            
-            cursor.execute(
-                "SELECT id FROM monitoring_parameters WHERE parameter_name = %s",
-                (parameter_name,)
-            )
-            result = cursor.fetchone()
-            
-            if not result:
-                logger.warning(f"⚠️  Parameter {parameter_name} not found")
-                return
-            
-            parameter_id = result[0]
-            
-            query = """
-                INSERT INTO parameter_readings 
-                (router_id, interface_id, parameter_id, reading_data, raw_output, reading_time)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            
-            cursor.execute(query, (
-                router_id,
-                interface_id,
-                parameter_id,
-                json.dumps(reading_data),
-                raw_output,
-                datetime.now()
-            ))
-            
-            self.conn.commit()
-            cursor.close()
-            
-        except Exception as e:
-            logger.error(f"❌ Error saving reading: {e}")
-            self.conn.rollback()
+        """Queue parameter reading (written in bulk by the writer threads)"""
+        self.writer.add(router_id, interface_id, parameter_name, reading_data, raw_output)
+    
+    def save_sfp_metrics(self, router_id, interface_id, sfp_stats_data):
+        """Queue typed SFP stats for sfp_metrics (skipped when nothing parsed)"""
+        if self.metrics_writer:
+            row = sfp_metrics_row(router_id, interface_id, sfp_stats_data)
+            if row:
+                self.metrics_writer.put(row)
 
 class TejasRouterMonitor:
     """Monitor Tejas routers"""
     
+    # Parameters collected by monitor_router and their commands
+    ROUTER_COMMANDS = {
+        'TEJAS_OSPF_NEIGHBORS': 'sh ip ospf ne',
+        'TEJAS_BGP_SUMMARY': 'sh ip bgp summary sorted'
+    }
+    INTERFACE_COMMANDS = {
+        'TEJAS_SFP_100G_INFO': 'sh sfp 100g {interface}',
+        'TEJAS_SFP_100G_STATS': 'sh sfp stats 100g {interface}'
+    }
+    PARAMETERS = (*ROUTER_COMMANDS, *INTERFACE_COMMANDS)
+    
     @staticmethod
-    def execute_command(chan, command, wait_time=2):
-        """Execute command and return output"""
-        chan.send(f"{command}\n")
-        time.sleep(wait_time)
+    def execute_command(chan, command, prompt_pattern=None, timings=None):
+        """Execute command and return output as soon as the prompt reappears"""
+        result = ssh_command_reader.execute_command(chan, command, prompt_pattern)
         
-        resp = b""
-        while chan.recv_ready():
-            resp += chan.recv(9999)
+        if timings is not None:
+            timings[command] = round(result.elapsed, 3)
         
-        return resp.decode('ascii', errors='ignore')
+        return result.output
     
     @staticmethod
-    def monitor_router(router, interfaces, db_manager):
-        """Monitor single router"""
+    def execute_commands(chan, commands, prompt_pattern=None, timings=None):
+        """Execute a batch of commands in one pipelined burst, returns {command: output}"""
+        results = ssh_command_reader.execute_batch(chan, commands, prompt_pattern)
+        
+        if timings is not None:
+            for result in results:
+                timings[result.command] = round(result.elapsed, 3)
+        
+        return {result.command: result.output for result in results}
+    
+    @staticmethod
+    def monitor_router(router, interfaces, db_manager, parameters=None):
+        """
+        Monitor single router
+        
+        Args:
+            parameters: parameter names to collect (see PARAMETERS), or a dict of
+                        name -> interface ids (None for every interface); None for all
+        """
         host = router['ip_address']
         hostname = router['hostname']
         port = router['ssh_port']
@@ -300,9 +303,26 @@ class TejasRouterMonitor:
             'router': hostname,
             'ospf': None,
             'bgp': None,
-            'interfaces': {}
+            'interfaces': {},
+            'command_timings': {}
         }
-        
+        timings = results['command_timings']
+        if isinstance(parameters, dict):
+            collect = parameters
+        else:
+            collect = dict.fromkeys(parameters or TejasRouterMonitor.PARAMETERS)
+        
+        # Routers that keep failing to connect are skipped until their backoff passes
+        breakers = get_breakers()
+        try:
+            breakers.check(router_id)
+        except CircuitOpenError as e:
+            logger.warning(f"⏭️  Skipping {hostname}: {e}")
+            results['error'] = str(e)
+            results['circuit_open'] = True
+            return results
+        
+        connected = False
         try:
             logger.info(f"🔄 Connecting to {hostname} ({host})...")
             
@@ -313,38 +333,50 @@ class TejasRouterMonitor:
                        look_for_keys=False, allow_agent=False, timeout=10)
             
             chan = ssh.invoke_shell()
-            time.sleep(1)
             
-            # Clear initial output
-            if chan.recv_ready():
-                chan.recv(9999)
+            # Wait for prompt and disable pagination
+            prompt = ssh_command_reader.prepare_shell(chan)
+            connected = True
+            breakers.success(router_id)
             
-            # Disable pagination
-            chan.send('conf t\n')
-            time.sleep(1)
-            chan.send('set cli pagination off\n')
-            time.sleep(1)
-            chan.send('end\n')
-            time.sleep(1)
+            # Send every command for this router as one batch
+            commands = [command for name, command in TejasRouterMonitor.ROUTER_COMMANDS.items()
+                        if name in collect]
+            interface_parameters = {}
+            for interface in interfaces:
+                wanted = [name for name in TejasRouterMonitor.INTERFACE_COMMANDS
+                          if name in collect and (collect[name] is None or interface['id'] in collect[name])]
+                if wanted:
+                    interface_parameters[interface['id']] = wanted
+                for name in wanted:
+                    commands.append(TejasRouterMonitor.INTERFACE_COMMANDS[name].format(
+                        interface=interface['interface_name']))
+            
+            outputs = TejasRouterMonitor.execute_commands(chan, commands, prompt, timings)
             
             # Monitor OSPF
-            logger.info(f"  🔍 Checking OSPF neighbors...")
-            ospf_output = TejasRouterMonitor.execute_command(chan, 'sh ip ospf ne')
-            ospf_data = TejasCommandParser.parse_ospf_neighbors(ospf_output)
-            results['ospf'] = ospf_data
-            db_manager.save_reading(router_id, None, 'TEJAS_OSPF_NEIGHBORS', 
-                                   ospf_data, ospf_output)
+            if 'TEJAS_OSPF_NEIGHBORS' in collect:
+                logger.info(f"  🔍 Checking OSPF neighbors...")
+                ospf_output = outputs['sh ip ospf ne']
+                ospf_data = TejasCommandParser.parse_ospf_neighbors(ospf_output)
+                results['ospf'] = ospf_data
+                db_manager.save_reading(router_id, None, 'TEJAS_OSPF_NEIGHBORS', 
+                                       ospf_data, ospf_output)
             
             # Monitor BGP
-            logger.info(f"  🔍 Checking BGP summary...")
-            bgp_output = TejasRouterMonitor.execute_command(chan, 'sh ip bgp summary sorted', 3)
-            bgp_data = TejasCommandParser.parse_bgp_summary(bgp_output)
-            results['bgp'] = bgp_data
-            db_manager.save_reading(router_id, None, 'TEJAS_BGP_SUMMARY', 
-                                   bgp_data, bgp_output)
+            if 'TEJAS_BGP_SUMMARY' in collect:
+                logger.info(f"  🔍 Checking BGP summary...")
+                bgp_output = outputs['sh ip bgp summary sorted']
+                bgp_data = TejasCommandParser.parse_bgp_summary(bgp_output)
+                results['bgp'] = bgp_data
+                db_manager.save_reading(router_id, None, 'TEJAS_BGP_SUMMARY', 
+                                       bgp_data, bgp_output)
             
             # Monitor SFP
             for interface in interfaces:
+                wanted = interface_parameters.get(interface['id'])
+                if not wanted:
+                    continue
                 interface_name = interface['interface_name']
                 interface_label = interface['interface_label']
                 interface_id = interface['id']
@@ -358,46 +390,88 @@ class TejasRouterMonitor:
                 }
                 
                 # SFP Info
-                sfp_info_output = TejasRouterMonitor.execute_command(
-                    chan, f'sh sfp 100g {interface_name}', 2
-                )
-                sfp_info_data = TejasCommandParser.parse_sfp_100g_info(sfp_info_output)
-                results['interfaces'][interface_name]['sfp_info'] = sfp_info_data
-                db_manager.save_reading(router_id, interface_id, 'TEJAS_SFP_100G_INFO',
-                                       sfp_info_data, sfp_info_output)
+                if 'TEJAS_SFP_100G_INFO' in wanted:
+                    sfp_info_output = outputs[f'sh sfp 100g {interface_name}']
+                    sfp_info_data = TejasCommandParser.parse_sfp_100g_info(sfp_info_output)
+                    results['interfaces'][interface_name]['sfp_info'] = sfp_info_data
+                    db_manager.save_reading(router_id, interface_id, 'TEJAS_SFP_100G_INFO',
+                                           sfp_info_data, sfp_info_output)
                 
                 # SFP Stats
-                sfp_stats_output = TejasRouterMonitor.execute_command(
-                    chan, f'sh sfp stats 100g {interface_name}', 2
-                )
-                sfp_stats_data = TejasCommandParser.parse_sfp_100g_stats(sfp_stats_output)
-                results['interfaces'][interface_name]['sfp_stats'] = sfp_stats_data
-                db_manager.save_reading(router_id, interface_id, 'TEJAS_SFP_100G_STATS',
-                                       sfp_stats_data, sfp_stats_output)
+                if 'TEJAS_SFP_100G_STATS' in wanted:
+                    sfp_stats_output = outputs[f'sh sfp stats 100g {interface_name}']
+                    sfp_stats_data = TejasCommandParser.parse_sfp_100g_stats(sfp_stats_output)
+                    results['interfaces'][interface_name]['sfp_stats'] = sfp_stats_data
+                    db_manager.save_reading(router_id, interface_id, 'TEJAS_SFP_100G_STATS',
+                                           sfp_stats_data, sfp_stats_output)
+                    db_manager.save_sfp_metrics(router_id, interface_id, sfp_stats_data)
             
             ssh.close()
-            logger.info(f"✅ Completed monitoring {hostname}")
+            logger.info(f"✅ Completed monitoring {hostname} "
+                        f"({len(timings)} commands, {sum(timings.values()):.2f}s on router)")
             
         except Exception as e:
             logger.error(f"❌ Error monitoring {hostname}: {e}")
+            results['error'] = str(e)
+            if not connected:
+                breakers.failure(router_id, e)
         
         return results
     
     @staticmethod
     def monitor_all_routers(db_manager):
         """Monitor all Tejas routers"""
-        routers = db_manager.get_tejas_routers()
+        # Routers and interfaces in one round-trip
+        inventory = db_manager.get_fleet_inventory('tejas')
         
-        if not routers:
+        if not inventory.routers:
             logger.warning("⚠️  No Tejas routers found")
             return {}
         
+        # Parameter name -> id mapping for this cycle's readings
+        db_manager.metadata.refresh()
+        
+        # Breaker state left by earlier runs and other collectors
+        breakers = get_breakers()
+        breakers.sync(db_manager.conn)
+        
         all_results = {}
         
-        for router in routers:
-            interfaces = db_manager.get_router_interfaces(router['id'])
-            result = TejasRouterMonitor.monitor_router(router, interfaces, db_manager)
-            all_results[result['router']] = result
+        jobs = []
+        for router, interfaces in inventory.items():
+            jobs.append(CollectionJob(
+                router['id'], TejasRouterMonitor.monitor_router, router, interfaces, db_manager,
+                address=(router['ip_address'], router['ssh_port'] or 22)
+            ))
+        
+        # Poll routers concurrently (budgets from COLLECTOR_* env settings);
+        # routers that fail the TCP sweep first are never SSH'd
+        engine = CollectionEngine()
+        skipped = []
+        down = []
+        for job in engine.run(jobs):
+            if job.ok:
+                all_results[job.result['router']] = job.result
+                if job.result.get('circuit_open'):
+                    skipped.append(job.result['router'])
+            elif isinstance(job.error, HostUnreachableError):
+                down.append(job.args[0]['hostname'])
+        
+        if down:
+            logger.warning(f"⏭️  {len(down)} routers down (TCP sweep), not polled: {', '.join(sorted(down))}")
+        if skipped:
+            logger.warning(f"⏭️  {len(skipped)} unreachable routers skipped (circuit open): "
+                           f"{', '.join(sorted(skipped))}")
+        breakers.sync(db_manager.conn)
+        if engine.reachability:
+            db_manager.save_reachability(engine.reachability)
+        
+        # Wait until this cycle's readings are written
+        db_manager.writer.flush()
+        db_manager.writer.log_stats()
+        if db_manager.metrics_writer:
+            db_manager.metrics_writer.flush()
+            db_manager.metrics_writer.log_stats()
         
         return all_results
 
@@ -410,7 +484,10 @@ def display_results(all_results):
     for router_name, results in all_results.items():
         print(f"\n🌐 Router: {router_name}")
         print("-" * 100)
-        
+
+        if results.get('circuit_open'):
+            print(f"\n  ⏭️  Skipped: {results['error']}")
+
         if results['ospf']:
             print(f"\n  🔄 OSPF Neighbors: {results['ospf']['neighbor_count']}")
             for neighbor in results['ospf'].get('neighbors', []):
@@ -459,7 +536,8 @@ def main():
     finally:
         db_manager.close()
     
-    input("\nPress Enter to exit...")
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
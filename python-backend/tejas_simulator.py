@@ -0,0 +1,406 @@
+"""
+Tejas Router CLI Simulator
+Runs N fake Tejas routers as SSH servers on localhost ports
+
+Used for benchmarks and load tests of app.py and the monitor scripts without
+real routers. Unlike tejas_monitor_dry_run.py this goes through real SSH
+(TCP connect, key exchange, auth, shell), so SSH cost is measured too.
+
+Supported commands:
+    conf t / set cli pagination off / end
+    sh ip ospf ne              (also: show ip ospf neighbor)
+    sh ip bgp summary sorted   (also: show ip bgp summary)
+    sh sfp 100g <if>           (also: show sfp <if>)
+    sh sfp stats 100g <if>
+
+Usage:
+    python tejas_simulator.py --routers 20 --base-port 2200 --latency 0.05 --jitter 0.02
+"""
+
+import time
+import socket
+import random
+import logging
+import argparse
+import threading
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USERNAME = 'admin'
+DEFAULT_PASSWORD = 'admin'
+
+
+class SimulatorConfig:
+    """Behaviour knobs shared by every simulated router"""
+
+    def __init__(self, latency=0.05, jitter=0.02, interfaces=4, ospf_neighbors=4, bgp_peers=8,
+                 auth_fail_rate=0.0, hang_rate=0.0, hang_seconds=3600.0, drop_typeahead=False,
+                 username=DEFAULT_USERNAME, password=DEFAULT_PASSWORD, seed=1):
+        self.latency = latency
+        self.jitter = jitter
+        self.interfaces = interfaces
+        self.ospf_neighbors = ospf_neighbors
+        self.bgp_peers = bgp_peers
+        self.auth_fail_rate = auth_fail_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.drop_typeahead = drop_typeahead
+        self.username = username
+        self.password = password
+        self.seed = seed
+
+
+class TejasOutputs:
+    """Realistic Tejas command outputs (same layout the parsers expect)"""
+
+    @staticmethod
+    def ospf_neighbors(index, count):
+        lines = [
+            "",
+            "    OSPF Instance 1 ",
+            "",
+            "Neighbor-ID     Pri  State       DeadTime  Address         Interface  "
+            "Helper  HelperAge  HelperER  Bfd      AreaID",
+            "-" * 118
+        ]
+        for n in range(count):
+            neighbor = f"10.125.{index % 250}.{n + 1}"
+            lines.append(
+                f"{neighbor:<15} 1    FULL/PTOP   {30 + n % 10:<9} {f'10.130.{index % 250}.{n + 1}':<15} "
+                f"vlan{50 + n:<6} None    0          None      Enabled  0.0.0.7"
+            )
+        lines.append("")
+        return "\r\n".join(lines)
+
+    @staticmethod
+    def bgp_summary(index, count):
+        established = max(count - 1, 0)
+        lines = [
+            "",
+            f"BGP router identifier is 10.125.0.{index % 250}, Local AS number 65{index % 1000:03d}",
+            f"Established Count : {established}",
+            f"Configured count : {count}",
+            f"Total Change version : {1000 + index}",
+            "Forwarding State is enabled",
+            "",
+            "Description      Neighbor        V    AS     MsgRcvd  MsgSent  Up/Down   State        UpDownCount",
+            "-" * 100
+        ]
+        for n in range(count):
+            state = 'Established' if n < established else 'Active'
+            lines.append(
+                f"{f'PEER-{n + 1}':<16} {f'10.140.{index % 250}.{n + 1}':<15} 4    {65100 + n:<6} "
+                f"{5000 + n:<8} {5100 + n:<8} 12d03h    {state:<12} {n % 3}"
+            )
+        lines.append("")
+        return "\r\n".join(lines)
+
+    @staticmethod
+    def _lanes(rng, base, spread):
+        return ";".join(f"{lane}={base + rng.uniform(-spread, spread):.4f}" for lane in range(4))
+
+    @staticmethod
+    def sfp_100g_info(index, interface, rng):
+        return "\r\n".join([
+            "",
+            f"Interface                     : {interface}",
+            f"Parent                        : 100GE-{interface}",
+            "MSA Laser Status              : ON",
+            "Present Status                : PRESENT",
+            "Operational Status            : up",
+            "Laser Type                    : 100GE / QSFP28 / 80km / 1310 nm",
+            "ALS Mode                      : Disabled",
+            "Distance Range                : 80",
+            "Nominal Bit Rate (Gbps)       : 103.1",
+            f"RxPower                       : {-16.35 + rng.uniform(-0.2, 0.2):.4f}",
+            f"TxPower                       : {9.84 + rng.uniform(-0.05, 0.05):.4f}",
+            "Laser Coherent                : No",
+            f"Module Temperature (C)        : {39.98 + rng.uniform(-0.5, 0.5):.4f}",
+            f"Module Voltage (V)            : {3.2512 + rng.uniform(-0.01, 0.01):.4f}",
+            "Product Code                  : TJ-QSFP28-LR4-80",
+            f"Serial Number                 : TJAB4320{index:05d}{interface.replace('/', '')}",
+            "Vendor Name                   : TEJAS NETWORKS",
+            ""
+        ])
+
+    @staticmethod
+    def sfp_100g_stats(index, interface, rng):
+        return "\r\n".join([
+            "",
+            f"Interface : {interface}",
+            "CURRENT COUNTERS (900)secs",
+            "Interval Valid                 : 1",
+            f"Received Power (dBm)           : {TejasOutputs._lanes(rng, -3.2, 0.3)}",
+            f"Transmit Power (dBm)           : {TejasOutputs._lanes(rng, 1.1, 0.1)}",
+            f"Tx Laser Bias Current (mA)     : {TejasOutputs._lanes(rng, 45.0, 2.0)}",
+            f"Module Voltage (V)             : {3.2512 + rng.uniform(-0.01, 0.01):.4f}",
+            f"Module Temperature (C)         : {39.98 + rng.uniform(-0.5, 0.5):.4f}",
+            ""
+        ])
+
+
+class _SSHServer(paramiko.ServerInterface):
+    """Auth and channel policy for one simulated router"""
+
+    def __init__(self, router):
+        self.router = router
+
+    def check_auth_password(self, username, password):
+        config = self.router.config
+        if self.router.auth_fails or username != config.username or password != config.password:
+            return paramiko.AUTH_FAILED
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED_OPEN_REQUEST
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+
+class SimulatedTejasRouter:
+    """One fake router listening on one localhost port"""
+
+    def __init__(self, index, port, config, host_key, host='127.0.0.1'):
+        self.index = index
+        self.port = port
+        self.host = host
+        self.config = config
+        self.host_key = host_key
+        self.hostname = f"SIM-TEJAS-{index:04d}"
+        self.interfaces = [f"1/1/{i}" for i in range(1, config.interfaces + 1)]
+
+        rng = random.Random(config.seed * 100003 + index)
+        self.auth_fails = rng.random() < config.auth_fail_rate
+
+        self.commands_served = 0
+        self._sock = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(100)
+        threading.Thread(target=self._accept_loop, name=f"sim-{self.index}", daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._sock:
+            self._sock.close()
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_connection, args=(client,), daemon=True).start()
+
+    def _serve_connection(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        try:
+            transport.start_server(server=_SSHServer(self))
+            chan = transport.accept(30)
+            if chan is None:
+                return
+            self._run_cli(chan)
+        except Exception as e:
+            logger.debug(f"[SIM] {self.hostname}: connection ended: {e}")
+        finally:
+            transport.close()
+
+    def _prompt(self, config_mode):
+        return f"{self.hostname}(config)#" if config_mode else f"{self.hostname}#"
+
+    def _respond(self, command, rng):
+        """Return (output, config_mode change or None)"""
+        parts = command.split()
+
+        if command in ('conf t', 'configure terminal'):
+            return "", True
+        if command == 'end':
+            return "", False
+        if command == 'set cli pagination off':
+            return "", None
+        if command in ('sh ip ospf ne', 'show ip ospf neighbor'):
+            return TejasOutputs.ospf_neighbors(self.index, self.config.ospf_neighbors), None
+        if command in ('sh ip bgp summary sorted', 'show ip bgp summary'):
+            return TejasOutputs.bgp_summary(self.index, self.config.bgp_peers), None
+        if parts[:3] == ['sh', 'sfp', '100g'] and len(parts) == 4:
+            return TejasOutputs.sfp_100g_info(self.index, parts[3], rng), None
+        if parts[:2] == ['show', 'sfp'] and len(parts) == 3:
+            return TejasOutputs.sfp_100g_info(self.index, parts[2], rng), None
+        if parts[:4] == ['sh', 'sfp', 'stats', '100g'] and len(parts) == 5:
+            return TejasOutputs.sfp_100g_stats(self.index, parts[4], rng), None
+        if not command:
+            return "", None
+
+        return f"\r\n% Invalid input detected: '{command}'\r\n", None
+
+    def _run_cli(self, chan):
+        config = self.config
+        rng = random.Random(config.seed * 7919 + self.index + int(time.time()))
+        config_mode = False
+
+        chan.send(f"\r\nTejas Networks TJ1400\r\n\r\n{self._prompt(config_mode)}")
+
+        pending = b""
+        while not self._stopped.is_set():
+            data = chan.recv(4096)
+            if not data:
+                return
+            pending += data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+            lines = pending.split(b"\n")
+            pending = lines.pop()
+
+            # Some CLIs flush typed-ahead input when a command starts
+            if config.drop_typeahead and len(lines) > 1:
+                lines = lines[:1]
+
+            for raw_line in lines:
+                command = raw_line.decode('ascii', errors='ignore').strip()
+                chan.send(f"{command}\r\n")
+
+                if command and rng.random() < config.hang_rate:
+                    # Simulate a wedged CLI: echo, then nothing
+                    self._stopped.wait(config.hang_seconds)
+                    return
+
+                time.sleep(max(0.0, config.latency + rng.uniform(-config.jitter, config.jitter)))
+
+                output, mode = self._respond(command, rng)
+                if mode is not None:
+                    config_mode = mode
+
+                self.commands_served += 1
+                chan.sendall(f"{output}\r\n{self._prompt(config_mode)}" if output else self._prompt(config_mode))
+
+
+class TejasSimulatorFleet:
+    """Start and stop a fleet of simulated routers"""
+
+    def __init__(self, count, base_port=2200, config=None, host='127.0.0.1'):
+        self.config = config or SimulatorConfig()
+        self.host = host
+        host_key = paramiko.RSAKey.generate(2048)
+        self.routers = [
+            SimulatedTejasRouter(i + 1, base_port + i, self.config, host_key, host)
+            for i in range(count)
+        ]
+
+    def start(self):
+        for router in self.routers:
+            router.start()
+        logger.info(f"[SIM] Started {len(self.routers)} simulated Tejas routers on "
+                    f"{self.host}:{self.routers[0].port}-{self.routers[-1].port}")
+        return self
+
+    def stop(self):
+        for router in self.routers:
+            router.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def inventory(self):
+        """
+        Router and interface rows in the shape the monitors expect
+        (both the v_routers_with_credentials and the routers-table column names)
+
+        Returns:
+            List of (router, interfaces)
+        """
+        inventory = []
+        for router in self.routers:
+            row = {
+                'id': router.index,
+                'hostname': router.hostname,
+                'ip_address': router.host,
+                'host': router.host,
+                'ssh_port': router.port,
+                'port': router.port,
+                'username': self.config.username,
+                'password': self.config.password,
+                'device_type': 'tejas',
+                'credential_name': 'simulator'
+            }
+            interfaces = [
+                {
+                    'id': router.index * 1000 + i,
+                    'interface_name': name,
+                    'interface_label': f"{router.hostname}-LINK-{i}",
+                    'interface_type': '100G'
+                }
+                for i, name in enumerate(router.interfaces, 1)
+            ]
+            inventory.append((row, interfaces))
+        return inventory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--routers', type=int, default=10)
+    parser.add_argument('--base-port', type=int, default=2200)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per command')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--interfaces', type=int, default=4, help='100G interfaces per router')
+    parser.add_argument('--ospf-neighbors', type=int, default=4)
+    parser.add_argument('--bgp-peers', type=int, default=8)
+    parser.add_argument('--auth-fail-rate', type=float, default=0.0, help='fraction of routers rejecting login')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='chance a command never returns')
+    parser.add_argument('--drop-typeahead', action='store_true', help='discard typed-ahead input')
+    parser.add_argument('--username', default=DEFAULT_USERNAME)
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    config = SimulatorConfig(
+        latency=args.latency, jitter=args.jitter, interfaces=args.interfaces,
+        ospf_neighbors=args.ospf_neighbors, bgp_peers=args.bgp_peers,
+        auth_fail_rate=args.auth_fail_rate, hang_rate=args.hang_rate,
+        drop_typeahead=args.drop_typeahead, username=args.username,
+        password=args.password, seed=args.seed
+    )
+
+    fleet = TejasSimulatorFleet(args.routers, args.base_port, config, args.host).start()
+
+    print("\n" + "="*60)
+    print("🧪 Tejas CLI Simulator running")
+    print("="*60)
+    for router in fleet.routers[:5]:
+        flag = " (auth fails)" if router.auth_fails else ""
+        print(f"   {router.hostname}  ssh {args.username}@{router.host} -p {router.port}{flag}")
+    if len(fleet.routers) > 5:
+        print(f"   ... {len(fleet.routers) - 5} more")
+    print("="*60)
+    print("Press Ctrl+C to stop\n")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fleet.stop()
+        print("\n✅ Simulator stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Test Script 11: Writer Thread Recovery
+Yeh script check karta hai ki database error ke baad writer thread zinda
+rehta hai (no database needed - fake connections)
+
+Expected Output:
+✅ flush() returned after a failed batch
+✅ Rows after the failure were written
+✅ ReadingWriter / BulkInsertWriter return 0 on a dead connection
+"""
+
+import os
+import sys
+import threading
+
+import psycopg2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reading_writer import BulkInsertWriter, QueuedWriter, ReadingWriter
+
+
+class FakeConnection:
+    """Connection that fails every call once the 'server' is gone"""
+
+    def __init__(self, dead=False):
+        self.dead = dead
+        self.closed = 0
+
+    def _check(self):
+        if self.dead or self.closed:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def cursor(self, **kwargs):
+        self._check()
+        return self
+
+    def execute(self, *args):
+        self._check()
+
+    def commit(self):
+        self._check()
+
+    def rollback(self):
+        self._check()
+
+    def close(self):
+        self.closed = 1
+
+
+class FlakyWriter:
+    """Raises on its first write (e.g. Postgres restarting), then writes normally"""
+
+    failures = 1
+    written = []
+    connections = 0
+
+    def __init__(self):
+        FlakyWriter.connections += 1
+        self.conn = FakeConnection()
+
+    def write(self, rows):
+        if FlakyWriter.failures:
+            FlakyWriter.failures -= 1
+            raise psycopg2.OperationalError("terminating connection due to administrator command")
+        FlakyWriter.written.extend(rows)
+        return len(rows)
+
+
+def flush_with_timeout(writer, seconds=10):
+    done = threading.Event()
+    threading.Thread(target=lambda: (writer.flush(), done.set()), daemon=True).start()
+    return done.wait(seconds)
+
+
+def test_queued_writer_recovery():
+    print("\n" + "="*60)
+    print("🔍 Testing QueuedWriter after a failed batch...")
+    print("="*60 + "\n")
+
+    writer = QueuedWriter(FlakyWriter, name='test writer', flush_interval=0.1)
+    ok = True
+
+    for i in range(5):
+        writer.put(('lost', i))
+    if flush_with_timeout(writer):
+        print("✅ flush() returned after a failed batch")
+    else:
+        print("❌ flush() hung: the writer thread died")
+        return False
+
+    for i in range(5):
+        writer.put(('kept', i))
+    flush_with_timeout(writer)
+    writer.close()
+
+    kept = [row for row in FlakyWriter.written if row[0] == 'kept']
+    if len(kept) == 5:
+        print(f"✅ Rows after the failure were written ({len(kept)}/5)")
+    else:
+        print(f"❌ Only {len(kept)}/5 rows written after the failure")
+        ok = False
+
+    print(f"   Stats: {writer.stats['rows_written']} written, {writer.stats['rows_failed']} failed, "
+          f"{FlakyWriter.connections} connections")
+    # The failed batch is whatever the thread had picked up when it raised
+    lost = 5 - sum(1 for row in FlakyWriter.written if row[0] == 'lost')
+    if writer.stats['rows_failed'] != lost or not lost or FlakyWriter.connections < 2:
+        print("❌ Failed rows not counted, or the writer did not reconnect")
+        ok = False
+    return ok
+
+
+def test_dead_connection():
+    print("\n" + "="*60)
+    print("🔍 Testing writers on a dead connection...")
+    print("="*60 + "\n")
+
+    ok = True
+    for writer in (ReadingWriter(FakeConnection(dead=True), raw_store=False),
+                   BulkInsertWriter(FakeConnection(dead=True))):
+        name = type(writer).__name__
+        try:
+            written = writer.write([(1, 2, 3, '{}', 'raw', None, True)])
+        except Exception as e:
+            print(f"❌ {name}.write raised: {e}")
+            ok = False
+            continue
+        if written == 0 and writer.conn.closed:
+            print(f"✅ {name} returned 0 and closed the connection")
+        else:
+            print(f"❌ {name} returned {written}, connection closed: {bool(writer.conn.closed)}")
+            ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    results = [test_queued_writer_recovery(), test_dead_connection()]
+    print("\n" + "="*60)
+    print("✅ All tests passed!" if all(results) else "❌ Some tests failed!")
+    sys.exit(0 if all(results) else 1)